@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# fake_mt5.py — terminal/MetaEditor/CommandListener falsos para benchmarks no Linux
+#
+#   fake_mt5.py terminal   /config:tester.ini [/portable] [/profile:X]
+#   fake_mt5.py metaeditor /compile:Arq.mq5 /log:Arq.log [/s]
+#   fake_mt5.py listener   --data-dir DIR [--once] [--timeout S]   (EXPORT_* gera dados sintéticos)
+#   fake_mt5.py service    [--log logs/gpu_service.log] [--health-file F]
+#
+# Variáveis de ambiente:
+#   FAKE_MT5_DURATION  segundos simulados por execução do terminal (padrão 0.05)
+#   FAKE_MT5_JITTER    variação aleatória (+/- segundos) sobre a duração
+#   FAKE_MT5_RC        código de saída do terminal (padrão 0)
+#   FAKE_MT5_ROOT      raiz onde Report=\reports\x.htm é gravado (padrão: cwd)
+#   FAKE_MT5_PASSES    otimização: nº de passes emitidos ao longo da duração (log do
+#                      tester em <root>/Tester/logs; padrão 0)
+#   FAKE_MT5_FRAMES    1 = também grava <root>/MQL5/Files/mtcli_frames_<EA>.jsonl (MtcliFrames.mqh)
+#   FAKE_ME_DURATION   segundos simulados por compilação (padrão 0.02)
+#   FAKE_ME_RC         código de saída do MetaEditor (padrão 0)
+#   FAKE_SVC_READY_DELAY  segundos até o serviço logar "Service ready" (padrão 0.2)
+#   FAKE_SVC_CRASH_AFTER  cai após N segundos pronto (padrão: nunca)
+#   FAKE_SVC_RC           código de saída ao cair (padrão 3)
+import hashlib, json, math, os, random, struct, sys, time
+from pathlib import Path
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def read_ini(path: Path) -> dict[str, dict[str, str]]:
+    '''Lê um INI do mtcli (UTF-16 LE sem BOM, com BOM ou UTF-8).'''
+    raw = path.read_bytes()
+    if raw.startswith(b"\xff\xfe"):
+        text = raw[2:].decode("utf-16-le")
+    elif len(raw) > 1 and raw[1:2] == b"\x00":
+        text = raw.decode("utf-16-le")
+    else:
+        text = raw.decode("utf-8-sig")
+    sections: dict[str, dict[str, str]] = {}
+    cur = sections.setdefault("", {})
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(";"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            cur = sections.setdefault(line[1:-1], {})
+        elif "=" in line:
+            k, v = line.split("=", 1)
+            cur[k.strip()] = v.strip()
+    return sections
+
+def _switches(argv: list[str]) -> dict[str, str]:
+    out = {}
+    for a in argv:
+        if a.startswith("/"):
+            k, _, v = a[1:].partition(":")
+            out[k.lower()] = v
+    return out
+
+def synthetic_metrics(seed_text: str) -> dict[str, float]:
+    '''Métricas determinísticas a partir dos inputs (mesma combinação -> mesmo relatório).'''
+    rnd = random.Random(hashlib.sha1(seed_text.encode("utf-8")).hexdigest())
+    trades = rnd.randint(20, 400)
+    profit = round(rnd.uniform(-2000, 5000), 2)
+    return {
+        "Total Net Profit": profit,
+        "Gross Profit": round(abs(profit) + rnd.uniform(100, 3000), 2),
+        "Profit Factor": round(rnd.uniform(0.6, 2.4), 2),
+        "Expected Payoff": round(profit / trades, 2),
+        "Recovery Factor": round(rnd.uniform(-1, 6), 2),
+        "Sharpe Ratio": round(rnd.uniform(-1, 3), 2),
+        "Balance Drawdown Maximal": round(rnd.uniform(50, 1500), 2),
+        "Equity Drawdown Relative": round(rnd.uniform(1, 40), 2),
+        "Total Trades": trades,
+    }
+
+def render_html_report(tester: dict[str, str], metrics: dict[str, float]) -> str:
+    rows = "\n".join(f"<tr><td>{k}:</td><td><b>{v}</b></td></tr>" for k, v in metrics.items())
+    return ("<html><head><title>Strategy Tester Report</title></head><body>\n"
+            f"<div>{tester.get('Expert', '')} {tester.get('Symbol', '')} {tester.get('Period', '')}</div>\n"
+            f"<table>\n{rows}\n</table>\n</body></html>\n")
+
+def render_xml_report(tester: dict[str, str], inputs: dict[str, str], passes: int = 5) -> str:
+    names = ["Pass", "Result", "Profit", "Profit Factor", "Recovery Factor", "Sharpe Ratio", "Trades"] + list(inputs)
+    head = "".join(f'<Cell><Data ss:Type="String">{n}</Data></Cell>' for n in names)
+    rows = []
+    for i in range(passes):
+        m = synthetic_metrics(f"{sorted(inputs.items())}#{i}")
+        vals = [i, m["Total Net Profit"] + 10000, m["Total Net Profit"], m["Profit Factor"],
+                m["Recovery Factor"], m["Sharpe Ratio"], m["Total Trades"]]
+        vals += [v.split("||", 1)[0] for v in inputs.values()]
+        rows.append("<Row>" + "".join(f'<Cell><Data ss:Type="Number">{v}</Data></Cell>' for v in vals) + "</Row>")
+    return ('<?xml version="1.0"?>\n<Workbook xmlns="urn:schemas-microsoft-com:office:spreadsheet" '
+            'xmlns:ss="urn:schemas-microsoft-com:office:spreadsheet">\n<Worksheet ss:Name="Tester Optimizator Results">'
+            f"<Table>\n<Row>{head}</Row>\n" + "\n".join(rows) + "\n</Table></Worksheet></Workbook>\n")
+
+def emit_passes(root: Path, tester: dict[str, str], inputs: dict[str, str], passes: int, dur: float):
+    '''Passes de otimização ao longo de `dur` segundos: log do tester (UTF-16) e frames JSON.'''
+    log = root / "Tester" / "logs" / time.strftime("%Y%m%d.log")
+    log.parent.mkdir(parents=True, exist_ok=True)
+    frames = None
+    if os.environ.get("FAKE_MT5_FRAMES") == "1":
+        ea = tester.get("Expert", "EA").replace("/", "\\").rsplit("\\", 1)[-1].removesuffix(".ex5")
+        frames = root / "MQL5" / "Files" / f"mtcli_frames_{ea}.jsonl"
+        frames.parent.mkdir(parents=True, exist_ok=True)
+        frames.write_text("", encoding="ascii")  # OnTesterInit trunca
+    for i in range(passes):
+        time.sleep(dur / passes)
+        combo = {k: v.split("||", 1)[0] for k, v in inputs.items()}
+        combo["Pass"] = str(i)
+        m = synthetic_metrics(f"{sorted(combo.items())}")
+        result = m["Total Net Profit"] + 10000
+        with log.open("ab") as fh:
+            fh.write(f"CS\t0\t{time.strftime('%H:%M:%S')}.000\tCore 1\tpass {i} returned result {result:.2f} "
+                     f"in 0:00:00.{i % 1000:03d}\r\n".encode("utf-16-le"))
+        if frames:
+            rec = {"pass": i, "metrics": dict(m, Result=result), "inputs": combo}
+            with frames.open("a", encoding="ascii") as fh:
+                fh.write(json.dumps(rec) + "\r\n")
+
+def fake_terminal(argv: list[str]) -> int:
+    sw = _switches(argv)
+    dur = _env_float("FAKE_MT5_DURATION", 0.05)
+    jitter = _env_float("FAKE_MT5_JITTER", 0.0)
+    if jitter:
+        dur = max(0.0, dur + random.uniform(-jitter, jitter))
+    ini = sw.get("config")
+    tester, inputs = {}, {}
+    if ini and Path(ini).exists():
+        sections = read_ini(Path(ini))
+        tester = sections.get("Tester", {})
+        inputs = sections.get("TesterInputs", {})
+    root = Path(os.environ.get("FAKE_MT5_ROOT") or Path.cwd())
+    passes = int(_env_float("FAKE_MT5_PASSES", 0))
+    if passes and tester.get("Optimization", "0") != "0":
+        emit_passes(root, tester, inputs, passes, dur)
+    else:
+        time.sleep(dur)
+    report = tester.get("Report", "").replace("\\\\", "\\")
+    if report:
+        rel = report.lstrip("\\").replace("\\", "/")
+        out = root / rel
+        if not out.suffix:
+            out = out.with_suffix(".xml" if tester.get("Optimization", "0") != "0" else ".htm")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        if tester.get("ReplaceReport", "0") == "1" or not out.exists():
+            if out.suffix.lower() == ".xml":
+                out.write_text(render_xml_report(tester, inputs), encoding="utf-8")
+            else:
+                seed = f"{tester.get('Expert')}|{tester.get('Symbol')}|{sorted(inputs.items())}"
+                out.write_text(render_html_report(tester, synthetic_metrics(seed)), encoding="utf-16")
+    return int(os.environ.get("FAKE_MT5_RC", "0"))
+
+def fake_metaeditor(argv: list[str]) -> int:
+    sw = _switches(argv)
+    time.sleep(_env_float("FAKE_ME_DURATION", 0.02))
+    src = sw.get("compile")
+    rc = int(os.environ.get("FAKE_ME_RC", "0"))
+    if not src:
+        return 1
+    path = Path(src)
+    digest = hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else ""
+    if rc == 0 and "s" not in sw and path.exists():
+        path.with_suffix(".ex5").write_bytes(b"EX5\x00" + digest.encode("ascii"))
+    log = sw.get("log")
+    if log:
+        status = "0 errors, 0 warnings" if rc == 0 else "1 errors, 0 warnings"
+        Path(log).write_text(f"{path.name} : {status}\n", encoding="utf-16")
+    return rc
+
+PERIOD_SECONDS = {"M1": 60, "M2": 120, "M3": 180, "M4": 240, "M5": 300, "M6": 360, "M10": 600, "M12": 720,
+                  "M15": 900, "M20": 1200, "M30": 1800, "H1": 3600, "H2": 7200, "H3": 10800, "H4": 14400,
+                  "H6": 21600, "H8": 28800, "H12": 43200, "D1": 86400, "W1": 604800, "MN1": 2592000}
+
+def _price(sym: str, t: float) -> float:
+    base = 1.0 + int(hashlib.sha1(sym.encode("utf-8")).hexdigest()[:4], 16) / 65536
+    return round(base + 0.01 * math.sin(t / 86400) + 0.001 * math.sin(t / 977), 5)
+
+def synthetic_rates(sym: str, tf: str, start: int, end: int) -> bytes:
+    '''MqlRates[] (pack 1) determinísticos de start até end (exclusivo), sem fins de semana.'''
+    step = PERIOD_SECONDS.get(tf.upper(), 60)
+    out = bytearray()
+    for t in range(-(-start // step) * step, end, step):
+        if time.gmtime(t).tm_wday >= 5:
+            continue
+        o, c = _price(sym, t), _price(sym, t + step)
+        out += struct.pack("<qddddqiq", t, o, max(o, c) + 0.0002, min(o, c) - 0.0002, c, 100 + t % 57, 12, 0)
+    return bytes(out)
+
+def synthetic_ticks(sym: str, start: int, end: int) -> bytes:
+    '''MqlTick[] (pack 1) determinísticos, um a cada 10 s de start até end, sem fins de semana.'''
+    out = bytearray()
+    for t in range(-(-start // 10) * 10, end, 10):
+        if time.gmtime(t).tm_wday >= 5:
+            continue
+        bid = _price(sym, t)
+        out += struct.pack("<qdddQqId", t, bid, round(bid + 0.00012, 5), 0.0, 0, t * 1000 + t % 1000, 6, 0.0)
+    return bytes(out)
+
+def _export(files: Path, parts: list[str]):
+    '''EXPORT_RATES|EXPORT_TICKS;SYM;TF;from;to;file -> file.part renomeado para file (como o EA).'''
+    if len(parts) < 6:
+        return
+    cmd, sym, tf, start, end, name = parts[:6]
+    raw = (synthetic_ticks(sym, int(start), int(end)) if cmd == "EXPORT_TICKS"
+           else synthetic_rates(sym, tf, int(start), int(end)))
+    part = files / f"{name}.part"
+    part.write_bytes(raw)
+    os.replace(part, files / name)
+
+LISTENER_COMMANDS = ("APPLY_TPL", "ATTACH_IND", "DETACH_IND", "ATTACH_EA", "DETACH_EA", "EXPORT_RATES", "EXPORT_TICKS")
+
+def fake_listener(argv: list[str]) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(prog="fake_mt5.py listener")
+    ap.add_argument("--data-dir", required=True)
+    ap.add_argument("--once", action="store_true", help="Sai após o primeiro comando")
+    ap.add_argument("--timeout", type=float, default=0.0, help="Sai após N segundos (0 = nunca)")
+    ap.add_argument("--poll", type=float, default=0.05)
+    a = ap.parse_args(argv)
+    files = Path(a.data_dir) / "MQL5" / "Files"
+    logs = Path(a.data_dir) / "MQL5" / "Logs"
+    files.mkdir(parents=True, exist_ok=True)
+    logs.mkdir(parents=True, exist_ok=True)
+    cmdfile = files / "cmd.txt"
+    deadline = time.time() + a.timeout if a.timeout else None
+    while deadline is None or time.time() < deadline:
+        if cmdfile.exists():
+            line = cmdfile.read_text(encoding="ascii", errors="replace").strip()
+            parts = line.split(";")
+            if parts[0] in ("EXPORT_RATES", "EXPORT_TICKS"):
+                _export(files, parts)
+            # Como o EA: cmd.ack (OK|ERR, mensagem, comando) antes de apagar cmd.txt.
+            fail = "" if parts[0] in LISTENER_COMMANDS else f"Comando desconhecido: {line}"
+            (files / "cmd.ack").write_text(f"{'ERR' if fail else 'OK'}\n{fail}\n{line}\n", encoding="latin-1")
+            cmdfile.unlink()
+            stamp = time.strftime("%H:%M:%S")
+            with (logs / time.strftime("%Y%m%d.log")).open("a", encoding="utf-8") as fh:
+                fh.write(f"{stamp} CommandListenerEA: {line}\n")
+            if a.once:
+                return 0
+        time.sleep(a.poll)
+    return 0
+
+def fake_service(argv: list[str]) -> int:
+    import argparse, signal
+    ap = argparse.ArgumentParser(prog="fake_mt5.py service")
+    ap.add_argument("--log", default=str(Path(__file__).resolve().parent / "bin" / "logs" / "gpu_service.log"))
+    ap.add_argument("--health-file")
+    a = ap.parse_args(argv)
+    log = Path(a.log)
+    log.parent.mkdir(parents=True, exist_ok=True)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    def emit(msg: str):
+        with log.open("a", encoding="utf-8") as fh:
+            fh.write(f"{time.strftime('%H:%M:%S')} [{os.getpid()}] {msg}\n")
+
+    emit("Gen4EngineService starting")
+    time.sleep(_env_float("FAKE_SVC_READY_DELAY", 0.2))
+    emit("Service ready")
+    crash_after = os.environ.get("FAKE_SVC_CRASH_AFTER")
+    deadline = time.time() + float(crash_after) if crash_after else None
+    while deadline is None or time.time() < deadline:
+        if a.health_file:
+            Path(a.health_file).write_text(str(time.time()), encoding="ascii")
+        time.sleep(0.1)
+    emit("Gen4EngineService crashed")
+    return int(os.environ.get("FAKE_SVC_RC", "3"))
+
+MODES = {"terminal": fake_terminal, "metaeditor": fake_metaeditor, "listener": fake_listener,
+         "service": fake_service}
+
+def main(argv: list[str]|None = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in MODES:
+        print(f"uso: fake_mt5.py {{{'|'.join(MODES)}}} ...", file=sys.stderr)
+        return 2
+    return MODES[argv[0]](argv[1:])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# run_bench.py — benchmarks do mtcli contra o MT5 falso (bench/fake_mt5.py)
+#
+#   python bench/run_bench.py                      # roda tudo e imprime a tabela
+#   python bench/run_bench.py --only ini_render log_tail
+#   python bench/run_bench.py --json out.json      # salva resultados
+#   python bench/run_bench.py --compare base.json --max-regression 0.25   # gate p/ CI
+#
+# Só usa a stdlib: cada cenário roda `--repeat` vezes e reporta a mediana (ms).
+import argparse, json, os, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO = BENCH_DIR.parent
+FAKE_BIN = BENCH_DIR / "bin"
+sys.path.insert(0, str(REPO))
+
+from mtcli import env, ini, listener, util  # noqa: E402
+
+SAMPLE_BASE = {
+    "ea": "Examples\\MACD\\MACD Sample", "symbol": "EURUSD", "period": "M15",
+    "model": "everytick", "opt": "off", "date_from": "2024.01.01", "date_to": "2024.03.01",
+    "replace_report": True, "shutdown": True, "inputs": {"Lots": 0.1},
+}
+
+def _isolated_env(tmp: Path, **extra) -> dict:
+    env = os.environ.copy()
+    env["HOME"] = str(tmp / "home")  # ~/.mtcli isolado
+    env.pop("MTCLI_TRACE", None)
+    env.update({k: str(v) for k, v in extra.items()})
+    return env
+
+def bench_ini_render(tmp: Path, n: int = 2000) -> dict:
+    t0 = time.perf_counter()
+    for i in range(n):
+        inputs = dict(SAMPLE_BASE["inputs"], Risk=0.5 + i % 10, Reverse=bool(i % 2))
+        ini.build_batch_ini(SAMPLE_BASE, inputs, f"\\reports\\b_{i}.htm")
+    dt = time.perf_counter() - t0
+    return {"ms": dt * 1000, "per_op_us": dt / n * 1e6, "ops": n}
+
+def bench_ini_write(tmp: Path, n: int = 300) -> dict:
+    content = ini.build_batch_ini(SAMPLE_BASE, {"Lots": 0.1, "Risk": 1.0}, "\\reports\\x.htm")
+    out = tmp / "inis"
+    t0 = time.perf_counter()
+    for i in range(n):
+        util.write_text_utf16(out / f"b_{i:04d}.ini", content)
+    dt = time.perf_counter() - t0
+    return {"ms": dt * 1000, "per_op_us": dt / n * 1e6, "ops": n}
+
+def bench_path_conversion(tmp: Path, n: int = 5000) -> dict:
+    paths = [r"C:\Users\me\AppData\Roaming\MetaQuotes\Terminal\ABC\MQL5\Files",
+             "/mnt/c/Users/me/AppData/Roaming/MetaQuotes/Terminal/ABC",
+             r"\\wsl$\Ubuntu\home\me\reports"]
+    t0 = time.perf_counter()
+    for i in range(n):
+        p = paths[i % len(paths)]
+        env.to_local_path(p)
+        env.win_to_wsl(Path(p))
+    dt = time.perf_counter() - t0
+    return {"ms": dt * 1000, "per_op_us": dt / n * 1e6, "ops": n}
+
+def bench_log_tail(tmp: Path, n: int = 50, lines: int = 200_000) -> dict:
+    log = tmp / "big.log"
+    if not log.exists():
+        with log.open("w", encoding="utf-8") as fh:
+            for i in range(lines):
+                fh.write(f"2024.01.01 00:00:{i % 60:02d} CommandListenerEA: linha {i} " + "x" * 40 + "\n")
+    t0 = time.perf_counter()
+    for _ in range(n):
+        listener.tail_lines(log, 20)
+    dt = time.perf_counter() - t0
+    return {"ms": dt * 1000, "per_op_us": dt / n * 1e6, "ops": n, "log_lines": lines}
+
+def bench_cli_startup(tmp: Path, n: int = 5) -> dict:
+    env = _isolated_env(tmp)
+    cmd = [sys.executable, str(REPO / "mtcli.py"), "--terminal", str(FAKE_BIN / "terminal64"),
+           "--metaeditor", str(FAKE_BIN / "metaeditor64"), "--data-dir", str(tmp / "data"), "detect"]
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        samples.append(time.perf_counter() - t0)
+    # -X importtime do próprio 'detect': soma do cumulativo dos imports de nível superior (µs)
+    out = subprocess.run([sys.executable, "-X", "importtime"] + cmd[1:], env=env,
+                         capture_output=True, text=True).stderr
+    import_us = modules = 0
+    for line in out.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        modules += 1
+        if not parts[2].startswith("  "):  # sem indentação = import de nível superior
+            import_us += int(parts[1])
+    return {"ms": statistics.median(samples) * 1000, "import_cumulative_us": import_us,
+            "modules": modules, "ops": n}
+
+def bench_batch_throughput(tmp: Path, combos: int = 20) -> dict:
+    plan = {"base": dict(SAMPLE_BASE, report="\\reports\\bench_{label}.htm"),
+            "grid": {"Risk": [round(0.5 * i, 2) for i in range(1, combos + 1)]}}
+    plan_path = tmp / "plan.json"
+    plan_path.write_text(json.dumps(plan), encoding="utf-8")
+    env = _isolated_env(tmp, FAKE_MT5_DURATION=os.environ.get("FAKE_MT5_DURATION", "0"),
+                        FAKE_MT5_ROOT=tmp / "terminal")
+    cmd = [sys.executable, str(REPO / "mtcli.py"), "--terminal", str(FAKE_BIN / "terminal64"),
+           "--data-dir", str(tmp / "data"), "tester", "batch", "--plan", str(plan_path),
+           "--ini-dir", str(tmp / "batch_inis")]
+    t0 = time.perf_counter()
+    rc = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+    dt = time.perf_counter() - t0
+    reports = len(list((tmp / "terminal" / "reports").glob("bench_*.htm")))
+    return {"ms": dt * 1000, "combos_per_s": combos / dt if dt else 0.0, "ops": combos,
+            "rc": rc, "reports": reports}
+
+SCENARIOS = {
+    "ini_render": bench_ini_render,
+    "ini_write": bench_ini_write,
+    "path_conversion": bench_path_conversion,
+    "log_tail": bench_log_tail,
+    "cli_startup": bench_cli_startup,
+    "batch_throughput": bench_batch_throughput,
+}
+
+def run(names: list[str], repeat: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="mtcli-bench-") as d:
+        tmp = Path(d)
+        (tmp / "data" / "MQL5").mkdir(parents=True)
+        for name in names:
+            runs = [SCENARIOS[name](tmp) for _ in range(repeat)]
+            best = sorted(runs, key=lambda r: r["ms"])[len(runs) // 2]
+            best["ms"] = statistics.median(r["ms"] for r in runs)
+            results[name] = best
+    return results
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list[str]:
+    bad = []
+    for name, res in results.items():
+        ref = baseline.get(name)
+        if not ref or not ref.get("ms"):
+            continue
+        ratio = res["ms"] / ref["ms"]
+        if ratio > 1 + max_regression:
+            bad.append(f"{name}: {ref['ms']:.1f} ms -> {res['ms']:.1f} ms (+{(ratio - 1) * 100:.0f}%)")
+    return bad
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmarks do mtcli com MT5 falso")
+    ap.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="Rodar só estes cenários")
+    ap.add_argument("--repeat", type=int, default=3, help="Repetições por cenário (mediana)")
+    ap.add_argument("--json", help="Salvar resultados neste arquivo")
+    ap.add_argument("--compare", help="JSON de baseline gerado com --json")
+    ap.add_argument("--max-regression", type=float, default=0.25, help="Regressão tolerada (0.25 = 25%%)")
+    a = ap.parse_args()
+
+    results = run(a.only or list(SCENARIOS), max(1, a.repeat))
+    print(f"{'cenário':20s} {'mediana ms':>12s}  extra")
+    for name, res in results.items():
+        extra = ", ".join(f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}"
+                          for k, v in res.items() if k != "ms")
+        print(f"{name:20s} {res['ms']:12.2f}  {extra}")
+    if a.json:
+        Path(a.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if a.compare:
+        bad = compare(results, json.loads(Path(a.compare).read_text(encoding="utf-8")), a.max_regression)
+        for line in bad:
+            print(f"[regressão] {line}")
+        return 1 if bad else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
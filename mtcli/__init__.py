@@ -0,0 +1,5 @@
+# mtcli — CLI para MetaTrader 5 (Windows + WSL)
+#
+# Cada subcomando vive em mtcli/commands/<nome>.py e só é importado quando
+# selecionado na linha de comando (ver COMMANDS em mtcli/cli.py); os fontes
+# MQL5 instalados pelo bootstrap ficam em mtcli/mql5/ e são lidos sob demanda.
@@ -0,0 +1,4 @@
+# python -m mtcli
+from .cli import main
+
+main()
@@ -0,0 +1,84 @@
+# atomic.py — escrita atômica, nomes sem colisão e lock consultivo entre processos
+#
+# Módulo folha (só stdlib): usado por config.py, que não pode importar util/trace.
+# Escrita = arquivo temporário no mesmo diretório + fsync + os.replace: quem lê (o
+# terminal lendo um INI, o EA lendo cmd.txt) vê o arquivo antigo ou o novo, nunca metade.
+import itertools, os, time
+from contextlib import contextmanager
+from pathlib import Path
+
+_seq = itertools.count(1)
+
+def unique_token() -> str:
+    '''<pid>-<n>: único entre processos paralelos e entre threads do mesmo processo.'''
+    return f"{os.getpid()}-{next(_seq)}"
+
+def unique_stamp() -> str:
+    '''Carimbo legível e sem colisão: AAAAMMDD-HHMMSS-<pid>-<n>.'''
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{unique_token()}"
+
+def _replace(src: Path, dst: Path, attempts: int = 20):
+    # Windows: destino aberto por outro processo (o EA lendo cmd.txt) -> PermissionError passageiro.
+    for i in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if i == attempts - 1:
+                raise
+            time.sleep(0.01 * (i + 1))
+
+def atomic_write(path: Path, data: bytes, fsync: bool = True):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{unique_token()}.tmp")
+    try:
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        _replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+if os.name == "nt":
+    import msvcrt
+
+    def _try_lock(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+
+    def _unlock(fh):
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _try_lock(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock(fh):
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def file_lock(path: Path, timeout: float = 10.0):
+    '''Lock exclusivo consultivo em `path` (arquivo .lock à parte; só vale entre quem o usa).'''
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as fh:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                _try_lock(fh)
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"[-] Lock ocupado há {timeout:.0f}s: {path}")
+                time.sleep(0.02)
+        try:
+            yield
+        finally:
+            _unlock(fh)
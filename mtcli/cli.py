@@ -0,0 +1,168 @@
+# cli.py — parser e despacho do mtcli
+#
+# Só o módulo do subcomando escolhido é importado: os demais entram no parser
+# como stubs (nome + help) para o 'mtcli --help' continuar listando tudo.
+import argparse, importlib, os, sys
+from .output import MODES, emit, finish, set_command, set_output, stdout_closed, structured
+
+# nome -> (módulo em mtcli/commands, help)
+COMMANDS = {
+    "detect": ("detect", "Detecta caminhos padrão"),
+    "config": ("config", "Gerenciar defaults do mtcli"),
+    "bootstrap": ("bootstrap", "Prepara instância: CommandListenerEA, scripts e pastas"),
+    "instance": ("instance", "Registrar/clonar instâncias (seletores para --instances)"),
+    "profile": ("profile", "Gerenciar perfis"),
+    "template": ("template", "Gerar templates (.tpl)"),
+    "open": ("open_terminal", "Abrir MT5 com perfil/template/EA/Script"),
+    "listener": ("listener", "Instalar/rodar EA escutador e enviar comandos"),
+    "chart": ("chart", "Operações diretas via CommandListenerEA"),
+    "gen4": ("gen4", "Integração com o serviço Gen4"),
+    "script": ("script", "Instalar scripts de apoio"),
+    "tester": ("tester", "Executar Strategy Tester/otimização"),
+    "pipeline": ("pipeline", "Compilar variantes e testar em estágios sobrepostos"),
+    "data": ("data", "Exportar barras/ticks para o cache local"),
+    "metaeditor": ("metaeditor", "Ações do MetaEditor via CLI"),
+    "trace": ("trace", "Analisar spans gravados com --profile/MTCLI_TRACE"),
+}
+# Opções globais que consomem o próximo argumento (para achar o subcomando no argv).
+_GLOBAL_VALUE_OPTS = {"--terminal", "--metaeditor", "--data-dir", "--trace-file", "--instances", "--ack-timeout", "--output"}
+_GLOBAL_FLAG_OPTS = {"--help", "--profile"}
+
+def global_option(arg: str) -> str:
+    '''Nome completo de uma opção global abreviada (--data-d -> --data-dir), como o argparse aceita.'''
+    if arg in _GLOBAL_VALUE_OPTS or not arg.startswith("--"):
+        return arg
+    matches = [o for o in _GLOBAL_VALUE_OPTS | _GLOBAL_FLAG_OPTS if o.startswith(arg)]
+    return matches[0] if len(matches) == 1 else arg
+
+def selected_command(argv: list[str]) -> str|None:
+    '''Primeiro argumento posicional do argv (o subcomando), pulando as opções globais.'''
+    skip = False
+    for a in argv:
+        if skip:
+            skip = False
+        elif global_option(a) in _GLOBAL_VALUE_OPTS:
+            skip = True
+        elif not a.startswith("-"):
+            return a
+    return None
+
+def output_mode(argv: list[str]) -> str:
+    '''--output do argv (ou $MTCLI_OUTPUT), lido antes do parse para que erros de uso também saiam em JSON.'''
+    for i, a in enumerate(argv):
+        name, eq, value = a.partition("=")
+        if global_option(name) != "--output":
+            continue
+        if not eq:
+            value = argv[i + 1] if i + 1 < len(argv) else ""
+        if value in MODES:
+            return value
+    return os.environ.get("MTCLI_OUTPUT") or "text"
+
+class ArgumentParser(argparse.ArgumentParser):
+    '''Erros de uso viram registros "error" + "exit" (rc 2) com --output json/jsonl.'''
+
+    def error(self, message: str):
+        if not structured():
+            super().error(message)
+        if " " in self.prog:
+            set_command(self.prog.partition(" ")[2])  # "mtcli tester batch" -> "tester batch"
+        emit("error", message=f"{self.prog}: {message}", usage=self.format_usage().strip())
+        self.exit(2)
+
+def load_command(name: str):
+    return importlib.import_module(f".commands.{COMMANDS[name][0]}", __package__)
+
+def build_parser(argv: list[str]) -> argparse.ArgumentParser:
+    p = ArgumentParser(prog="mtcli", description="CLI para MetaTrader 5 (Windows + WSL)")
+    p.add_argument("--terminal", help="Caminho para terminal64.exe")
+    p.add_argument("--metaeditor", help="Caminho para metaeditor64.exe")
+    p.add_argument("--data-dir", help="Caminho para a Data Folder (…\\MetaQuotes\\Terminal\\<id>)")
+    p.add_argument("--instances", help="Comandos do listener/chart em várias instâncias: all, tag:<tag>, "
+                                        "nome ou glob (vírgula une); ver 'mtcli instance list'")
+    p.add_argument("--ack-timeout", type=float, default=15.0,
+                   help="--instances: tempo máx. (s) para todas as instâncias confirmarem")
+    p.add_argument("--output", choices=MODES,
+                   help="text (padrão), jsonl (um registro JSON por linha, em tempo real) ou json "
+                        "(array no fim). Padrão: $MTCLI_OUTPUT")
+    p.add_argument("--profile", dest="trace_profile", action="store_true",
+                   help="Grava spans de tempo e imprime resumo p50/p95 no stderr ao final")
+    p.add_argument("--trace-file", help="Arquivo de spans (.json = Chrome trace; outro = JSON lines). "
+                                        "Padrão: $MTCLI_TRACE ou ~/.mtcli/traces/")
+    sub = p.add_subparsers(dest="cmd")
+    chosen = selected_command(argv)
+    for name, (_, help_text) in COMMANDS.items():
+        sp = sub.add_parser(name, help=help_text)
+        if name == chosen:
+            load_command(name).register(sp)
+            tag_command_paths(sp, name)
+    return p
+
+def tag_command_paths(parser: argparse.ArgumentParser, path: str):
+    '''args.cmd_path = "tester batch", "chart expert attach"...: o "cmd" dos registros JSON.'''
+    parser.set_defaults(cmd_path=path)
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            for name, sp in action.choices.items():
+                tag_command_paths(sp, f"{path} {name}")
+
+def main(argv: list[str]|None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    set_output(output_mode(argv), selected_command(argv) or "detect")
+    try:
+        p = build_parser(argv)
+
+        # Se nenhum subcomando for passado, mostra help + exemplos
+        if not argv:
+            p.print_help()
+            print("\nExemplos rápidos:")
+            print("  mtcli detect")
+            print("  mtcli open --symbol EURUSD --period M15 --template MeuTemplate.tpl")
+            print("  mtcli tester run --ea Examples\\MACD\\MACD Sample --symbol EURUSD --period M1 --visual --date-from 2024.01.01 --date-to 2024.06.01 --report \\reports\\run_{ts}.htm --replace-report --shutdown")
+            sys.exit(0)
+
+        args = p.parse_args(argv)
+        if not hasattr(args, "func"):
+            # Sem subcomando explícito, assume detect
+            from .commands.detect import cmd_detect
+            args.func = cmd_detect
+        set_command(getattr(args, "cmd_path", "detect"))
+        run_command(args)
+    except SystemExit as exc:
+        if not structured():
+            raise
+        code = exc.code
+        if code is not None and not isinstance(code, int):
+            emit("error", message=str(code))
+            code = 1
+        finish(code or 0)
+        sys.exit(code)
+    except BrokenPipeError:
+        stdout_closed()  # texto: print() no pipe fechado
+        sys.exit(1)
+    except BaseException as exc:
+        if structured():
+            emit("error", message=f"{type(exc).__name__}: {exc}")
+            finish(1)
+        raise
+    finish(0)
+
+def run_command(args):
+    '''Executa args.func dentro de um span raiz quando o trace está ativo.'''
+    target = args.trace_file or os.environ.get("MTCLI_TRACE") or None
+    summary = args.trace_profile
+    if not (target or summary) or getattr(args, "no_trace", False):
+        args.func(args)
+        return
+    from .trace import TRACE_DIR, print_trace_summary, read_trace_events, span, summarize_trace, trace_enable
+    from .util import ts_now
+    if not target:
+        target = TRACE_DIR / f"trace-{ts_now()}-{os.getpid()}.jsonl"
+    path = trace_enable(target)
+    try:
+        with span("cmd", argv=" ".join(sys.argv[1:])):
+            args.func(args)
+    finally:
+        if summary:
+            print(f"[trace] {path}", file=sys.stderr)
+            print_trace_summary(summarize_trace(read_trace_events(path)), file=sys.stderr)
@@ -0,0 +1,119 @@
+# clone.py — cópias de uma instância (Data Folder ou instalação portable) para workers paralelos
+#
+# O plano classifica cada arquivo da origem uma única vez:
+#   link  histórico (bases/), .ex5/.exe/.dll: volumosos ->
+#         reflink (cópia copy-on-write: btrfs/xfs); sem reflink, cópia
+#   copy  configuração, perfis, fontes, MQL5/Files: cada clone tem a sua
+#   skip  logs e Tester/ (agentes, cache): recriados pelo terminal no clone
+# O terminal reescreve o histórico no lugar ao sincronizar, e .ex5/.dll são
+# recompilados/implantados por instância: nada disso é imutável. Hardlink (mesmo
+# inode) só com --mode hardlink explícito, e nunca para .ex5/.dll.
+import json, os, shutil, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .atomic import atomic_write
+from .util import ensure_dir
+
+LINK_DIRS = ("bases",)
+LINK_SUFFIXES = (".ex5", ".exe", ".dll", ".hcc", ".hc", ".tkc")
+REFLINK_ONLY_SUFFIXES = (".ex5", ".dll")
+SKIP_DIRS = ("logs", "Tester", "MQL5/Logs")
+CLONE_STAMP = ".mtcli-clone.json"
+MODES = ("auto", "reflink", "hardlink", "copy")
+
+def classify(rel: str) -> str:
+    parts = rel.split("/")
+    if any(rel == d or rel.startswith(d + "/") for d in SKIP_DIRS) or parts[-1] == CLONE_STAMP:
+        return "skip"
+    if parts[0] in LINK_DIRS or rel.lower().endswith(LINK_SUFFIXES):
+        return "link"
+    return "copy"
+
+def build_plan(src: Path) -> list[tuple[str, str, int]]:
+    '''(caminho relativo, link|copy, bytes) de cada arquivo da origem (skip já filtrado).'''
+    plan = []
+    for root, dirs, files in os.walk(src):
+        rel_root = Path(root).relative_to(src).as_posix()
+        rel_root = "" if rel_root == "." else rel_root + "/"
+        dirs[:] = [d for d in dirs if classify(rel_root + d) != "skip"]
+        for name in files:
+            rel = rel_root + name
+            action = classify(rel)
+            if action != "skip":
+                plan.append((rel, action, os.stat(os.path.join(root, name)).st_size))
+    return plan
+
+def _reflink(src: str, dst: str):
+    import fcntl
+    FICLONE = 0x40049409  # linux/fs.h
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+
+def link_file(src: str, dst: str, mode: str, hardlink: bool = True) -> str:
+    '''Vincula/copia um arquivo; retorna o método usado (reflink|hardlink|copy).'''
+    if mode in ("auto", "reflink") and hasattr(os, "uname"):
+        try:
+            _reflink(src, dst)
+            return "reflink"
+        except OSError as exc:
+            try:
+                os.unlink(dst)
+            except OSError:
+                pass
+            if mode == "reflink":
+                raise SystemExit(f"[-] reflink indisponível neste sistema de arquivos ({exc.strerror}). Use --mode hardlink/copy.")
+    if hardlink and mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as exc:
+            raise SystemExit(f"[-] hardlink falhou ({exc.strerror}): {src}. Use --mode auto/copy.")
+    shutil.copy2(src, dst)
+    return "copy"
+
+def clone_instance(src: Path, dst: Path, plan: list[tuple[str, str, int]], mode: str) -> dict:
+    t0 = time.perf_counter()
+    stats = {"dst": dst, "reflink": 0, "hardlink": 0, "copy": 0, "linked_bytes": 0, "copied_bytes": 0}
+    made: set[str] = set()
+    for rel, action, size in plan:
+        parent = rel.rpartition("/")[0]
+        if parent not in made:
+            ensure_dir(dst / parent)
+            made.add(parent)
+        s, d = str(src / rel), str(dst / rel)
+        if action == "link":
+            how = link_file(s, d, mode, hardlink=not rel.lower().endswith(REFLINK_ONLY_SUFFIXES))
+        else:
+            shutil.copy2(s, d)
+            how = "copy"
+        stats[how] += 1
+        stats["linked_bytes" if how != "copy" else "copied_bytes"] += size
+    atomic_write(dst / CLONE_STAMP, json.dumps({"source": str(src), "mode": mode, "files": len(plan),
+                                                "created": time.strftime("%Y-%m-%d %H:%M:%S")}, indent=2).encode("utf-8"))
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+def verify_clone(src: Path, dst: Path, plan: list[tuple[str, str, int]]) -> list[str]:
+    '''Problemas encontrados no clone (vazio = ok): arquivo ausente, tamanho diferente.'''
+    problems = []
+    for rel, action, size in plan:
+        try:
+            st = os.stat(dst / rel)
+        except OSError:
+            problems.append(f"ausente: {rel}")
+            continue
+        if st.st_size != size:
+            problems.append(f"tamanho {st.st_size} != {size}: {rel}")
+    return problems
+
+def clone_many(src: Path, dests: list[Path], mode: str = "auto", parallel: int = 4) -> tuple[list, list[dict]]:
+    '''Planeja uma vez e cria os clones em paralelo; retorna (plano, estatísticas por clone).'''
+    plan = build_plan(src)
+
+    def one(dst: Path) -> dict:
+        stats = clone_instance(src, dst, plan, mode)
+        stats["problems"] = verify_clone(src, dst, plan)
+        return stats
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        return plan, list(pool.map(one, dests))
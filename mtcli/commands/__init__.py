@@ -0,0 +1 @@
+# commands — um módulo por subcomando; cada um expõe register(parser) (ver COMMANDS em mtcli/cli.py)
@@ -0,0 +1,50 @@
+# commands/bootstrap.py — mtcli bootstrap
+import sys, time
+from pathlib import Path
+from ..instance import bootstrap_all, bootstrap_instance
+from ..env import find_data_dirs, resolve_paths, terminal_data_root, to_local_path, to_windows_path
+from ..output import emit
+
+def cmd_bootstrap(args):
+    _, metaeditor, data_dir = resolve_paths(args)
+    if args.all_instances:
+        cmd_bootstrap_all(args, metaeditor, data_dir)
+        return
+    if not data_dir:
+        raise SystemExit("Data Folder não configurada. Use --data-dir ou 'mtcli config set data_dir'.")
+    bootstrap_instance(metaeditor, data_dir, force=args.force, quiet=False, rebuild=args.rebuild)
+    emit("bootstrap_done", "[bootstrap] Finalizado.", data_dir=data_dir)
+
+def cmd_bootstrap_all(args, metaeditor: Path|None, data_dir: Path|None):
+    if args.root:
+        root = to_local_path(args.root)
+    else:
+        root = to_local_path(terminal_data_root())
+        if not root.exists() and data_dir:
+            root = to_local_path(data_dir).parent
+    dirs = find_data_dirs(root)
+    if not dirs:
+        raise SystemExit(f"Nenhuma Data Folder (com MQL5/) em {root}. Use --root.")
+    emit("bootstrap_start", f"[bootstrap] {len(dirs)} instância(s) em {to_windows_path(root)}",
+         root=root, instances=len(dirs))
+    t0 = time.perf_counter()
+    rows = bootstrap_all(metaeditor, dirs, parallel=args.parallel, force=args.force, rebuild=args.rebuild)
+    counts: dict[str, int] = {}
+    for row in rows:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+        emit("bootstrap_instance", f"  {row['status']:14s} {row['key'][:12]}  {row['seconds']:6.2f}s  {row['data_dir'].name}",
+             data_dir=row["data_dir"], status=row["status"], key=row["key"], seconds=round(row["seconds"], 3))
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    seconds = time.perf_counter() - t0
+    emit("bootstrap_done", f"[bootstrap] Finalizado em {seconds:.2f}s: {summary}.", counts=counts, seconds=round(seconds, 3))
+    if counts.get("falhou") or counts.get("sem metaeditor"):
+        sys.exit(1)
+
+def register(p):
+    p.add_argument("--force", action="store_true", help="Sobrescreve fontes mesmo se existirem")
+    p.add_argument("--rebuild", action="store_true", help="Recompila mesmo com .ex5 em dia/no cache")
+    p.add_argument("--all-instances", action="store_true",
+                   help="Todas as Data Folders sob MetaQuotes\\Terminal (compila uma vez por hash do fonte)")
+    p.add_argument("--root", help="--all-instances: pasta com as Data Folders (padrão: %%APPDATA%%\\MetaQuotes\\Terminal)")
+    p.add_argument("--parallel", type=int, default=4, help="--all-instances: compilações/cópias simultâneas")
+    p.set_defaults(func=cmd_bootstrap)
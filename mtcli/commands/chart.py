@@ -0,0 +1,143 @@
+# commands/chart.py — mtcli chart indicator|expert|send
+import time
+from ..listener import print_log_tail, send_listener_command, send_to_instances, wait_listener_idle
+from ..env import resolve_paths, to_windows_path
+from ..output import emit
+from ..tplcache import TemplateEngine, load_chart_plan, parse_inputs
+from ..util import timeframe_ok
+
+def emit_sent(line: str, cmdfile, data_dir):
+    emit("command_sent", f"[cmd] {line}\n[cmd] escrito em {to_windows_path(cmdfile)}",
+         payload=line, cmdfile=cmdfile, data_dir=data_dir)
+
+def chart_indicator_attach(args):
+    line = f"ATTACH_IND;{args.symbol};{timeframe_ok(args.period)};{args.indicator};{args.subwindow}"
+    if args.instances:
+        return send_to_instances(args, [line])
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    cmdfile = send_listener_command(data_dir, line)
+    emit_sent(line, cmdfile, data_dir)
+    time.sleep(0.5)
+    print_log_tail("chart indicator attach", data_dir=data_dir)
+
+def chart_indicator_detach(args):
+    sub = args.subwindow if args.subwindow is not None else 0
+    line = f"DETACH_IND;{args.symbol};{timeframe_ok(args.period)};{args.indicator};{sub}"
+    if args.instances:
+        return send_to_instances(args, [line])
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    cmdfile = send_listener_command(data_dir, line)
+    emit_sent(line, cmdfile, data_dir)
+    time.sleep(0.5)
+    print_log_tail("chart indicator detach", data_dir=data_dir)
+
+def chart_raw_send(args):
+    line = args.payload
+    if args.instances:
+        return send_to_instances(args, [line])
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    cmdfile = send_listener_command(data_dir, line)
+    emit_sent(line, cmdfile, data_dir)
+    time.sleep(0.5)
+    print_log_tail("chart raw", data_dir=data_dir)
+
+def expert_attach_lines(engine: TemplateEngine, charts: list[dict]) -> list[str]:
+    lines = []
+    for chart in charts:
+        tpl_name = chart.get("template")
+        if not tpl_name:
+            tpl_name, _ = engine.ensure(chart["expert"], chart.get("preset"), chart.get("inputs"), chart.get("base"))
+        lines.append(f"ATTACH_EA;{chart['symbol']};{timeframe_ok(chart['period'])};{chart['expert']};{tpl_name}")
+    return lines
+
+def chart_expert_attach(args):
+    if args.plan:
+        charts = load_chart_plan(args.plan)
+    elif args.symbol and args.period and args.expert:
+        charts = [{"symbol": args.symbol, "period": args.period, "expert": args.expert, "preset": args.preset,
+                   "inputs": parse_inputs(args.input), "base": args.base, "template": args.template}]
+    else:
+        raise SystemExit("Informe --symbol, --period e --expert (ou --plan).")
+    if args.instances:
+        # Template gerado em cada instância (a base pode variar); mesmo conteúdo = mesmo nome.
+        return send_to_instances(args, None, build=lambda d: expert_attach_lines(TemplateEngine(d), charts))
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    engine = TemplateEngine(data_dir)
+    for i, chart in enumerate(charts):
+        tpl_name = chart.get("template")
+        if not tpl_name:
+            tpl_name, status = engine.ensure(chart["expert"], chart.get("preset"), chart.get("inputs"), chart.get("base"))
+            emit("template", f"[tpl] {tpl_name} ({status})", name=tpl_name, status=status, expert=chart["expert"])
+        line = f"ATTACH_EA;{chart['symbol']};{timeframe_ok(chart['period'])};{chart['expert']};{tpl_name}"
+        # Um comando por ciclo do EA: espera o anterior ser lido antes de sobrescrever cmd.txt.
+        if i and not wait_listener_idle(data_dir, args.timeout):
+            raise SystemExit(f"[-] cmd.txt não foi consumido em {args.timeout:.0f}s. O CommandListenerEA está rodando?")
+        cmdfile = send_listener_command(data_dir, line)
+        emit("command_sent", f"[cmd] {line}", payload=line, cmdfile=cmdfile, data_dir=data_dir)
+    emit("command_file", f"[cmd] escrito em {to_windows_path(cmdfile)}", cmdfile=cmdfile)
+    time.sleep(1.0)
+    print_log_tail("chart expert attach", data_dir=data_dir)
+
+def chart_expert_detach(args):
+    line = f"DETACH_EA;{args.symbol};{timeframe_ok(args.period)}"
+    if args.instances:
+        return send_to_instances(args, [line])
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    cmdfile = send_listener_command(data_dir, line)
+    emit_sent(line, cmdfile, data_dir)
+    time.sleep(0.5)
+    print_log_tail("chart expert detach", data_dir=data_dir)
+
+def register(p):
+    chart_sub = p.add_subparsers(dest="chart_cmd", required=True)
+
+    ci = chart_sub.add_parser("indicator", help="Anexar/remover indicadores")
+    ci_sub = ci.add_subparsers(dest="indicator_cmd", required=True)
+
+    cia = ci_sub.add_parser("attach", help="Anexar indicador (sem reiniciar MT5)")
+    cia.add_argument("--symbol", required=True)
+    cia.add_argument("--period", required=True)
+    cia.add_argument("--indicator", required=True)
+    cia.add_argument("--subwindow", type=int, default=0)
+    cia.set_defaults(func=chart_indicator_attach)
+
+    cid = ci_sub.add_parser("detach", help="Remover indicador")
+    cid.add_argument("--symbol", required=True)
+    cid.add_argument("--period", required=True)
+    cid.add_argument("--indicator", required=True)
+    cid.add_argument("--subwindow", type=int, default=0)
+    cid.set_defaults(func=chart_indicator_detach)
+
+    craw = chart_sub.add_parser("send", help="Enviar payload cru ao CommandListener (cmd.txt)")
+    craw.add_argument("payload", help="Linha completa (ex.: ATTACH_IND;... )")
+    craw.set_defaults(func=chart_raw_send)
+
+    ce = chart_sub.add_parser("expert", help="Anexar/remover EA (template gerado e reaproveitado por hash)")
+    ce_sub = ce.add_subparsers(dest="expert_cmd", required=True)
+
+    cea = ce_sub.add_parser("attach", help="Anexar EA via template (ATTACH_EA)")
+    cea.add_argument("--symbol")
+    cea.add_argument("--period")
+    cea.add_argument("--expert", help="EA relativo a MQL5\\Experts")
+    cea.add_argument("--preset", help="Preset .set (em MQL5\\Profiles\\Tester ou caminho)")
+    cea.add_argument("--input", action="append", help="Input do EA Nome=valor (repetível; vence o preset)")
+    cea.add_argument("--base", help="Template base (.tpl em MQL5\\Profiles\\Templates ou caminho)")
+    cea.add_argument("--template", help="Usar este .tpl pronto (não gera)")
+    cea.add_argument("--plan", help="JSON com vários gráficos (symbol/period/expert/preset/inputs/base)")
+    cea.add_argument("--timeout", type=float, default=10.0, help="--plan: espera máx. pelo EA ler cada comando")
+    cea.set_defaults(func=chart_expert_attach)
+
+    ced = ce_sub.add_parser("detach", help="Remover EA do gráfico")
+    ced.add_argument("--symbol", required=True)
+    ced.add_argument("--period", required=True)
+    ced.set_defaults(func=chart_expert_detach)
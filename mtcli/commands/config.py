@@ -0,0 +1,53 @@
+# commands/config.py — mtcli config show|set|unset
+from types import SimpleNamespace
+from ..config import CONFIG_KEYS, edit_config, load_config
+from ..instance import bootstrap_instance
+from ..env import resolve_paths
+from ..output import emit, structured
+
+def cmd_config_show(args):
+    cfg = load_config()
+    if structured():
+        emit("config", values={key: cfg.get(key) for key in sorted(CONFIG_KEYS)},
+             instances=cfg.get("instances") or {})
+        return
+    if not cfg:
+        print("[Config] Nenhum valor salvo. Utilize 'mtcli config set <chave> <valor>'.")
+        return
+    print("[Config]")
+    for key in sorted(CONFIG_KEYS):
+        val = cfg.get(key)
+        status = val if val else "(não definido)"
+        print(f"{key:10s}: {status}")
+
+def cmd_config_set(args):
+    with edit_config() as cfg:
+        cfg[args.key] = args.value
+    emit("config_set", f"[Config] {args.key} definido para: {args.value}", key=args.key, value=args.value)
+    if args.key == "data_dir":
+        try:
+            ns = SimpleNamespace(terminal=None, metaeditor=None, data_dir=args.value)
+            _, metaeditor, data_dir = resolve_paths(ns)
+            if data_dir:
+                bootstrap_instance(metaeditor, data_dir, force=False, quiet=False)
+        except Exception as exc:
+            emit("bootstrap_failed", f"[bootstrap] Falhou ao preparar CommandListener automaticamente: {exc}",
+                 data_dir=args.value, message=str(exc))
+
+def cmd_config_unset(args):
+    with edit_config() as cfg:
+        removed = cfg.pop(args.key, None) is not None
+    emit("config_unset", f"[Config] {args.key} removido." if removed else f"[Config] {args.key} já estava vazio.",
+         key=args.key, removed=removed)
+
+def register(p):
+    cfgsub = p.add_subparsers(dest="ccmd", required=True)
+    cfg_show = cfgsub.add_parser("show", help="Listar caminhos configurados")
+    cfg_show.set_defaults(func=cmd_config_show)
+    cfg_set = cfgsub.add_parser("set", help="Salvar um caminho padrão")
+    cfg_set.add_argument("key", choices=sorted(CONFIG_KEYS))
+    cfg_set.add_argument("value")
+    cfg_set.set_defaults(func=cmd_config_set)
+    cfg_unset = cfgsub.add_parser("unset", help="Remover um caminho salvo")
+    cfg_unset.add_argument("key", choices=sorted(CONFIG_KEYS))
+    cfg_unset.set_defaults(func=cmd_config_unset)
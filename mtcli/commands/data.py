@@ -0,0 +1,123 @@
+# commands/data.py — mtcli data export|info (barras/ticks via CommandListenerEA + cache local)
+import calendar, csv, os, sys, time
+from pathlib import Path
+from ..datacache import DataCache, decode_records
+from ..env import resolve_paths
+from ..listener import listener_files_dir, send_listener_command, wait_listener_idle
+from ..output import emit, structured
+from ..util import timeframe_ok
+
+def parse_when(text: str) -> int:
+    '''"2024.01.31", "2024-01-31 13:00" -> epoch (horário do servidor, como o MT5 grava).'''
+    s = text.strip().replace("-", ".").replace("T", " ")
+    for fmt in ("%Y.%m.%d %H:%M:%S", "%Y.%m.%d %H:%M", "%Y.%m.%d"):
+        try:
+            return calendar.timegm(time.strptime(s, fmt))
+        except ValueError:
+            pass
+    raise SystemExit(f"Data inválida (use AAAA.MM.DD[ HH:MM]): {text}")
+
+def fmt_when(ts: int) -> str:
+    return time.strftime("%Y.%m.%d %H:%M", time.gmtime(ts))
+
+def fetch_range(data_dir: Path, kind: str, symbol: str, period: str, start: int, end: int,
+                seq: int, timeout: float) -> bytes:
+    '''Pede [start, end) ao CommandListenerEA e espera o arquivo binário em MQL5\\Files.'''
+    name = f"mtcli_export_{os.getpid()}_{seq}.bin"
+    files = listener_files_dir(data_dir)
+    out, err = files / name, files / f"{name}.err"
+    cmd = "EXPORT_TICKS" if kind == "ticks" else "EXPORT_RATES"
+    deadline = time.monotonic() + timeout
+    if not wait_listener_idle(data_dir, timeout):
+        raise SystemExit(f"[-] cmd.txt não foi consumido em {timeout:.0f}s. O CommandListenerEA está rodando?")
+    send_listener_command(data_dir, f"{cmd};{symbol};{period};{start};{end};{name}")
+    while time.monotonic() < deadline:
+        if err.exists():
+            msg = err.read_text(encoding="ascii", errors="replace").strip()
+            err.unlink()
+            raise SystemExit(f"[-] Exportação falhou: {msg}")
+        if out.exists():
+            raw = out.read_bytes()
+            out.unlink()
+            return raw
+        time.sleep(0.05)
+    raise SystemExit(f"[-] Sem resposta do CommandListenerEA em {timeout:.0f}s ({name}).")
+
+def cmd_data_export(args):
+    kind = "ticks" if args.ticks else "bars"
+    period = "TICKS" if args.ticks else timeframe_ok(args.period)
+    start, end = parse_when(args.date_from), parse_when(args.date_to)
+    if end <= start:
+        raise SystemExit("--to deve ser posterior a --from.")
+    cache = DataCache(Path(args.cache_dir).expanduser() if args.cache_dir else None)
+    gaps = [] if args.offline else cache.missing(args.symbol, period, start, end, kind)
+    fetched = 0
+    if gaps:
+        _, _, data_dir = resolve_paths(args)
+        if not data_dir:
+            raise SystemExit("Data Folder não configurada. Use --data-dir ou 'mtcli config set data_dir'.")
+        for i, (a, b) in enumerate(gaps):
+            t0 = time.perf_counter()
+            raw = fetch_range(data_dir, kind, args.symbol, period, a, b, i, args.timeout)
+            n = cache.ingest(args.symbol, period, decode_records(kind, raw), a, b, kind)
+            fetched += n
+            seconds = time.perf_counter() - t0
+            emit("fetch", f"[data] {fmt_when(a)} → {fmt_when(b)}: {n} linha(s) do terminal em {seconds:.2f}s",
+                 to_stderr=True, symbol=args.symbol.upper(), period=period, start=a, end=b, rows=n,
+                 seconds=round(seconds, 3))
+    cols = cache.read_arrays(args.symbol, period, start, end, kind)
+    names = list(cols)
+    rows = len(cols[names[0]])
+    series = cache.series_dir(args.symbol, period, kind)
+    emit("export", f"[data] {args.symbol.upper()} {period}: {rows} linha(s), {fetched} do terminal, "
+         f"{max(0, rows - fetched)} do cache ({series})", to_stderr=True, symbol=args.symbol.upper(),
+         period=period, start=start, end=end, rows=rows, fetched=fetched, cache=series, csv=args.csv)
+    if args.csv == "-" and structured():
+        for values in zip(*(cols[c] for c in names)):
+            emit("row", **dict(zip(names, values)))
+    elif args.csv:
+        fh = sys.stdout if args.csv == "-" else open(args.csv, "w", newline="", encoding="utf-8")
+        try:
+            w = csv.writer(fh)
+            w.writerow(names)
+            w.writerows(zip(*(cols[c] for c in names)))
+        finally:
+            if fh is not sys.stdout:
+                fh.close()
+
+def cmd_data_info(args):
+    cache = DataCache(Path(args.cache_dir).expanduser() if args.cache_dir else None)
+    if not cache.root.exists():
+        emit("cache_empty", f"[i] Cache vazio: {cache.root}", root=cache.root)
+        return
+    for sym_dir in sorted(p for p in cache.root.iterdir() if p.is_dir()):
+        if args.symbol and sym_dir.name != args.symbol.upper():
+            continue
+        for series in sorted(p for p in sym_dir.iterdir() if p.is_dir()):
+            kind = "ticks" if series.name == "TICKS" else "bars"
+            index = cache.load_index(sym_dir.name, series.name, kind)
+            rows = sum(m["rows"] for m in index["chunks"].values())
+            size = sum(f.stat().st_size for f in series.glob("*.col"))
+            lines = [f"{sym_dir.name:12s} {series.name:6s} {len(index['chunks']):4d} chunk(s) "
+                     f"{rows:10d} linha(s) {size / 1048576:8.1f} MB"]
+            lines += [f"    {fmt_when(a)} → {fmt_when(b)}" for a, b in index["covered"]]
+            emit("series", "\n".join(lines), symbol=sym_dir.name, period=series.name, chunks=len(index["chunks"]),
+                 rows=rows, bytes=size, covered=index["covered"])
+
+def register(p):
+    dsub = p.add_subparsers(dest="dcmd", required=True)
+    de = dsub.add_parser("export", help="Exporta barras/ticks para o cache local (só as lacunas vão ao terminal)")
+    de.add_argument("--symbol", required=True)
+    de.add_argument("--period", default="M1", help="Timeframe das barras (ignorado com --ticks)")
+    de.add_argument("--from", dest="date_from", required=True, help="AAAA.MM.DD[ HH:MM]")
+    de.add_argument("--to", dest="date_to", required=True, help="AAAA.MM.DD[ HH:MM] (exclusivo)")
+    de.add_argument("--ticks", action="store_true", help="Ticks (CopyTicksRange) em vez de barras")
+    de.add_argument("--csv", help="Grava o intervalo em CSV ('-' = stdout)")
+    de.add_argument("--offline", action="store_true", help="Não consulta o terminal; só o que já está no cache")
+    de.add_argument("--timeout", type=float, default=60.0, help="Segundos de espera por trecho exportado")
+    de.add_argument("--cache-dir", help="Raiz do cache (padrão: ~/.mtcli/data)")
+    de.set_defaults(func=cmd_data_export)
+    di = dsub.add_parser("info", help="Lista séries, chunks e intervalos do cache")
+    di.add_argument("--symbol")
+    di.add_argument("--cache-dir", help="Raiz do cache (padrão: ~/.mtcli/data)")
+    di.set_defaults(func=cmd_data_info)
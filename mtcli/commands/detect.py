@@ -0,0 +1,11 @@
+# commands/detect.py — mtcli detect
+from ..env import resolve_paths
+from ..output import emit
+
+def cmd_detect(args):
+    terminal, metaeditor, data_dir = resolve_paths(args)
+    emit("paths", f"[Detect]\nTerminal : {terminal}\nMetaEditor: {metaeditor}\nDataDir  : {data_dir}",
+         terminal=terminal, metaeditor=metaeditor, data_dir=data_dir)
+
+def register(p):
+    p.set_defaults(func=cmd_detect)
@@ -0,0 +1,129 @@
+# commands/gen4.py — mtcli gen4 service|run
+import argparse, json, sys, time
+from pathlib import Path
+from ..gen4 import (ServiceSupervisor, cached_service_pid, find_gen4_cli, gen4_service_exe, load_gen4_jobs,
+                    run_gen4_cli, run_gen4_jobs, service_running, start_service, stop_service)
+from ..env import is_wsl, resolve_paths, win_to_wsl
+from ..output import emit, structured, warn
+from ..util import write_text_utf8
+
+def cmd_gen4_supervise(args, data_dir: Path|None):
+    exe = Path(args.exe) if args.exe else gen4_service_exe(data_dir)
+    log = Path(args.log) if args.log else exe.parent / "logs" / "gpu_service.log"
+    cmd = [str(exe)]
+    if is_wsl():
+        cmd = [str(win_to_wsl(exe))]
+    sup = ServiceSupervisor(
+        cmd, log_path=log, ready_marker=args.ready_marker,
+        health_file=Path(args.health_file) if args.health_file else None,
+        health_stale=args.health_stale, ready_timeout=args.ready_timeout,
+        ready_grace=args.ready_grace, backoff_initial=args.backoff_initial,
+        backoff_max=args.backoff_max, stable_after=args.stable_after,
+        max_restarts=args.max_restarts,
+        metrics_file=Path(args.metrics_file) if args.metrics_file else None)
+    return sup.run()
+
+def cmd_gen4_service(args):
+    _, _, data_dir = resolve_paths(args)
+
+    if args.action == "status":
+        pid = cached_service_pid()
+        running = bool(pid) or service_running()
+        extra = f" (pid {pid}, supervisionado)" if pid else ""
+        emit("service_status", f"[Gen4Service] {'em execução' if running else 'parado'}{extra}",
+             running=running, pid=pid)
+        sys.exit(0 if running else 1)
+
+    if args.action == "stop":
+        if not service_running():
+            emit("service_status", "[Gen4Service] já parado.", running=False, pid=None)
+            sys.exit(0)
+        rc = stop_service()
+        sys.exit(rc)
+
+    if args.action == "supervise":
+        sys.exit(cmd_gen4_supervise(args, data_dir))
+
+    exe_path = gen4_service_exe(data_dir)
+
+    if args.action == "start":
+        if service_running():
+            emit("service_status", "[Gen4Service] já em execução.", running=True, pid=cached_service_pid())
+            sys.exit(0)
+        rc = start_service(exe_path)
+        sys.exit(rc)
+
+    if args.action == "ensure":
+        if service_running():
+            emit("service_status", "[Gen4Service] já em execução.", running=True, pid=cached_service_pid())
+            sys.exit(0)
+        rc = start_service(exe_path)
+        sys.exit(rc)
+
+def cmd_gen4_run(args):
+    _, _, data_dir = resolve_paths(args)
+    cli_args = list(args.cli_args or [])
+    if cli_args and cli_args[0] == "--":
+        cli_args = cli_args[1:]
+    if not args.jobs:
+        if not cli_args:
+            raise SystemExit("Informe --jobs arquivo.jsonl ou os argumentos do gen4_cli após '--'.")
+        sys.exit(run_gen4_cli(data_dir, cli_args))
+
+    cli = find_gen4_cli(data_dir)
+    if not cli:
+        warn("[-] gen4_cli.py não encontrado. Configure MTCLI_GEN4_CLI ou mantenha Gen4Engine/gen4_cli.py junto à Data Folder.")
+        raise SystemExit(1)
+    jobs = load_gen4_jobs(Path(args.jobs), args.timeout)
+    total = len(jobs)
+    done = [0]
+
+    def progress(res):
+        done[0] += 1
+        emit("gen4_job", f"[gen4] [{done[0]}/{total}] {res['id']}: {res['status']} ({res['duration_s']:.1f}s)",
+             to_stderr=True, done=done[0], total=total, **res)
+
+    t0 = time.perf_counter()
+    results = run_gen4_jobs(cli, jobs, parallel=args.parallel, in_process=args.in_process,
+                            max_output=args.max_output, on_done=progress)
+    counts = {st: sum(1 for r in results if r["status"] == st) for st in ("ok", "failed", "timeout")}
+    summary = {"cli": str(cli), "mode": "in-process" if args.in_process else "subprocess",
+               "parallel": args.parallel, "total": total, **counts,
+               "wall_s": round(time.perf_counter() - t0, 3), "jobs": results}
+    text = json.dumps(summary, indent=2, ensure_ascii=False)
+    if args.out:
+        write_text_utf8(Path(args.out), text + "\n")
+        emit("gen4_summary_file", f"[gen4] resumo em {args.out}", to_stderr=True, path=args.out)
+    if structured():
+        emit("gen4_summary", **{k: v for k, v in summary.items() if k != "jobs"})
+    elif not args.out:
+        print(text)
+    sys.exit(0 if counts["ok"] == total else 1)
+
+def register(p):
+    engsub = p.add_subparsers(dest="ecmd", required=True)
+    engsvc = engsub.add_parser("service", help="Gerencia Gen4_GpuEngineService")
+    engsvc.add_argument("action", choices=["start", "stop", "ensure", "status", "supervise"], help="Ação do serviço")
+    engsvc.add_argument("--exe", help="supervise: executável do serviço (padrão: Gen4Engine/bin/Gen4EngineService.exe)")
+    engsvc.add_argument("--log", help="supervise: log a acompanhar (padrão: <bin>/logs/gpu_service.log)")
+    engsvc.add_argument("--ready-marker", help="supervise: texto no log que indica serviço pronto")
+    engsvc.add_argument("--health-file", help="supervise: arquivo cuja atualização indica serviço pronto/vivo")
+    engsvc.add_argument("--health-stale", type=float, default=0.0, help="supervise: reinicia se o health file ficar N s sem atualizar (0=off)")
+    engsvc.add_argument("--ready-timeout", type=float, default=60.0, help="supervise: segundos até desistir da prontidão")
+    engsvc.add_argument("--ready-grace", type=float, default=2.0, help="supervise: sem marcador/health file, pronto após N s vivo")
+    engsvc.add_argument("--backoff-initial", type=float, default=1.0)
+    engsvc.add_argument("--backoff-max", type=float, default=60.0)
+    engsvc.add_argument("--stable-after", type=float, default=60.0, help="supervise: zera o backoff após N s no ar")
+    engsvc.add_argument("--max-restarts", type=int, default=0, help="supervise: 0 = ilimitado")
+    engsvc.add_argument("--metrics-file", help="supervise: textfile Prometheus com uptime/reinícios")
+    engsvc.set_defaults(func=cmd_gen4_service)
+    engrun = engsub.add_parser("run", help="Executa gen4_cli.py (um comando ou uma fila de jobs)")
+    engrun.add_argument("--jobs", help="Arquivo .jsonl com um job por linha ({'id','args','timeout','env'})")
+    engrun.add_argument("--parallel", type=int, default=1, help="Jobs simultâneos")
+    engrun.add_argument("--timeout", type=float, help="Timeout padrão por job (s)")
+    engrun.add_argument("--in-process", action="store_true",
+                        help="Importa gen4_cli uma vez por worker (sem subir um Python por job)")
+    engrun.add_argument("--max-output", type=int, default=20000, help="Máx. de caracteres de stdout/stderr por job")
+    engrun.add_argument("--out", help="Salvar o resumo JSON neste arquivo (padrão: stdout)")
+    engrun.add_argument("cli_args", nargs=argparse.REMAINDER, help="Sem --jobs: argumentos repassados ao gen4_cli")
+    engrun.set_defaults(func=cmd_gen4_run)
@@ -0,0 +1,126 @@
+# commands/instance.py — mtcli instance clone|add|remove|list
+import shutil, sys, time
+from pathlib import Path
+from ..clone import MODES, clone_many
+from ..config import edit_config
+from ..env import resolve_paths, to_local_path, to_windows_path
+from ..instance import known_instances, select_instances
+from ..output import emit, structured, warn
+
+def _gb(n: int) -> str:
+    return f"{n / 1073741824:.2f} GB" if n >= 1073741824 else f"{n / 1048576:.1f} MB"
+
+def cmd_instance_clone(args):
+    if args.source:
+        src = to_local_path(args.source)
+    else:
+        _, _, data_dir = resolve_paths(args)
+        if not data_dir:
+            raise SystemExit("Informe --from ou configure data_dir.")
+        src = to_local_path(data_dir)
+    if not (src / "MQL5").exists():
+        raise SystemExit(f"Origem sem MQL5/: {src}")
+    root = to_local_path(args.dest_root) if args.dest_root else src.parent
+    dests = [root / f"{args.prefix or src.name}-w{i:02d}" for i in range(args.start, args.start + args.count)]
+    existing = [d for d in dests if d.exists()]
+    if existing and not args.force:
+        raise SystemExit(f"Já existe(m): {', '.join(d.name for d in existing)} (use --force para recriar).")
+    for d in existing:
+        shutil.rmtree(d)
+    if args.mode == "hardlink":
+        warn("[clone] Aviso: --mode hardlink: o histórico (bases\\) dos clones é o mesmo arquivo da origem; "
+             "terminais sincronizando ao mesmo tempo podem corromper todos. Prefira --mode auto (reflink ou cópia).")
+    t0 = time.perf_counter()
+    plan, results = clone_many(src, dests, mode=args.mode, parallel=args.parallel)
+    linked = sum(size for _, action, size in plan if action == "link")
+    copied = sum(size for _, action, size in plan if action == "copy")
+    emit("clone_plan", f"[clone] origem {to_windows_path(src)}: {len(plan)} arquivo(s), {_gb(linked)} vinculável(is), {_gb(copied)} a copiar",
+         source=src, files=len(plan), link_bytes=linked, copy_bytes=copied)
+    saved, failed = 0, 0
+    for r in results:
+        how = ", ".join(f"{r[k]} {k}" for k in ("reflink", "hardlink", "copy") if r[k])
+        status = "ok" if not r["problems"] else f"{len(r['problems'])} problema(s)"
+        emit("clone", f"  {r['dst'].name:24s} {r['seconds']:6.2f}s  {how}  {status}", name=r["dst"].name,
+             path=r["dst"], seconds=round(r["seconds"], 3), problems=r["problems"],
+             **{k: r[k] for k in ("reflink", "hardlink", "copy")})
+        if not structured():
+            for problem in r["problems"][:5]:
+                print(f"      {problem}")
+        saved += r["linked_bytes"]
+        failed += bool(r["problems"])
+    seconds = time.perf_counter() - t0
+    emit("clone_done", f"[clone] {len(results)} clone(s) em {seconds:.2f}s; economia de {_gb(saved)} "
+                       f"(cópia integral: {_gb((linked + copied) * len(results))}).",
+         clones=len(results), failed=failed, seconds=round(seconds, 3), saved_bytes=saved)
+    if args.tag:
+        register_instances([(d.name, d) for d in dests], [args.tag])
+        emit("instances_tagged", f"[clone] registrados com a tag '{args.tag}' (use --instances tag:{args.tag}).",
+             tag=args.tag, names=[d.name for d in dests])
+    if failed:
+        sys.exit(1)
+
+def register_instances(entries: list[tuple[str, Path]], tags: list[str], terminal: str|None = None):
+    with edit_config() as cfg:
+        reg = cfg.setdefault("instances", {})
+        for name, data_dir in entries:
+            old = reg.get(name, {})
+            entry = {"data_dir": str(data_dir), "tags": old.get("tags", []) + [t for t in tags if t not in old.get("tags", [])]}
+            if terminal or old.get("terminal"):
+                entry["terminal"] = terminal or old["terminal"]
+            reg[name] = entry
+
+def cmd_instance_add(args):
+    data_dir = to_local_path(args.data_dir_path)
+    if not (data_dir / "MQL5").exists():
+        warn(f"[i] Aviso: {data_dir} ainda não tem MQL5/ (rode 'mtcli bootstrap').")
+    register_instances([(args.name, args.data_dir_path)], args.tag or [], args.terminal_path)
+    emit("instance_added", f"[instance] {args.name} -> {args.data_dir_path}" + (f" (tags: {', '.join(args.tag)})" if args.tag else ""),
+         name=args.name, data_dir=args.data_dir_path, tags=args.tag or [])
+
+def cmd_instance_remove(args):
+    with edit_config() as cfg:
+        removed = (cfg.get("instances") or {}).pop(args.name, None) is not None
+    emit("instance_removed", f"[instance] {args.name} removida." if removed else f"[instance] {args.name} não estava registrada.",
+         name=args.name, removed=removed)
+
+def cmd_instance_list(args):
+    known = known_instances()
+    if args.select:
+        names = {n for n, _ in select_instances(args.select)}
+        known = [i for i in known if i["name"] in names]
+    if not known:
+        emit("instances_empty", "[instance] Nenhuma instância. Use 'mtcli instance add <nome> <data_dir>'.")
+        return
+    width = max(len(i["name"]) for i in known)
+    for i in known:
+        origin = ", ".join(i["tags"]) if i["registered"] else "(encontrada)"
+        emit("instance", f"{i['name']:{width}s}  {origin:20s}  {i['data_dir']}", name=i["name"],
+             data_dir=i["data_dir"], tags=i["tags"], registered=i["registered"])
+
+def register(p):
+    isub = p.add_subparsers(dest="icmd", required=True)
+    ic = isub.add_parser("clone", help="Cria N cópias de uma instância, vinculando histórico e .ex5")
+    ic.add_argument("--from", dest="source", help="Data Folder/instalação portable de origem (padrão: data_dir)")
+    ic.add_argument("--count", type=int, required=True, help="Quantidade de clones")
+    ic.add_argument("--dest-root", help="Onde criar os clones (padrão: ao lado da origem)")
+    ic.add_argument("--prefix", help="Nome base dos clones (padrão: nome da origem) -> <prefixo>-w01, -w02...")
+    ic.add_argument("--start", type=int, default=1, help="Número do primeiro clone")
+    ic.add_argument("--mode", choices=MODES, default="auto",
+                    help="auto = reflink se o FS suportar, senão cópia; hardlink compartilha o histórico com a origem (arriscado)")
+    ic.add_argument("--parallel", type=int, default=4, help="Clones criados simultaneamente")
+    ic.add_argument("--force", action="store_true", help="Apaga e recria clones existentes")
+    ic.add_argument("--tag", help="Registra os clones com esta tag (para --instances tag:<tag>)")
+    ic.set_defaults(func=cmd_instance_clone)
+    ia = isub.add_parser("add", help="Registra uma instância (nome + Data Folder + tags)")
+    ia.add_argument("name")
+    ia.add_argument("data_dir_path", metavar="data_dir")
+    ia.add_argument("--tag", action="append", help="Tag (repetível)")
+    ia.add_argument("--terminal", dest="terminal_path",
+                    help="terminal64.exe desta instância (padrão: o da pasta portable ou o de origin.txt)")
+    ia.set_defaults(func=cmd_instance_add)
+    ir = isub.add_parser("remove", help="Remove uma instância registrada")
+    ir.add_argument("name")
+    ir.set_defaults(func=cmd_instance_remove)
+    il = isub.add_parser("list", help="Instâncias registradas e Data Folders encontradas")
+    il.add_argument("select", nargs="?", help="Seletor (all, tag:<tag>, nome/glob)")
+    il.set_defaults(func=cmd_instance_list)
@@ -0,0 +1,74 @@
+# commands/listener.py — mtcli listener install|run|send
+import sys
+from pathlib import Path
+from ..instance import bootstrap_instance
+from ..ini import build_ini_startup
+from ..env import resolve_paths, run_win_exe, to_windows_path
+from ..listener import send_listener_command, send_to_instances
+from ..output import emit, warn
+from ..util import timeframe_ok, unique_path, write_text_utf16
+
+def cmd_listener_install(args):
+    _, metaeditor, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    if not metaeditor:
+        warn("[-] MetaEditor não definido. Informe com --metaeditor ou 'mtcli config set metaeditor'.")
+        raise SystemExit(1)
+    bootstrap_instance(metaeditor, data_dir, force=True, quiet=False)
+
+def cmd_listener_run(args):
+    terminal, _, _ = resolve_paths(args)
+    if not terminal: raise SystemExit(1)
+    ini = Path(args.ini) if args.ini else unique_path(Path.cwd(), "listener", ".ini")
+    content = build_ini_startup(
+        args.symbol, timeframe_ok(args.period),
+        None, "CommandListenerEA", None, None, None, False)
+    write_text_utf16(ini, content)
+    try:
+        code = run_win_exe(terminal, [f"/config:{ini}"])
+    finally:
+        if not args.ini:
+            ini.unlink(missing_ok=True)
+    sys.exit(code)
+
+def cmd_listener_send(args):
+    if args.subcmd == "apply-template":
+        tf = timeframe_ok(args.period)
+        line = f"APPLY_TPL;{args.symbol};{tf};{args.template}"
+    elif args.subcmd == "attach-indicator":
+        tf = timeframe_ok(args.period)
+        sub = str(args.subwindow if args.subwindow is not None else 0)
+        line = f"ATTACH_IND;{args.symbol};{tf};{args.indicator};{sub}"
+    else:
+        raise SystemExit("Comando desconhecido.")
+    if args.instances:
+        return send_to_instances(args, [line])
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir: raise SystemExit(1)
+    cmdfile = send_listener_command(data_dir, line)
+    emit("command_sent", f"[>] Comando enviado: {line}\n[i] O EA lê e apaga {to_windows_path(cmdfile)}.",
+         payload=line, cmdfile=cmdfile, data_dir=data_dir)
+
+def register(p):
+    lsub = p.add_subparsers(dest="lcmd", required=True)
+    li = lsub.add_parser("install", help="Instala e compila Experts\\CommandListenerEA.mq5")
+    li.set_defaults(func=cmd_listener_install)
+    lr = lsub.add_parser("run", help="Abre MT5 com o EA escutador anexado")
+    lr.add_argument("--symbol", required=True)
+    lr.add_argument("--period", required=True)
+    lr.add_argument("--ini", help="Salvar INI gerado neste caminho")
+    lr.set_defaults(func=cmd_listener_run)
+    ls = lsub.add_parser("send", help="Envia um comando ao EA (arquivo MQL5\\Files\\cmd.txt)")
+    lssub = ls.add_subparsers(dest="subcmd", required=True)
+    ap = lssub.add_parser("apply-template", help="APPLY_TPL;SYMBOL;TF;TEMPLATE")
+    ap.add_argument("--symbol", required=True)
+    ap.add_argument("--period", required=True)
+    ap.add_argument("--template", required=True)
+    ap.set_defaults(func=cmd_listener_send)
+    ai = lssub.add_parser("attach-indicator", help="ATTACH_IND;SYMBOL;TF;INDICATOR;SUBWIN")
+    ai.add_argument("--symbol", required=True)
+    ai.add_argument("--period", required=True)
+    ai.add_argument("--indicator", required=True)
+    ai.add_argument("--subwindow", type=int, default=0)
+    ai.set_defaults(func=cmd_listener_send)
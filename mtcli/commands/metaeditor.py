@@ -0,0 +1,20 @@
+# commands/metaeditor.py — mtcli metaeditor compile
+import sys
+from pathlib import Path
+from ..env import resolve_paths, run_win_exe
+
+def cmd_metaeditor_compile(args):
+    _, metaeditor, _ = resolve_paths(args)
+    if not metaeditor: raise SystemExit(1)
+    log = Path(args.log) if args.log else (Path(args.file).with_suffix(".log"))
+    a = [f'/compile:{Path(args.file)}', f'/log:{log}']
+    if args.syntax_only: a.append('/s')
+    sys.exit(run_win_exe(metaeditor, a))
+
+def register(p):
+    mesub = p.add_subparsers(dest="mcmd", required=True)
+    mc = mesub.add_parser("compile", help="Compilar arquivo .mq5/.mqh/.mqproj")
+    mc.add_argument("--file", required=True)
+    mc.add_argument("--log")
+    mc.add_argument("--syntax-only", action="store_true", help="Somente checagem de sintaxe (/s)")
+    mc.set_defaults(func=cmd_metaeditor_compile)
@@ -0,0 +1,44 @@
+# commands/open_terminal.py — mtcli open
+import sys
+from pathlib import Path
+from ..ini import build_ini_startup
+from ..env import resolve_paths, run_win_exe
+from ..output import warn
+from ..util import timeframe_ok, unique_path, write_text_utf16
+
+def cmd_open(args):
+    terminal, _, data_dir = resolve_paths(args)
+    if not terminal: raise SystemExit(1)
+    if args.profile and not (data_dir and (data_dir / "MQL5" / "Profiles" / "Charts" / args.profile).exists()):
+        warn(f"[!] Aviso: profile '{args.profile}' não encontrado; o MT5 ainda tentará abrir.")
+    if args.template or args.symbol or args.period or args.expert or args.script:
+        # Sem --ini: nome único (execuções paralelas não se sobrescrevem), removido ao fim.
+        ini = Path(args.ini) if args.ini else unique_path(Path.cwd(), "start", ".ini")
+        content = build_ini_startup(
+            args.symbol, timeframe_ok(args.period) if args.period else None,
+            args.template, args.expert, args.script,
+            args.expert_parameters, args.script_parameters, args.shutdown)
+        write_text_utf16(ini, content)
+        try:
+            code = run_win_exe(terminal, [f"/config:{ini}"] + ([f"/profile:{args.profile}"] if args.profile else []) + (["/portable"] if args.portable else []))
+        finally:
+            if not args.ini:
+                ini.unlink(missing_ok=True)
+    else:
+        args_list = ([f"/profile:{args.profile}"] if args.profile else []) + (["/portable"] if args.portable else [])
+        code = run_win_exe(terminal, args_list)
+    sys.exit(code)
+
+def register(p):
+    p.add_argument("--profile")
+    p.add_argument("--template", help="Nome do .tpl em MQL5\\Profiles\\Templates")
+    p.add_argument("--symbol")
+    p.add_argument("--period")
+    p.add_argument("--expert", help="Ex.: CommandListenerEA")
+    p.add_argument("--expert-parameters", help="Nome do .set em MQL5\\Profiles\\Tester")
+    p.add_argument("--script")
+    p.add_argument("--script-parameters")
+    p.add_argument("--shutdown", action="store_true", help="Fechar terminal ao fim do Script")
+    p.add_argument("--portable", action="store_true", help="Portable mode")
+    p.add_argument("--ini", help="Salvar INI gerado neste caminho")
+    p.set_defaults(func=cmd_open)
@@ -0,0 +1,190 @@
+# commands/pipeline.py — mtcli pipeline run (compilar variantes -> INIs -> testes -> relatórios)
+import itertools, json, sys, threading, time
+from pathlib import Path
+from ..env import resolve_paths, run_win_exe, to_local_path, to_windows_path
+from ..ini import build_batch_ini
+from ..instance import deploy_ex5, sync_ex5
+from ..output import emit, structured
+from ..pipeline import Stage, format_stage_table, run_stages
+from ..plan import combo_label, compile_plan
+from ..report import parse_report
+from ..util import unique_stamp, write_text_utf16, write_text_utf8
+from .tester import report_path, test_slots
+
+SHOWN_METRICS = ("Total Net Profit", "Profit Factor", "Total Trades")
+
+def load_pipeline(path: str) -> dict:
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    variants = spec.get("variants") or []
+    if not variants:
+        raise SystemExit("Pipeline sem 'variants' ([{\"name\": \"v1\", \"ea\": \"MeuEA_v1\"}, ...]).")
+    for i, v in enumerate(variants):
+        if "ea" not in v:
+            raise SystemExit(f"variants[{i}] sem 'ea'.")
+        v.setdefault("name", v["ea"].replace("\\", "/").rsplit("/", 1)[-1])
+    names = [v["name"] for v in variants]
+    if len(set(names)) != len(names):
+        raise SystemExit(f"Nomes de variantes repetidos: {', '.join(names)}")
+    return spec
+
+def expert_rel(ea: str) -> str:
+    '''EA relativo a MQL5\\Experts (como no tester) -> fonte relativa a MQL5.'''
+    rel = "Experts/" + ea.replace("\\", "/").strip("/")
+    return rel if rel.lower().endswith(".mq5") else rel + ".mq5"
+
+def write_job_ini(job: dict, port: int|None = None):
+    base = dict(job["base"], ea=job["variant"]["ea"], symbol=job["symbol"], period=job["period"])
+    if port is not None:
+        base["port"] = port
+    write_text_utf16(job["ini"], build_batch_ini(base, job["inputs"], job["report"]))
+
+def cmd_pipeline_run(args):
+    spec = load_pipeline(args.plan)
+    base = dict(spec.get("base", {}), replace_report=True)
+    matrix = spec.get("matrix", {})
+    symbols = matrix.get("symbol") or [base.get("symbol")]
+    periods = matrix.get("period") or [base.get("period")]
+    if None in symbols or None in periods:
+        raise SystemExit("Informe matrix.symbol/matrix.period (ou base.symbol/base.period).")
+    combos = list(compile_plan(spec)) or [{}]
+    report_tpl = base.get("report", "")
+    if "{label}" not in report_tpl:
+        report_tpl = r"\reports\pipeline\{label}.htm"
+
+    terminal, metaeditor, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit(1)
+    data_path = to_local_path(data_dir)  # fontes e compilação; os .ex5 seguem para as instâncias de teste
+    slots = test_slots(args, terminal, data_dir)
+    parallel = len(slots)
+    ini_dir = Path(args.ini_dir)
+    run = unique_stamp()  # nos nomes dos INIs: dois 'pipeline run' no mesmo diretório não colidem
+    variants = spec["variants"]
+    per_variant = len(symbols) * len(periods) * len(combos)
+    total = per_variant * len(variants)
+    queue_size = args.queue_size or 2 * parallel
+    emit("pipeline_start", f"[pipeline] {len(variants)} variante(s) x {per_variant} teste(s) = {total}; "
+                           f"compilação {args.compile_workers}, testes {parallel} ({', '.join(s['name'] for s in slots)}), "
+                           f"fila {queue_size}",
+         variants=len(variants), tests=total, compile_workers=args.compile_workers,
+         parallel=parallel, instances=[s["name"] for s in slots], queue_size=queue_size)
+
+    compile_locks: dict[str, threading.Lock] = {}
+    guard = threading.Lock()
+    failures: list[str] = []
+    seq = itertools.count(1)
+
+    def compile_stage(variant: dict, slot: int):
+        rel = expert_rel(variant["ea"])
+        if not (data_path / "MQL5" / rel).exists():
+            where = "MQL5\\" + rel.replace("/", "\\")
+            failures.append(f"{variant['name']}: fonte não encontrada ({where})")
+            emit("compile", f"[compile] {variant['name']}: fonte não encontrada: {where}",
+                 variant=variant["name"], source=where, status="sem fonte")
+            return
+        with guard:
+            lock = compile_locks.setdefault(rel, threading.Lock())
+        t0 = time.perf_counter()
+        with lock:  # variantes com o mesmo EA: compila uma vez, as outras ficam "em dia"
+            status = deploy_ex5(metaeditor, data_path, rel, rebuild=args.rebuild)
+        seconds = time.perf_counter() - t0
+        emit("compile", f"[compile] {variant['name']}: {status} ({seconds:.2f}s)",
+             variant=variant["name"], source=rel, status=status, seconds=round(seconds, 3))
+        if status == "falhou" or (status == "sem metaeditor" and not (data_path / "MQL5" / rel).with_suffix(".ex5").exists()):
+            failures.append(f"{variant['name']}: compilação {status}")
+            return
+        with lock:
+            for s in slots:
+                if s["data_dir"]:
+                    sync_ex5(data_path, s["data_dir"], rel)
+        yield variant
+
+    def ini_stage(variant: dict, slot: int):
+        for symbol, period, combo in itertools.product(symbols, periods, combos):
+            label = "_".join(filter(None, (variant["name"], symbol, period, combo_label(combo))))
+            idx = next(seq)
+            job = {"idx": idx, "label": label, "variant": variant, "symbol": symbol, "period": period,
+                   "base": base, "combo": combo, "rc": None, "metrics": {},
+                   "inputs": {**base.get("inputs", {}), **variant.get("inputs", {}), **combo},
+                   "ini": ini_dir / f"pipeline-{run}_{idx:03d}_{label}.ini",
+                   "report": report_tpl.replace("{ts}", unique_stamp()).replace("{label}", label)}
+            write_job_ini(job)
+            yield job
+
+    def test_stage(job: dict, slot: int):
+        s = slots[slot]  # um worker por instância: cada uma roda um teste por vez
+        if s["port"] is not None:
+            write_job_ini(job, s["port"])
+        job["instance"], job["root"] = s["name"], s["reports"]
+        report_path(job["root"], job["report"]).unlink(missing_ok=True)  # nada de relatório velho
+        t0 = time.perf_counter()
+        job["rc"] = run_win_exe(s["terminal"], [f"/config:{job['ini']}"] + s["args"])
+        job["seconds"] = time.perf_counter() - t0
+        emit("test", f"[test] {job['label']} rc={job['rc']} ({job['seconds']:.2f}s, {s['name']})", idx=job["idx"],
+             label=job["label"], rc=job["rc"], seconds=round(job["seconds"], 3), instance=s["name"], port=s["port"])
+        yield job
+
+    def parse_stage(job: dict, slot: int):
+        path = report_path(job["root"], job["report"])
+        if job["rc"] == 0 and path.exists():
+            job["metrics"] = parse_report(path)
+        shown = "  ".join(f"{k}={job['metrics'][k]:g}" for k in SHOWN_METRICS if k in job["metrics"])
+        emit("report", f"[parse] {job['label']}: {shown or 'sem relatório'}", idx=job["idx"],
+             label=job["label"], variant=job["variant"]["name"], symbol=job["symbol"],
+             period=job["period"], inputs=job["inputs"], metrics=job["metrics"])
+        yield job
+
+    stages = [
+        Stage("compilar", compile_stage, args.compile_workers, queue_size=len(variants)),
+        Stage("ini", ini_stage, 1, queue_size=1),
+        Stage("testar", test_stage, parallel, queue_size=queue_size),
+        Stage("relatório", parse_stage, 1),
+    ]
+    jobs, wall = run_stages(variants, stages)
+    jobs.sort(key=lambda j: j["idx"])
+
+    roots = list(dict.fromkeys(s["reports"] for s in slots))
+    emit("pipeline_done", f"[pipeline] {len(jobs)}/{total} teste(s) em {wall:.2f}s; relatórios em "
+                          f"{', '.join(to_windows_path(r) for r in roots)}",
+         tests=len(jobs), total=total, seconds=round(wall, 3), reports=roots)
+    if structured():
+        for s in stages:
+            emit("stage", stage=s.name, workers=s.workers, processed=s.processed, errors=s.errors,
+                 utilization=round(s.utilization(wall), 4), blocked=round(s.blocked, 3),
+                 first=round(s.first - s.started, 3) if s.first else None,
+                 last=round(s.last - s.started, 3) if s.last else None)
+    else:
+        for line in format_stage_table(stages, wall):
+            print(f"  {line}")
+    if args.results:
+        out = [{"variant": j["variant"]["name"], "ea": j["variant"]["ea"], "symbol": j["symbol"],
+                "period": j["period"], "inputs": j["inputs"], "rc": j["rc"], "report": j["report"],
+                "instance": j.get("instance"), "metrics": j["metrics"]} for j in jobs]
+        write_text_utf8(Path(args.results), json.dumps(out, indent=2, ensure_ascii=False))
+        emit("results_file", f"[pipeline] resultados: {args.results}", path=args.results)
+    failed = [j for j in jobs if j["rc"] != 0 or not j["metrics"]]
+    for msg in failures:
+        emit("failure", f"[!] {msg}", message=msg)
+    for j in failed[:20]:
+        emit("failure", f"[!] {j['label']}: rc={j['rc']}{'' if j['metrics'] else ', sem relatório'}",
+             label=j["label"], rc=j["rc"], report=bool(j["metrics"]))
+    if failures or failed or any(s.errors for s in stages):
+        sys.exit(1)
+
+def register(p):
+    psub = p.add_subparsers(dest="pcmd", required=True)
+    pr = psub.add_parser("run", help="Compila variantes e testa cada uma na matriz, com estágios sobrepostos")
+    pr.add_argument("--plan", required=True,
+                    help="JSON: variants [{name, ea, inputs}], matrix {symbol, period}, base (+ grid/zip/when do batch)")
+    pr.add_argument("--parallel", type=int,
+                    help="Terminais testando ao mesmo tempo, um por instância de --instances (padrão: todas); "
+                         "sem --instances, só 1")
+    pr.add_argument("--compile-workers", type=int, default=1, help="Compilações simultâneas do MetaEditor")
+    pr.add_argument("--queue-size", type=int, default=0,
+                    help="Testes prontos aguardando terminal (padrão: 2 x terminais); cheia = INIs esperam")
+    pr.add_argument("--port-base", type=int, help="Port do agente local do 1º terminal (+1 por instância)")
+    pr.add_argument("--rebuild", action="store_true", help="Recompila mesmo com .ex5 em dia")
+    pr.add_argument("--reports-dir", help="Onde o terminal grava os relatórios (padrão: Data Folder; só com um terminal)")
+    pr.add_argument("--ini-dir", default=str(Path.cwd()), help="Onde salvar os .ini gerados")
+    pr.add_argument("--results", help="Salvar resultados (variante, símbolo, período, inputs, métricas) em JSON")
+    pr.set_defaults(func=cmd_pipeline_run)
@@ -0,0 +1,24 @@
+# commands/profile.py — mtcli profile create
+import shutil
+from ..util import ensure_dir
+from ..env import resolve_paths
+from ..output import emit
+
+def cmd_profile_create(args):
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir: raise SystemExit(1)
+    charts = data_dir / "MQL5" / "Profiles" / "Charts"
+    dst = charts / args.name
+    if dst.exists():
+        emit("profile", f"[=] Profile '{args.name}' já existe em {dst}", name=args.name, path=dst, created=False)
+        return
+    src = charts / "Default"
+    if src.exists(): shutil.copytree(src, dst)
+    else: ensure_dir(dst)
+    emit("profile", f"[+] Profile criado em: {dst}", name=args.name, path=dst, created=True)
+
+def register(p):
+    profsub = p.add_subparsers(dest="pcmd", required=True)
+    pc = profsub.add_parser("create", help="Criar perfil (copia 'Default' se existir)")
+    pc.add_argument("name")
+    pc.set_defaults(func=cmd_profile_create)
@@ -0,0 +1,14 @@
+# commands/script.py — mtcli script install-aplicar-template
+from ..mql5 import mql5_source
+from ..instance import install_source
+from ..env import resolve_paths
+
+def cmd_script_install(args):
+    _, metaeditor, data_dir = resolve_paths(args)
+    if not (metaeditor and data_dir): raise SystemExit(1)
+    install_source(metaeditor, data_dir, "Scripts/AplicarTemplate.mq5", mql5_source("AplicarTemplate.mq5"))
+
+def register(p):
+    scsub = p.add_subparsers(dest="scmd", required=True)
+    si = scsub.add_parser("install-aplicar-template", help="Instala Scripts\\AplicarTemplate.mq5")
+    si.set_defaults(func=cmd_script_install)
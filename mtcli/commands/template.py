@@ -0,0 +1,74 @@
+# commands/template.py — mtcli template csv-plot|expert
+from pathlib import Path
+from ..tpl import CSV_PLOT_INDICATOR, CSV_PLOT_MAX_SERIES, build_tpl_csv_plot, split_series
+from ..env import resolve_paths, to_windows_path
+from ..instance import templates_dir
+from ..output import emit
+from ..tplcache import TemplateEngine, load_chart_plan, parse_inputs
+from ..util import write_text_utf16
+
+def cmd_template_csv_plot(args):
+    _, _, data_dir = resolve_paths(args)
+    columns = args.columns.replace(",", ";").split(";")
+    extra = {}
+    if args.separator is not None: extra["In_Separator"] = args.separator
+    if args.common_files: extra["In_CommonFiles"] = True
+    content = build_tpl_csv_plot(
+        args.symbol, args.period, args.file, columns,
+        per_instance=args.per_instance, indicator=args.indicator, extra_inputs=extra)
+    if args.out:
+        out = Path(args.out)
+    else:
+        if not data_dir: raise SystemExit(1)
+        out = templates_dir(data_dir) / args.name
+    write_text_utf16(out, "\ufeff" + content)  # .tpl: UTF-16 LE com BOM
+    groups = split_series(columns, args.per_instance)
+    lines = [f"[tpl] {len(groups)} instância(s) de {args.indicator} ({sum(map(len, groups))} séries)"]
+    lines += [f"  #{i}: {';'.join(group)}" for i, group in enumerate(groups, 1)]
+    lines.append(f"[tpl] escrito em {to_windows_path(out)}")
+    emit("template", "\n".join(lines), path=out, indicator=args.indicator, groups=groups)
+
+def cmd_template_expert(args):
+    _, _, data_dir = resolve_paths(args)
+    if not args.out_dir and not data_dir:
+        raise SystemExit(1)
+    if args.plan:
+        charts = load_chart_plan(args.plan)
+    elif args.expert:
+        charts = [{"expert": ea, "preset": args.preset, "inputs": parse_inputs(args.input), "base": args.base}
+                  for ea in args.expert]
+    else:
+        raise SystemExit("Informe --expert (repetível) ou --plan.")
+    engine = TemplateEngine(data_dir, args.out_dir)
+    counts = {"novo": 0, "reutilizado": 0}
+    for chart in charts:
+        name, status = engine.ensure(chart["expert"], chart.get("preset"), chart.get("inputs"), chart.get("base"))
+        counts[status] += 1
+        where = f"{chart['symbol']} {chart.get('period', '')}".strip() if chart.get("symbol") else ""
+        emit("template", f"  {status:11s} {name}  {chart['expert']} {where}".rstrip(), name=name,
+             status=status, expert=chart["expert"], symbol=chart.get("symbol"), period=chart.get("period"))
+    emit("templates_done", f"[tpl] {len(charts)} template(s): {counts['novo']} novo(s), {counts['reutilizado']} "
+         f"reutilizado(s) em {to_windows_path(engine.out_dir)}", counts=counts, out_dir=engine.out_dir)
+
+def register(p):
+    tplsub = p.add_subparsers(dest="tplcmd", required=True)
+    tcsv = tplsub.add_parser("csv-plot", help="Template com CSV_Reader_Plot (divide colunas entre instâncias)")
+    tcsv.add_argument("--file", required=True, help="CSV relativo a MQL5\\Files (In_FileName)")
+    tcsv.add_argument("--columns", required=True, help="Colunas separadas por ';' ou ','")
+    tcsv.add_argument("--per-instance", type=int, default=8, help=f"Séries por instância (1..{CSV_PLOT_MAX_SERIES})")
+    tcsv.add_argument("--name", default="CSVPlot.tpl", help="Nome do .tpl em MQL5\\Profiles\\Templates")
+    tcsv.add_argument("--indicator", default=CSV_PLOT_INDICATOR, help="Indicador relativo a MQL5\\Indicators")
+    tcsv.add_argument("--symbol")
+    tcsv.add_argument("--period")
+    tcsv.add_argument("--separator", help="In_Separator (ex.: \\t, ';')")
+    tcsv.add_argument("--common-files", action="store_true", help="In_CommonFiles=true")
+    tcsv.add_argument("--out", help="Salvar o .tpl neste caminho (ignora --name)")
+    tcsv.set_defaults(func=cmd_template_csv_plot)
+    tex = tplsub.add_parser("expert", help="Templates de EA (base + preset/inputs), reaproveitados por hash")
+    tex.add_argument("--expert", action="append", help="EA relativo a MQL5\\Experts (repetível)")
+    tex.add_argument("--preset", help="Preset .set (em MQL5\\Profiles\\Tester ou caminho)")
+    tex.add_argument("--input", action="append", help="Input do EA Nome=valor (repetível; vence o preset)")
+    tex.add_argument("--base", help="Template base (.tpl em MQL5\\Profiles\\Templates ou caminho)")
+    tex.add_argument("--plan", help="JSON com vários gráficos (symbol/period/expert/preset/inputs/base)")
+    tex.add_argument("--out-dir", help="Gravar aqui em vez de MQL5\\Profiles\\Templates")
+    tex.set_defaults(func=cmd_template_expert)
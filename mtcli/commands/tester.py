@@ -0,0 +1,394 @@
+# commands/tester.py — mtcli tester run|batch|regress|watch
+import json, math, queue, sys, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from ..ini import build_batch_ini, build_ini_tester, build_ini_testerinputs
+from ..plan import combo_label, compile_plan
+from ..env import resolve_paths, run_win_exe, spawn_win_exe, to_local_path, to_windows_path
+from ..instance import instance_terminal, select_instances
+from ..regress import compare_runs, format_diff_table, load_baseline, parse_tolerances, save_baseline
+from ..report import parse_report
+from ..output import emit, structured, warn
+from ..trace import span
+from ..util import timeframe_ok, unique_path, unique_stamp, write_text_utf16
+
+def cmd_tester_run(args):
+    terminal, _, data_dir = resolve_paths(args)
+    if not terminal: raise SystemExit(1)
+    if args.stream and not data_dir:
+        raise SystemExit("--stream precisa da Data Folder (--data-dir ou 'mtcli config set data_dir').")
+
+    ini = Path(args.ini) if args.ini else unique_path(Path.cwd(), "tester", ".ini")
+    report = args.report
+    if report and "{ts}" in report:
+        report = report.replace("{ts}", unique_stamp())
+
+    content = build_ini_tester(
+        ea=args.ea,
+        ea_params=args.ea_parameters,
+        symbol=args.symbol,
+        period=timeframe_ok(args.period),
+        model={"everytick":0,"ohlc1":1,"open":2,"math":3,"realticks":4}[args.model],
+        optimization={"off":0,"slow":1,"fast":2,"allsymbols":3}[args.opt],
+        criterion={"max_balance":0,"balance_x_profit":1,"balance_x_exp_payoff":2,"(100%-dd)xbal":3,
+                   "balance_x_recovery":4,"balance_x_sharpe":5,"custom_ontester":6,"complex":7}.get(args.criterion, None),
+        date_from=args.date_from, date_to=args.date_to,
+        forward_mode={"off":0,"1/2":1,"1/3":2,"1/4":3,"custom":4}.get(args.forward, None),
+        forward_date=args.forward_date,
+        deposit=args.deposit, currency=args.currency, leverage=args.leverage,
+        visual=args.visual, report=report, replace_report=args.replace_report,
+        shutdown=args.shutdown,
+        use_local={False:0, True:1}.get(args.use_local, None),
+        use_remote={False:0, True:1}.get(args.use_remote, None),
+        use_cloud={False:0, True:1}.get(args.use_cloud, None),
+        execution_mode=args.exec_delay_ms if args.exec_delay_ms is not None else None,
+        login=args.login, port=args.port
+    )
+
+    if args.inputs_json:
+        data = json.loads(Path(args.inputs_json).read_text(encoding="utf-8"))
+        if not isinstance(data, dict):
+            raise SystemExit("--inputs-json deve conter um objeto {param: espec}.")
+        content += "\n" + build_ini_testerinputs(data)
+
+    write_text_utf16(ini, content)
+    emit("ini_written", f"[i] INI do tester em: {ini}", path=ini, report=report)
+    if not args.stream:
+        sys.exit(run_win_exe(terminal, [f"/config:{ini}"]))
+    if args.opt == "off":
+        warn("[i] --stream acompanha passes de otimização; com --opt off não há passes a mostrar.")
+    watcher = new_watcher(args, data_dir, fresh=True)
+    proc = spawn_win_exe(terminal, [f"/config:{ini}"])
+    status = stream_optimization(args, watcher, proc)
+    sys.exit(1 if status == "abortada" else proc.returncode or 0)
+
+def new_watcher(args, data_dir: Path, fresh: bool):
+    from ..optstream import STORE_DEFAULT, OptWatcher, ResultStore
+    store = ResultStore(Path(args.store).expanduser() if args.store else STORE_DEFAULT)
+    run = args.run_id or unique_stamp()
+    store.start_run(run, args.ea, args.symbol, args.period)
+    return OptWatcher(data_dir, args.ea, run, store, fresh=fresh)
+
+def stream_optimization(args, watcher, proc=None) -> str:
+    '''
+    Imprime/grava cada passe até o terminal sair (ou, sem `proc`, até Ctrl+C /
+    --idle-exit). Com --abort-below, encerra o terminal quando o melhor passe não
+    atinge o mínimo depois de --abort-after passes. Retorna o status da execução.
+    '''
+    from ..optstream import format_pass, parse_abort_rule
+    rule = parse_abort_rule(getattr(args, "abort_below", None))
+    status, idle_since = "concluída", time.monotonic()
+    emit("opt_start", f"[opt] run {watcher.run}: frames em {to_windows_path(watcher.frames)} + Tester\\logs",
+         run=watcher.run, frames=watcher.frames, store=watcher.store.path)
+    try:
+        while True:
+            finished = proc is not None and proc.poll() is not None
+            new = watcher.poll()
+            first = watcher.passes - len(new)
+            for i, r in enumerate(new, 1):
+                emit("pass", format_pass(r, first + i, watcher.best), run=watcher.run, n=first + i,
+                     pass_id=r["pass"], source=r["source"], result=r.get("result"),
+                     metrics=r.get("metrics", {}), inputs=r.get("inputs", {}))
+            if new:
+                idle_since = time.monotonic()
+            reason = watcher.abort_reason(rule, getattr(args, "abort_after", 0))
+            notice = watcher.abort_warning(rule, getattr(args, "abort_after", 0))
+            if notice:
+                warn(notice)
+            if reason and proc is not None:
+                status = "abortada"
+                emit("opt_abort", f"[opt] Abortando: {reason}", run=watcher.run, reason=reason)
+                proc.terminate()
+                proc.wait()
+                break
+            if finished:
+                break
+            if proc is None and args.idle_exit and time.monotonic() - idle_since > args.idle_exit:
+                break
+            time.sleep(args.poll)
+    except KeyboardInterrupt:
+        status = "interrompida"
+        if proc is not None:
+            proc.terminate()
+    finally:
+        watcher.store.finish_run(watcher.run, status, watcher.passes)
+        watcher.store.close()
+    best = ", ".join(f"{k}={v:g}" for k, v in list(watcher.best.items())[:4])
+    emit("opt_done", f"[opt] {status}: {watcher.passes} passe(s) via {watcher.source}"
+                     f"{'; melhor ' + best if best else ''} -> {watcher.store.path}",
+         run=watcher.run, status=status, passes=watcher.passes, source=watcher.source,
+         best=watcher.best, store=watcher.store.path)
+    return status
+
+def cmd_tester_watch(args):
+    _, _, data_dir = resolve_paths(args)
+    if not data_dir:
+        raise SystemExit("Data Folder não configurada. Use --data-dir ou 'mtcli config set data_dir'.")
+    stream_optimization(args, new_watcher(args, data_dir, fresh=False))
+
+def write_combo_ini(ini_dir: Path, base: dict, idx: int, combo: dict, report: str,
+                    port: int|None = None) -> tuple[Path, str]:
+    '''Grava o INI de uma combinação do plano; retorna (ini, Report= usado).'''
+    label = combo_label(combo)
+    ini = ini_dir / f"batch_{idx:03d}_{label}.ini"
+    report_name = report.replace("{ts}", unique_stamp()).replace("{label}", label)
+    if port is not None:
+        base = dict(base, port=port)
+    write_text_utf16(ini, build_batch_ini(base, dict(base.get("inputs", {}), **combo), report_name))
+    return ini, report_name
+
+def cmd_tester_batch(args):
+    spec = json.loads(Path(args.plan).read_text(encoding="utf-8"))
+    base = spec.get("base", {})
+    plan = compile_plan(spec)
+    if args.explain:
+        emit("plan", f"[plan] {args.plan}", plan=args.plan, total=plan.count())
+        for line in plan.explain():
+            emit("plan_line", f"  {line}", line=line)
+        return
+
+    terminal, _, _ = resolve_paths(args)
+    if not terminal: raise SystemExit(1)
+    total = plan.count()
+    emit("batch_start", f"[i] Executando {total} combinações...", total=total, parallel=1)
+    rc_global = 0
+
+    metrics = None
+    if args.metrics_file or args.metrics_port:
+        from ..metrics import BatchMetrics, serve_metrics
+        metrics = BatchMetrics(total, plan=Path(args.plan).stem, textfile=args.metrics_file)
+        metrics.write()
+        if args.metrics_port:
+            serve_metrics(metrics, args.metrics_port)
+            emit("metrics_url", f"[metrics] http://127.0.0.1:{args.metrics_port}/metrics",
+                 url=f"http://127.0.0.1:{args.metrics_port}/metrics")
+
+    for idx, combo in enumerate(plan, 1):
+        label = combo_label(combo)
+
+        with span("tester.combo", idx=idx, label=label) as sp:
+            ini, _ = write_combo_ini(Path(args.ini_dir), base, idx, combo,
+                                     base.get("report", r"\reports\batch_{ts}.htm"))
+
+            emit("combo_start", f"[{idx}/{total}] {label} -> {ini}", idx=idx, total=total,
+                 label=label, combo=combo, ini=ini)
+            timing: dict = {}
+            if metrics: metrics.run_started()
+            rc = None
+            try:
+                rc = run_win_exe(terminal, [f"/config:{ini}"], timing=timing)
+            finally:  # terminal que nem sobe (OSError...) conta como falha e sai de in_flight
+                if metrics: metrics.run_finished(rc, timing)
+            sp["rc"] = rc
+        rc_global = rc_global or rc
+        emit("combo_done", f"[!] Código de retorno {rc} nesta combinação." if rc != 0 else None,
+             idx=idx, label=label, rc=rc, seconds=round(timing.get("run_s", 0.0), 3))
+
+    sys.exit(rc_global)
+
+def report_path(root: Path, report_name: str) -> Path:
+    '''Caminho local do relatório (Report= é relativo à pasta do terminal; sem extensão vira .htm).'''
+    path = root / report_name.lstrip("\\").replace("\\", "/")
+    return path if path.suffix else path.with_suffix(".htm")
+
+def test_slots(args, terminal: Path|None, data_dir: Path|None, need_terminal: bool = True) -> list[dict]:
+    '''
+    Um slot por terminal testando ao mesmo tempo. O MT5 não roda dois testes da
+    mesma instalação/Data Folder, então --parallel N usa N instâncias de --instances
+    (padrão: todas as selecionadas), cada uma com seu terminal, Data Folder e pasta de
+    relatórios. Sem --instances: um slot com o terminal e a Data Folder padrão.
+    '''
+    if not args.instances:
+        if (args.parallel or 1) > 1:
+            raise SystemExit("--parallel > 1 precisa de uma instância por terminal (--instances tag:workers, "
+                             "criadas com 'mtcli instance clone'): o MT5 não roda dois testes da mesma instalação.")
+        if need_terminal and not terminal:
+            raise SystemExit(1)
+        if not (args.reports_dir or data_dir):
+            raise SystemExit("Informe --data-dir ou --reports-dir (onde o terminal grava os relatórios).")
+        local = to_local_path(data_dir) if data_dir else None
+        slots = [{"name": local.name if local else "terminal", "terminal": terminal, "args": [],
+                  "data_dir": local, "reports": Path(args.reports_dir) if args.reports_dir else local}]
+    else:
+        chosen = select_instances(args.instances)
+        parallel = args.parallel or len(chosen)
+        if parallel > len(chosen):
+            raise SystemExit(f"--parallel {parallel} > {len(chosen)} instância(s) em --instances {args.instances}: "
+                             f"o MT5 não roda dois testes da mesma instalação (crie mais com 'mtcli instance clone').")
+        if args.reports_dir and parallel > 1:
+            raise SystemExit("--reports-dir vale para uma instância; com várias, cada uma grava na própria Data Folder.")
+        slots = []
+        for name, d in chosen[:parallel]:
+            exe, extra = instance_terminal(d)
+            if need_terminal and not exe:
+                raise SystemExit(f"[-] {name}: terminal64.exe não encontrado (nem portable, nem origin.txt); "
+                                 f"registre com 'mtcli instance add {name} <data_dir> --terminal <exe>'.")
+            local = to_local_path(d)
+            slots.append({"name": name, "terminal": exe, "args": extra, "data_dir": local,
+                          "reports": Path(args.reports_dir) if args.reports_dir else local})
+    for i, slot in enumerate(slots):
+        slot["port"] = args.port_base + i if args.port_base else None
+    return slots
+
+def cmd_tester_regress(args):
+    spec = json.loads(Path(args.plan).read_text(encoding="utf-8"))
+    base = dict(spec.get("base", {}), replace_report=True)
+    plan = compile_plan(spec)
+    tolerances = parse_tolerances(spec.get("tolerances"), args.tol)
+    baseline_path = Path(args.baseline)
+    baseline = None if args.update_baseline else load_baseline(baseline_path)
+
+    terminal, _, data_dir = resolve_paths(args) if not args.instances else (None, None, None)
+    slots = test_slots(args, terminal, data_dir, need_terminal=not args.no_run)
+    report_tpl = base.get("report", "")
+    if "{label}" not in report_tpl:
+        report_tpl = r"\reports\regress\{label}.htm"
+
+    ini_dir = Path(args.ini_dir)
+    runs = []
+    for idx, combo in enumerate(plan, 1):
+        label = combo_label(combo)
+        runs.append({"idx": idx, "label": label, "combo": combo, "rc": 0,
+                     "inputs": dict(base.get("inputs", {}), **combo)})
+    total = len(runs)
+
+    if not args.no_run:
+        # Cada instância (slot) roda um teste por vez: o slot volta para a fila ao terminar.
+        free: queue.Queue = queue.Queue()
+        for slot in slots:
+            free.put(slot)
+        done = 0
+        lock = threading.Lock()
+
+        def run_one(run: dict):
+            nonlocal done
+            slot = free.get()
+            try:
+                with span("tester.combo", idx=run["idx"], label=run["label"], instance=slot["name"]) as sp:
+                    ini, run["report"] = write_combo_ini(ini_dir, base, run["idx"], run["combo"], report_tpl, slot["port"])
+                    run["root"] = slot["reports"]
+                    report_path(run["root"], run["report"]).unlink(missing_ok=True)  # nada de relatório velho
+                    run["rc"] = sp["rc"] = run_win_exe(slot["terminal"], [f"/config:{ini}"] + slot["args"])
+            finally:
+                free.put(slot)
+            with lock:
+                done += 1
+                emit("combo_done", f"[{done}/{total}] {run['label']} rc={run['rc']} ({slot['name']})", idx=run["idx"],
+                     done=done, total=total, label=run["label"], rc=run["rc"], report=run["report"],
+                     instance=slot["name"])
+
+        emit("batch_start", f"[i] Executando {total} combinações ({len(slots)} instância(s) em paralelo)...",
+             total=total, parallel=len(slots), instances=[s["name"] for s in slots])
+        with ThreadPoolExecutor(max_workers=len(slots)) as pool:
+            list(pool.map(run_one, runs))
+
+    current: dict[str, dict] = {}
+    for run in runs:
+        name = run.get("report") or report_tpl.replace("{ts}", "").replace("{label}", run["label"])
+        if "root" in run:
+            path = report_path(run["root"], name)
+        else:  # --no-run: o relatório pode estar em qualquer das instâncias
+            paths = [report_path(s["reports"], name) for s in slots]
+            path = next((p for p in paths if p.exists()), paths[0])
+        metrics = parse_report(path) if path.exists() and run["rc"] == 0 else {}
+        current[run["label"]] = {"inputs": run["inputs"], "metrics": metrics}
+    parsed = sum(1 for r in current.values() if r["metrics"])
+    roots = ", ".join(to_windows_path(s["reports"]) for s in slots)
+    emit("reports_parsed", f"[i] {parsed}/{total} relatório(s) lidos de {roots}",
+         parsed=parsed, total=total, roots=[s["reports"] for s in slots])
+
+    if args.update_baseline:
+        save_baseline(baseline_path, {k: v for k, v in current.items() if v["metrics"]})
+        emit("baseline_updated", f"[regress] Baseline atualizado: {baseline_path} ({parsed} combinação(ões))",
+             path=baseline_path, combos=parsed)
+        sys.exit(0 if parsed == total else 1)
+
+    diffs = compare_runs(current, baseline, tolerances)
+    failing = diffs if args.strict else [d for d in diffs if d["status"] not in ("melhor", "sem baseline")]
+    if structured():
+        for d in diffs:  # rel infinito (baseline 0) não existe em JSON
+            emit("diff", **{k: (None if isinstance(v, float) and not math.isfinite(v) else v) for k, v in d.items()})
+    else:
+        for line in format_diff_table(diffs, args.max_rows):
+            print(line)
+    if failing:
+        emit("regress_result", f"[regress] FALHOU: {len(failing)} diferença(s) fora da tolerância em {total} combinação(ões).",
+             ok=False, failing=len(failing), total=total)
+        sys.exit(1)
+    emit("regress_result", f"[regress] OK: {total} combinação(ões) dentro da tolerância.", ok=True, failing=0, total=total)
+
+def _stream_args(sp):
+    sp.add_argument("--store", help="SQLite dos passes (padrão: ~/.mtcli/optimizations.db)")
+    sp.add_argument("--run-id", help="Identificador da execução no store (padrão: carimbo único)")
+    sp.add_argument("--poll", type=float, default=0.5, help="Intervalo de leitura dos arquivos (s)")
+
+def register(p):
+    ts = p.add_subparsers(dest="tcmd", required=True)
+    tr = ts.add_parser("run", help="Rodar teste/otimização")
+    tr.add_argument("--ea", required=True, help=r"EA relativo (ex.: Examples\MACD\MACD Sample)")
+    tr.add_argument("--ea-parameters", dest="ea_parameters", help=r"Arquivo .set em MQL5\Profiles\Tester (opcional)")
+    tr.add_argument("--symbol", required=True)
+    tr.add_argument("--period", required=True)
+    tr.add_argument("--model", choices=["everytick","ohlc1","open","math","realticks"], default="everytick")
+    tr.add_argument("--opt", choices=["off","slow","fast","allsymbols"], default="off")
+    tr.add_argument("--criterion", choices=["max_balance","balance_x_profit","balance_x_exp_payoff",
+                                            "(100%-dd)xbal","balance_x_recovery","balance_x_sharpe",
+                                            "custom_ontester","complex"])
+    tr.add_argument("--date-from", dest="date_from")
+    tr.add_argument("--date-to", dest="date_to")
+    tr.add_argument("--forward", choices=["off","1/2","1/3","1/4","custom"])
+    tr.add_argument("--forward-date", dest="forward_date")
+    tr.add_argument("--deposit")
+    tr.add_argument("--currency")
+    tr.add_argument("--leverage")
+    tr.add_argument("--visual", action="store_true", help="Ativa teste visual")
+    tr.add_argument("--report", help=r"Caminho relativo ao diretório do terminal (use {ts} p/ carimbo de tempo)")
+    tr.add_argument("--replace-report", action="store_true")
+    tr.add_argument("--shutdown", action="store_true", help="Fecha terminal ao terminar")
+    tr.add_argument("--use-local", action="store_true")
+    tr.add_argument("--use-remote", action="store_true")
+    tr.add_argument("--use-cloud", action="store_true")
+    tr.add_argument("--exec-delay-ms", type=int, help="ExecutionMode (>0 atraso fixo; -1 aleatório)")
+    tr.add_argument("--login", help="Número de conta emulado (opcional)")
+    tr.add_argument("--port", type=int, help="Port do agente local (para rodar paralelos)")
+    tr.add_argument("--inputs-json", help="Arquivo JSON com inputs/otimizações p/ [TesterInputs]")
+    tr.add_argument("--ini", help="Salvar INI gerado neste caminho")
+    tr.add_argument("--stream", action="store_true",
+                    help="Mostra/grava cada passe da otimização enquanto roda (frames do MtcliFrames.mqh + log do tester)")
+    tr.add_argument("--abort-below", metavar="MÉTRICA=VALOR",
+                    help="--stream: encerra o terminal se o melhor passe ficar abaixo (ex.: \"Profit Factor=1.1\")")
+    tr.add_argument("--abort-after", type=int, default=50, help="--abort-below: passes antes de avaliar")
+    _stream_args(tr)
+    tr.set_defaults(func=cmd_tester_run)
+
+    tw = ts.add_parser("watch", help="Acompanha uma otimização já em andamento (ex.: iniciada pela GUI)")
+    tw.add_argument("--ea", required=True, help="EA otimizado (nome do arquivo de frames)")
+    tw.add_argument("--symbol")
+    tw.add_argument("--period")
+    tw.add_argument("--idle-exit", type=float, default=0.0, help="Sai após N segundos sem passes novos (0 = Ctrl+C)")
+    _stream_args(tw)
+    tw.set_defaults(func=cmd_tester_watch)
+
+    tb = ts.add_parser("batch", help="Rodar várias combinações (grid) em série")
+    tb.add_argument("--plan", required=True, help="JSON com 'base' e 'grid' (+ zip/when/constraints/ignore)")
+    tb.add_argument("--explain", action="store_true", help="Só compila o plano e mostra quanto cada regra podou")
+    tb.add_argument("--ini-dir", default=str(Path.cwd()), help="Onde salvar os .ini gerados")
+    tb.add_argument("--metrics-file", help="Textfile Prometheus (.prom) atualizado a cada combinação")
+    tb.add_argument("--metrics-port", type=int, help="Servir /metrics em 127.0.0.1:PORT durante o batch")
+    tb.set_defaults(func=cmd_tester_batch)
+
+    tg = ts.add_parser("regress", help="Roda o plano e compara as métricas com um baseline")
+    tg.add_argument("--plan", required=True, help="JSON do plano (mesmo formato do batch; 'tolerances' opcional)")
+    tg.add_argument("--baseline", required=True, help="Diretório (<label>.json) ou banco SQLite (.db)")
+    tg.add_argument("--update-baseline", action="store_true", help="Grava os resultados como novo baseline")
+    tg.add_argument("--tol", action="append", metavar="MÉTRICA=rel:X,abs:Y",
+                    help="Tolerância por métrica ('*' = demais); repetível")
+    tg.add_argument("--strict", action="store_true", help="Falha também em melhorias/combinações sem baseline")
+    tg.add_argument("--parallel", type=int,
+                    help="Terminais simultâneos, um por instância de --instances (padrão: todas; sem --instances, 1)")
+    tg.add_argument("--port-base", type=int, help="Port do agente local da 1ª instância (+1 por instância)")
+    tg.add_argument("--reports-dir", help="Onde o terminal grava os relatórios (padrão: Data Folder da instância)")
+    tg.add_argument("--no-run", action="store_true", help="Só lê relatórios já existentes e compara")
+    tg.add_argument("--ini-dir", default=str(Path.cwd()), help="Onde salvar os .ini gerados")
+    tg.add_argument("--max-rows", type=int, default=50, help="Linhas da tabela de diferenças")
+    tg.set_defaults(func=cmd_tester_regress)
@@ -0,0 +1,29 @@
+# commands/trace.py — mtcli trace summarize
+import json
+from pathlib import Path
+from ..output import emit, structured
+from ..trace import print_trace_summary, read_trace_events, summarize_trace
+
+def cmd_trace_summarize(args):
+    events = []
+    for f in args.files:
+        events.extend(read_trace_events(Path(f)))
+    rows = summarize_trace(events)
+    if structured():
+        for row in rows:
+            emit("span", **row)
+        return
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+        return
+    if not rows:
+        print("[trace] Nenhum span encontrado.")
+        return
+    print_trace_summary(rows)
+
+def register(p):
+    trcsub = p.add_subparsers(dest="trcmd", required=True)
+    trs = trcsub.add_parser("summarize", help="Tabela p50/p95 por span")
+    trs.add_argument("files", nargs="+", help="Arquivos .jsonl/.json de trace")
+    trs.add_argument("--json", action="store_true", help="Emite o resumo como JSON")
+    trs.set_defaults(func=cmd_trace_summarize, no_trace=True)
@@ -0,0 +1,33 @@
+# config.py — configuração persistente (~/.mtcli/config.json)
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from .atomic import atomic_write, file_lock
+
+CONFIG_DIR = Path.home() / ".mtcli"
+CONFIG_FILE = CONFIG_DIR / "config.json"
+CONFIG_LOCK = CONFIG_DIR / "config.json.lock"
+CONFIG_KEYS = {
+    "terminal": "Caminho para terminal64.exe",
+    "metaeditor": "Caminho para metaeditor64.exe",
+    "data_dir": "Caminho para a Data Folder"
+}
+
+def load_config() -> dict:
+    if not CONFIG_FILE.exists():
+        return {}
+    try:
+        return json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def save_config(cfg: dict):
+    atomic_write(CONFIG_FILE, json.dumps(cfg, indent=2, ensure_ascii=False).encode("utf-8"))
+
+@contextmanager
+def edit_config():
+    '''Lê-modifica-grava o config.json sob lock: dois 'config set' simultâneos não se perdem.'''
+    with file_lock(CONFIG_LOCK):
+        cfg = load_config()
+        yield cfg
+        save_config(cfg)
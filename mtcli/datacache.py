@@ -0,0 +1,238 @@
+# datacache.py — cache colunar local de barras/ticks exportados do terminal
+#
+#   ~/.mtcli/data/<SYMBOL>/<PERIOD>/      (ticks: <SYMBOL>/TICKS/)
+#     index.json    {"kind", "covered": [[de, até), ...], "chunks": {"2024-01": {"rows", "first", "last"}}}
+#     2024-01.col   um chunk por mês (ticks: por dia)
+#
+# Chunk: cabeçalho de 16 bytes (b"MTC1", nº de colunas u32, linhas u64) seguido das
+# colunas inteiras, uma após a outra, cada uma alinhada em 8 bytes. Assim cada coluna
+# é um np.memmap direto do arquivo (view sem cópia). 'covered' guarda os intervalos já
+# pedidos ao terminal (em segundos): um fim de semana sem barras continua "coberto" e
+# não é pedido de novo; só as lacunas vão ao terminal.
+import json, os, struct, time
+from array import array
+from pathlib import Path
+from .atomic import atomic_write, unique_token
+from .config import CONFIG_DIR
+from .util import ensure_dir
+
+DATA_DIR = CONFIG_DIR / "data"
+MAGIC = b"MTC1"
+HEADER = struct.Struct("<4sIQ")
+
+# Layout dos structs MQL5 gravados com FileWriteArray (pack 1) e as colunas do cache.
+SCHEMAS = {
+    "bars": {"record": "<qddddqiq", "key": "time", "scale": 1, "chunk": "%Y-%m",
+             "columns": [("time", "q"), ("open", "d"), ("high", "d"), ("low", "d"), ("close", "d"),
+                         ("tick_volume", "q"), ("spread", "i"), ("real_volume", "q")]},
+    "ticks": {"record": "<qdddQqId", "key": "time_msc", "scale": 1000, "chunk": "%Y-%m-%d",
+              "columns": [("time", "q"), ("bid", "d"), ("ask", "d"), ("last", "d"), ("volume", "Q"),
+                          ("time_msc", "q"), ("flags", "I"), ("volume_real", "d")]},
+}
+
+def _aligned(n: int) -> int:
+    return (n + 7) & ~7
+
+def column_offsets(kind: str, rows: int) -> list[int]:
+    '''Offset (bytes) de cada coluna num chunk com `rows` linhas.'''
+    offsets, pos = [], HEADER.size
+    for _, code in SCHEMAS[kind]["columns"]:
+        offsets.append(pos)
+        pos += _aligned(rows * array(code).itemsize)
+    return offsets
+
+def decode_records(kind: str, raw: bytes) -> dict[str, array]:
+    '''Bytes de FileWriteArray(MqlRates[]/MqlTick[]) -> colunas.'''
+    schema = SCHEMAS[kind]
+    cols = {name: array(code) for name, code in schema["columns"]}
+    names = [name for name, _ in schema["columns"]]
+    usable = len(raw) - len(raw) % struct.calcsize(schema["record"])
+    for rec in struct.iter_unpack(schema["record"], raw[:usable]):
+        for name, value in zip(names, rec):
+            cols[name].append(value)
+    return cols
+
+def read_chunk(path: Path, kind: str) -> dict[str, array]:
+    '''Chunk inteiro em arrays da stdlib (cópia; para views use DataCache.read).'''
+    raw = path.read_bytes()
+    magic, ncols, rows = HEADER.unpack_from(raw)
+    if magic != MAGIC or ncols != len(SCHEMAS[kind]["columns"]):
+        raise ValueError(f"Chunk inválido: {path}")
+    cols = {}
+    for (name, code), off in zip(SCHEMAS[kind]["columns"], column_offsets(kind, rows)):
+        a = array(code)
+        a.frombytes(raw[off:off + rows * a.itemsize])
+        cols[name] = a
+    return cols
+
+def write_chunk(path: Path, kind: str, cols: dict[str, array]):
+    schema = SCHEMAS[kind]
+    rows = len(cols[schema["key"]])
+    ensure_dir(path.parent)
+    tmp = path.with_name(f".{path.name}.{unique_token()}.tmp")
+    with tmp.open("wb") as fh:
+        fh.write(HEADER.pack(MAGIC, len(schema["columns"]), rows))
+        for name, code in schema["columns"]:
+            data = cols[name].tobytes()
+            fh.write(data + b"\0" * (_aligned(len(data)) - len(data)))
+    os.replace(tmp, path)
+
+def merge_intervals(intervals: list[list[int]]) -> list[list[int]]:
+    out: list[list[int]] = []
+    for a, b in sorted(intervals):
+        if out and a <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], b)
+        elif a < b:
+            out.append([a, b])
+    return out
+
+def subtract_intervals(start: int, end: int, covered: list[list[int]]) -> list[tuple[int, int]]:
+    '''Partes de [start, end) fora de `covered` (já mesclado e ordenado).'''
+    gaps, pos = [], start
+    for a, b in covered:
+        if b <= pos:
+            continue
+        if a >= end:
+            break
+        if a > pos:
+            gaps.append((pos, a))
+        pos = max(pos, b)
+    if pos < end:
+        gaps.append((pos, end))
+    return gaps
+
+class DataCache:
+    '''Cache de barras (por símbolo/período/mês) ou ticks (por símbolo/dia).'''
+
+    def __init__(self, root: Path|None = None):
+        self.root = Path(root) if root else DATA_DIR
+
+    def series_dir(self, symbol: str, period: str, kind: str = "bars") -> Path:
+        return self.root / symbol.upper() / ("TICKS" if kind == "ticks" else period.upper())
+
+    def load_index(self, symbol: str, period: str, kind: str = "bars") -> dict:
+        try:
+            return json.loads((self.series_dir(symbol, period, kind) / "index.json").read_text(encoding="utf-8"))
+        except Exception:
+            return {"kind": kind, "covered": [], "chunks": {}}
+
+    def save_index(self, symbol: str, period: str, kind: str, index: dict):
+        atomic_write(self.series_dir(symbol, period, kind) / "index.json", json.dumps(index, indent=1).encode("utf-8"))
+
+    def missing(self, symbol: str, period: str, start: int, end: int, kind: str = "bars") -> list[tuple[int, int]]:
+        '''Intervalos de [start, end) (segundos) que ainda precisam vir do terminal.'''
+        return subtract_intervals(start, end, self.load_index(symbol, period, kind)["covered"])
+
+    def chunks_for(self, symbol: str, period: str, start: int, end: int, kind: str = "bars") -> list[Path]:
+        '''Chunks com linhas em [start, end), em ordem.'''
+        index = self.load_index(symbol, period, kind)
+        scale = SCHEMAS[kind]["scale"]
+        base = self.series_dir(symbol, period, kind)
+        return [base / f"{name}.col" for name, meta in sorted(index["chunks"].items())
+                if meta["rows"] and meta["first"] < end * scale and meta["last"] >= start * scale]
+
+    def ingest(self, symbol: str, period: str, cols: dict[str, array], start: int, end: int,
+               kind: str = "bars") -> int:
+        '''
+        Grava as linhas exportadas e marca [start, end) como coberto. Barras: mescla
+        com os chunks existentes (a linha nova vence em chave repetida). Ticks: vários
+        podem ter o mesmo time_msc, então as linhas antigas de [start, end) são
+        trocadas pelo bloco novo inteiro. Retorna o nº de linhas.
+        '''
+        schema = SCHEMAS[kind]
+        key, scale = schema["key"], schema["scale"]
+        names = [name for name, _ in schema["columns"]]
+        index = self.load_index(symbol, period, kind)
+        groups: dict[str, list[int]] = {}
+        for i, k in enumerate(cols[key]):
+            groups.setdefault(time.strftime(schema["chunk"], time.gmtime(k // scale)), []).append(i)
+        if kind == "ticks":  # chunks com ticks antigos no intervalo, mesmo sem ticks novos
+            for path in self.chunks_for(symbol, period, start, end, kind):
+                groups.setdefault(path.stem, [])
+        base = self.series_dir(symbol, period, kind)
+        lo, hi = start * scale, end * scale
+        for name, rows in groups.items():
+            path = base / f"{name}.col"
+            old = read_chunk(path, kind) if path.exists() else {c: array(code) for c, code in schema["columns"]}
+            if kind == "ticks":
+                kept = [tuple(old[c][j] for c in names) for j, k in enumerate(old[key]) if not lo <= k < hi]
+                merged = sorted(kept + [tuple(cols[c][i] for c in names) for i in rows],
+                                key=lambda r: r[names.index(key)])  # estável: mantém a ordem do terminal
+            else:
+                by_key: dict[int, tuple] = {}
+                for j, k in enumerate(old[key]):
+                    by_key[k] = tuple(old[c][j] for c in names)
+                for i in rows:
+                    by_key[cols[key][i]] = tuple(cols[c][i] for c in names)
+                merged = [by_key[k] for k in sorted(by_key)]
+            if not merged:
+                path.unlink(missing_ok=True)
+                index["chunks"].pop(name, None)
+                continue
+            out = {c: array(code) for c, code in schema["columns"]}
+            for row in merged:
+                for c, v in zip(names, row):
+                    out[c].append(v)
+            write_chunk(path, kind, out)
+            index["chunks"][name] = {"rows": len(out[key]), "first": out[key][0], "last": out[key][-1]}
+        # Barra/dia em formação: não marca o futuro como coberto.
+        index["covered"] = merge_intervals(index["covered"] + [[start, min(end, int(time.time()))]])
+        self.save_index(symbol, period, kind, index)
+        return len(cols[key])
+
+    def read_arrays(self, symbol: str, period: str, start: int, end: int, kind: str = "bars") -> dict[str, array]:
+        '''Linhas de [start, end) em arrays da stdlib (cópia; não precisa de numpy).'''
+        schema = SCHEMAS[kind]
+        key, scale = schema["key"], schema["scale"]
+        out = {c: array(code) for c, code in schema["columns"]}
+        for path in self.chunks_for(symbol, period, start, end, kind):
+            cols = read_chunk(path, kind)
+            keep = [i for i, k in enumerate(cols[key]) if start * scale <= k < end * scale]
+            if keep:
+                lo, hi = keep[0], keep[-1] + 1
+                for c in out:
+                    out[c].extend(cols[c][lo:hi])
+        return out
+
+    def iter_views(self, symbol: str, period: str, start: int, end: int, kind: str = "bars", columns=None):
+        '''Um dict {coluna: np.ndarray} por chunk, fatiado em [start, end); views do memmap, sem cópia.'''
+        np = _numpy()
+        schema = SCHEMAS[kind]
+        key, scale = schema["key"], schema["scale"]
+        wanted = columns or [name for name, _ in schema["columns"]]
+        for path in self.chunks_for(symbol, period, start, end, kind):
+            with path.open("rb") as fh:
+                magic, ncols, rows = HEADER.unpack(fh.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Chunk inválido: {path}")
+            mm = np.memmap(path, dtype=np.uint8, mode="r")
+            views = {}
+            for (name, code), off in zip(schema["columns"], column_offsets(kind, rows)):
+                if name in wanted or name == key:
+                    views[name] = np.frombuffer(mm, dtype=np.dtype(code).newbyteorder("<"), count=rows, offset=off)
+            keys = views[key]
+            lo, hi = np.searchsorted(keys, [start * scale, end * scale], side="left")
+            if hi > lo:
+                yield {name: v[lo:hi] for name, v in views.items() if name in wanted}
+
+    def read(self, symbol: str, period: str, start: int, end: int, kind: str = "bars", columns=None) -> dict:
+        '''
+        {coluna: np.ndarray} de [start, end). Dentro de um único chunk são views do
+        memmap (sem cópia); atravessando chunks, as partes são concatenadas.
+        '''
+        np = _numpy()
+        parts = list(self.iter_views(symbol, period, start, end, kind, columns))
+        wanted = columns or [name for name, _ in SCHEMAS[kind]["columns"]]
+        codes = dict(SCHEMAS[kind]["columns"])
+        if not parts:
+            return {c: np.empty(0, dtype=np.dtype(codes[c])) for c in wanted}
+        if len(parts) == 1:
+            return parts[0]
+        return {c: np.concatenate([p[c] for p in parts]) for c in wanted}
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise SystemExit("numpy não instalado: 'pip install numpy' para ler o cache como arrays (memmap).")
+    return numpy
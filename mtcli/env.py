@@ -0,0 +1,187 @@
+# env.py — detecção de ambiente (Windows/WSL), caminhos e execução de .exe
+import os, platform, subprocess, time
+from pathlib import Path
+from .config import load_config
+from .output import child_stdout, warn
+from .trace import traced
+
+def is_wsl():
+    rel = platform.release().lower()
+    return "microsoft" in rel or "wsl" in os.environ.get("WSL_DISTRO_NAME","").lower()
+
+@traced("wslpath", lambda p: {"to": "win"})
+def wsl_to_win(p: Path) -> str:
+    s = str(p)
+    if not is_wsl():
+        return s
+    try:
+        out = subprocess.check_output(["wslpath","-w",s]).decode().strip()
+        return out
+    except Exception:
+        if s.startswith("/mnt/") and len(s) > 7:
+            drive = s[5].upper()
+            rest = s[7:].replace("/", "\\")
+            return f"{drive}:\\{rest}"
+        return s
+
+@traced("wslpath", lambda p: {"to": "wsl"})
+def win_to_wsl(p: Path) -> Path:
+    s = str(p)
+    if not is_wsl() or s.startswith("/"):
+        return Path(s)
+    try:
+        out = subprocess.check_output(["wslpath","-u", s]).decode().strip()
+        if out:
+            return Path(out)
+    except Exception:
+        pass
+    if len(s) >= 3 and s[1] == ":" and s[2] in ("\\", "/"):
+        drive = s[0].lower()
+        rest = s[2:].replace("\\", "/")
+        return Path(f"/mnt/{drive}/{rest.lstrip('/')}")
+    return Path(s)
+
+def _exe_name(exe) -> str:
+    return str(exe).replace("\\", "/").rsplit("/", 1)[-1]
+
+def _call_timed(cmd: list[str], timing: dict|None) -> int:
+    if timing is None:
+        return subprocess.call(cmd, stdout=child_stdout())
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, stdout=child_stdout())
+    timing["launch_s"] = time.perf_counter() - t0
+    rc = proc.wait()
+    timing["run_s"] = time.perf_counter() - t0
+    return rc
+
+def win_exe_argv(exe: Path, args: list[str]) -> list[str]:
+    '''argv para executar um .exe do Windows tanto no Windows quanto no WSL.'''
+    if is_wsl():
+        # Executa o binário Windows diretamente via caminho WSL, evitando
+        # as regras de quoting do cmd.exe (que quebram em paths com espaços).
+        try:
+            exe_wsl = subprocess.check_output(["wslpath", "-u", str(exe)]).decode().strip()
+        except Exception:
+            exe_wsl = str(exe)
+
+        conv: list[str] = []
+        for a in args:
+            if a.startswith("/") and ":" in a:
+                k, v = a.split(":", 1)
+                converted = v
+                # Aceita tanto paths Windows quanto WSL no parâmetro.
+                if v.startswith("/"):
+                    try:
+                        converted = wsl_to_win(Path(v))
+                    except Exception:
+                        converted = v
+                conv.append(f"{k}:{converted}")
+            else:
+                conv.append(a)
+        return [exe_wsl] + conv
+    return [str(exe)] + args
+
+@traced("run_win_exe", lambda exe, args, **_: {"exe": _exe_name(exe), "argc": len(args)})
+def run_win_exe(exe: Path, args: list[str], timing: dict|None = None) -> int:
+    '''
+    Executa um .exe do Windows e espera sair.
+    Com `timing`, preenche launch_s (spawn do processo) e run_s (até sair).
+    '''
+    return _call_timed(win_exe_argv(exe, args), timing)
+
+def spawn_win_exe(exe: Path, args: list[str]) -> subprocess.Popen:
+    '''Como run_win_exe, mas sem esperar: para acompanhar/encerrar o processo.'''
+    return subprocess.Popen(win_exe_argv(exe, args), stdout=child_stdout())
+
+def powershell_executable() -> str:
+    if is_wsl():
+        return r"/mnt/c/Windows/System32/WindowsPowerShell/v1.0/powershell.exe"
+    return "powershell.exe"
+
+def run_powershell(command: str) -> int:
+    return subprocess.call([powershell_executable(), "-NoProfile", "-Command", command], stdout=child_stdout())
+
+def find_default_terminal() -> Path|None:
+    guesses = [
+        Path("C:/Program Files/MetaTrader 5/terminal64.exe"),
+        Path("C:/Program Files/MetaTrader 5/terminal.exe"),
+        Path("C:/Program Files (x86)/MetaTrader 5/terminal64.exe"),
+        Path("C:/Program Files (x86)/MetaTrader 5/terminal.exe"),
+    ]
+    for g in guesses:
+        if g.exists():
+            return g
+    return None
+
+def find_default_metaeditor() -> Path|None:
+    guesses = [
+        Path("C:/Program Files/MetaTrader 5/metaeditor64.exe"),
+        Path("C:/Program Files/MetaTrader 5/metaeditor.exe"),
+        Path("C:/Program Files (x86)/MetaTrader 5/metaeditor64.exe"),
+        Path("C:/Program Files (x86)/MetaTrader 5/metaeditor.exe"),
+    ]
+    for g in guesses:
+        if g.exists():
+            return g
+    return None
+
+def terminal_data_root() -> Path:
+    return Path(os.path.expandvars(r"C:\Users\%USERNAME%\AppData\Roaming\MetaQuotes\Terminal"))
+
+def find_data_dirs(root: Path|None = None) -> list[Path]:
+    r'''Data Folders (com MQL5/) sob MetaQuotes\Terminal, da usada mais recentemente para a mais antiga.'''
+    base = root or terminal_data_root()
+    if not base.exists():
+        return []
+    candidates = [p for p in base.iterdir() if p.is_dir() and (p / "MQL5").exists()]
+    def key(p):
+        ini = p / "Config" / "terminal.ini"
+        try: return ini.stat().st_mtime
+        except Exception: return 0
+    return sorted(candidates, key=key, reverse=True)
+
+def find_default_data_dir() -> Path|None:
+    dirs = find_data_dirs()
+    return dirs[0] if dirs else None
+
+def to_local_path(value: str|Path) -> Path:
+    path = Path(value)
+    s = str(path)
+    if is_wsl() and len(s) >= 2 and s[1] == ':':
+        return win_to_wsl(path)
+    if is_wsl() and s.startswith("\\\\"):
+        return win_to_wsl(path)
+    return path
+
+def _coerce_path(value: str|Path|None) -> Path|None:
+    if value in (None, ""):
+        return None
+    return Path(value)
+
+@traced("wslpath", lambda path: {"to": "win"})
+def to_windows_path(path: Path) -> str:
+    try:
+        return subprocess.check_output(["wslpath", "-w", str(path)]).decode().strip()
+    except Exception:
+        return str(path)
+
+@traced("resolve_paths")
+def resolve_paths(args):
+    cfg = load_config()
+    terminal = _coerce_path(
+        args.terminal or os.environ.get("MTCLI_TERMINAL") or cfg.get("terminal")
+    ) or find_default_terminal()
+    metaeditor = _coerce_path(
+        args.metaeditor or os.environ.get("MTCLI_METAEDITOR") or cfg.get("metaeditor")
+    ) or find_default_metaeditor()
+    data_dir = _coerce_path(
+        args.data_dir or os.environ.get("MTCLI_DATA_DIR") or cfg.get("data_dir")
+    ) or find_default_data_dir()
+
+    if not terminal:
+        warn("[-] Não encontrei terminal64.exe. Use --terminal ou 'mtcli config set terminal' para informar o caminho.")
+    if not metaeditor:
+        warn("[-] Não encontrei metaeditor64.exe. Use --metaeditor ou 'mtcli config set metaeditor' para informar o caminho.")
+    if not data_dir:
+        warn("[-] Não encontrei Data Folder. Use --data-dir ou 'mtcli config set data_dir' para informar o caminho.")
+    return terminal, metaeditor, data_dir
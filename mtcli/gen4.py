@@ -0,0 +1,484 @@
+# gen4.py — integração com o Gen4Engine (gen4_cli.py, fila de jobs, serviço e supervisor)
+import functools, inspect, json, os, signal, subprocess, sys, time
+from pathlib import Path
+from .config import CONFIG_DIR
+from .atomic import atomic_write
+from .env import is_wsl, run_powershell, win_to_wsl, wsl_to_win
+from .output import child_stdout, emit, warn
+
+@functools.lru_cache(maxsize=None)
+def find_gen4_cli(data_dir: Path|None) -> Path|None:
+    candidates: list[Path] = []
+    env_cli = os.environ.get("MTCLI_GEN4_CLI") or os.environ.get("MTCLI_ENGINEIV_CLI")
+    if env_cli:
+        candidates.append(Path(env_cli))
+    if data_dir:
+        data_path = Path(data_dir)
+        candidates.append(data_path / "Gen4Engine" / "gen4_cli.py")
+        candidates.append(data_path / "EngineIV" / "gen4_cli.py")
+        base = win_to_wsl(data_path).parent
+        if base.exists():
+            for sub in base.glob("*/Gen4Engine/gen4_cli.py"):
+                candidates.append(sub)
+            for sub in base.glob("*/EngineIV/gen4_cli.py"):
+                candidates.append(sub)
+    candidates.append(Path.cwd() / "Gen4Engine" / "gen4_cli.py")
+    candidates.append(Path.cwd() / "EngineIV" / "gen4_cli.py")
+    for candidate in candidates:
+        if not candidate:
+            continue
+        probe = win_to_wsl(candidate)
+        if probe.exists():
+            return probe
+    return None
+
+def gen4_env(extra: dict|None = None) -> dict:
+    env = os.environ.copy()
+    env.setdefault("CMAKE_EXE_WIN", r"C:\\Program Files\\CMake\\bin\\cmake.exe")
+    env.update({k: str(v) for k, v in (extra or {}).items()})
+    return env
+
+def run_gen4_cli(data_dir: Path|None, cli_args: list[str]) -> int:
+    cli = find_gen4_cli(data_dir)
+    if not cli:
+        warn("[-] gen4_cli.py não encontrado. Configure MTCLI_GEN4_CLI ou mantenha Gen4Engine/gen4_cli.py junto à Data Folder.")
+        return 1
+    cmd = [sys.executable, str(cli)] + cli_args
+    return subprocess.call(cmd, env=gen4_env(), stdout=child_stdout())
+
+def load_gen4_jobs(path: Path, default_timeout: float|None) -> list[dict]:
+    jobs = []
+    for n, raw in enumerate(path.read_text(encoding="utf-8").splitlines(), 1):
+        raw = raw.strip()
+        if not raw or raw.startswith("#"):
+            continue
+        try:
+            item = json.loads(raw)
+        except ValueError as exc:
+            raise SystemExit(f"{path}:{n}: JSON inválido ({exc})")
+        if isinstance(item, list):
+            item = {"args": item}
+        if not isinstance(item, dict) or not isinstance(item.get("args"), list):
+            raise SystemExit(f"{path}:{n}: job deve ser uma lista de argumentos ou um objeto com 'args'.")
+        jobs.append({"id": str(item.get("id", n)), "args": [str(a) for a in item["args"]],
+                     "timeout": item.get("timeout", default_timeout), "env": item.get("env") or {}})
+    return jobs
+
+def _clip(text: str|None, limit: int) -> str:
+    text = text or ""
+    return text if len(text) <= limit else "…" + text[-limit:]
+
+def _gen4_job_subprocess(cli: Path, job: dict, max_output: int) -> dict:
+    cmd = [sys.executable, str(cli)] + job["args"]
+    t0 = time.perf_counter()
+    try:
+        proc = subprocess.run(cmd, env=gen4_env(job["env"]), capture_output=True, text=True,
+                              errors="replace", timeout=job["timeout"])
+        rc, out, err = proc.returncode, proc.stdout, proc.stderr
+        status = "ok" if rc == 0 else "failed"
+    except subprocess.TimeoutExpired as exc:
+        rc, status = None, "timeout"
+        out = exc.stdout.decode(errors="replace") if isinstance(exc.stdout, bytes) else exc.stdout
+        err = exc.stderr.decode(errors="replace") if isinstance(exc.stderr, bytes) else exc.stderr
+    return {"id": job["id"], "args": job["args"], "status": status, "rc": rc,
+            "duration_s": round(time.perf_counter() - t0, 3),
+            "stdout": _clip(out, max_output), "stderr": _clip(err, max_output)}
+
+_gen4_module = None
+
+def _gen4_worker_init(cli: str):
+    '''Worker in-process: importa gen4_cli uma única vez por processo.'''
+    global _gen4_module
+    import importlib.util
+    sys.path.insert(0, str(Path(cli).parent))
+    spec = importlib.util.spec_from_file_location("gen4_cli", cli)
+    _gen4_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(_gen4_module)
+
+class _JobTimeout(Exception):
+    pass
+
+def _main_takes_argv(main_fn) -> bool:
+    '''main(argv) ou main()? Pela assinatura: um TypeError de dentro do job não pode trocar a forma da chamada.'''
+    try:
+        params = inspect.signature(main_fn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD, p.VAR_POSITIONAL) for p in params)
+
+def _gen4_job_inprocess(job: dict, max_output: int) -> dict:
+    import io
+    from contextlib import redirect_stdout, redirect_stderr
+    out, err = io.StringIO(), io.StringIO()
+    old_argv, old_env = sys.argv, os.environ.copy()
+    sys.argv = ["gen4_cli.py"] + job["args"]
+    os.environ.update(gen4_env(job["env"]))
+    alarm = bool(job["timeout"]) and hasattr(signal, "setitimer")
+    if alarm:
+        def _expired(*_): raise _JobTimeout()
+        signal.signal(signal.SIGALRM, _expired)
+        signal.setitimer(signal.ITIMER_REAL, float(job["timeout"]))
+    t0 = time.perf_counter()
+    rc, status = 0, "ok"
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            main_fn = getattr(_gen4_module, "main", None)
+            if main_fn is None:
+                raise SystemExit("gen4_cli.py não define main()")
+            result = main_fn(job["args"]) if _main_takes_argv(main_fn) else main_fn()
+            rc = result if isinstance(result, int) else 0
+    except SystemExit as exc:
+        rc = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+        if not isinstance(exc.code, (int, type(None))):
+            err.write(f"{exc.code}\n")
+    except _JobTimeout:
+        rc, status = None, "timeout"
+    except Exception as exc:
+        rc = 1
+        err.write(f"{type(exc).__name__}: {exc}\n")
+    finally:
+        if alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        sys.argv = old_argv
+        os.environ.clear()
+        os.environ.update(old_env)
+    if status == "ok" and rc != 0:
+        status = "failed"
+    return {"id": job["id"], "args": job["args"], "status": status, "rc": rc,
+            "duration_s": round(time.perf_counter() - t0, 3),
+            "stdout": _clip(out.getvalue(), max_output), "stderr": _clip(err.getvalue(), max_output)}
+
+def run_gen4_jobs(cli: Path, jobs: list[dict], parallel: int = 1, in_process: bool = False,
+                  max_output: int = 20000, on_done=None) -> list[dict]:
+    '''
+    Executa os jobs num pool limitado e devolve os resultados na ordem dos jobs.
+    Subprocesso: ThreadPool + subprocess.run(timeout). In-process: ProcessPool cujos
+    workers importam gen4_cli uma vez e reaproveitam o interpretador entre jobs. Sem
+    signal.setitimer (Windows) o in-process não tem como interromper um job: os jobs
+    com timeout vão para subprocesso. O ThreadPool limita o total a `parallel`.
+    '''
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+    parallel = max(1, parallel)
+    results: list[dict|None] = [None] * len(jobs)
+    timed = set()
+    if in_process and not hasattr(signal, "setitimer"):
+        timed = {i for i, job in enumerate(jobs) if job["timeout"]}
+        if timed:
+            warn(f"[gen4] --in-process não aplica --timeout neste sistema (sem signal.setitimer); "
+                 f"{len(timed)} job(s) com timeout rodam em subprocesso.")
+    procs = None
+    if in_process and len(timed) < len(jobs):
+        procs = ProcessPoolExecutor(max_workers=parallel, initializer=_gen4_worker_init, initargs=(str(cli),))
+
+    def run(i: int, job: dict) -> dict:
+        if procs and i not in timed:
+            return procs.submit(_gen4_job_inprocess, job, max_output).result()
+        return _gen4_job_subprocess(cli, job, max_output)
+
+    try:
+        with ThreadPoolExecutor(max_workers=parallel) as pool:
+            futures = {pool.submit(run, i, job): i for i, job in enumerate(jobs)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    res = fut.result()
+                except Exception as exc:  # worker morreu (ex.: crash do módulo in-process)
+                    res = {"id": jobs[i]["id"], "args": jobs[i]["args"], "status": "failed", "rc": None,
+                           "duration_s": 0.0, "stdout": "", "stderr": f"{type(exc).__name__}: {exc}"}
+                results[i] = res
+                if on_done:
+                    on_done(res)
+    finally:
+        if procs:
+            procs.shutdown()
+    return results
+
+def gen4_service_exe(data_dir: Path|None) -> Path:
+    if not data_dir:
+        raise SystemExit("Data Folder não configurada. Use --data-dir ou 'mtcli config set data_dir'.")
+    base = Path(data_dir)
+    candidates = [base / "Gen4Engine" / "bin" / "Gen4EngineService.exe",
+                  base / "EngineIV" / "bin" / "Gen4EngineService.exe"]
+    for path in candidates:
+        wsl_path = win_to_wsl(path)
+        if wsl_path.exists():
+            return wsl_path
+    raise SystemExit("Gen4EngineService.exe não encontrado. Execute o build em Gen4Engine/ primeiro.")
+
+def tasklist_command() -> list[str]:
+    if is_wsl():
+        return [r"/mnt/c/Windows/System32/tasklist.exe"]
+    return ["tasklist"]
+
+def taskkill_command() -> list[str]:
+    if is_wsl():
+        return [r"/mnt/c/Windows/System32/taskkill.exe"]
+    return ["taskkill"]
+
+SUPERVISOR_STATE = CONFIG_DIR / "gen4_supervisor.json"
+
+def pid_alive(pid: int|None) -> bool:
+    if not pid:
+        return False
+    if os.name == "nt":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, int(pid))  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return bool(ok) and code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def load_supervisor_state() -> dict:
+    try:
+        return json.loads(SUPERVISOR_STATE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def cached_service_pid() -> int|None:
+    '''PID do serviço registrado pelo supervisor, se ainda vivo (evita o tasklist).'''
+    state = load_supervisor_state()
+    pid = state.get("pid")
+    if state.get("status") in ("starting", "ready") and pid_alive(pid):
+        return pid
+    return None
+
+def service_running() -> bool:
+    if cached_service_pid():
+        return True
+    cmd = tasklist_command() + ["/FI", "IMAGENAME eq Gen4EngineService.exe"]
+    try:
+        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode(errors="ignore")
+    except (subprocess.CalledProcessError, OSError):
+        return False
+    return "Gen4EngineService.exe" in out
+
+def start_service(exe_path: Path) -> int:
+    exe_win = wsl_to_win(exe_path)
+    ps_cmd = f"Start-Process -FilePath '{exe_win}'"
+    return run_powershell(ps_cmd)
+
+def stop_service() -> int:
+    state = load_supervisor_state()
+    sup = state.get("supervisor_pid")
+    if sup and sup != os.getpid() and pid_alive(sup) and os.name != "nt":
+        # Sob supervisão: pedir ao supervisor para parar (senão ele reinicia o serviço).
+        os.kill(sup, signal.SIGTERM)
+        return 0
+    cmd = taskkill_command() + ["/IM", "Gen4EngineService.exe", "/F"]
+    return subprocess.call(cmd, stdout=child_stdout())
+
+class LogFollower:
+    '''Lê só o que foi acrescentado ao log desde a abertura (offset guardado).'''
+    def __init__(self, path: Path|None):
+        self.path = path
+        self.offset = path.stat().st_size if path and path.exists() else 0
+
+    def new_text(self) -> str:
+        if not self.path or not self.path.exists():
+            return ""
+        size = self.path.stat().st_size
+        if size < self.offset:  # log rotacionado/truncado
+            self.offset = 0
+        if size == self.offset:
+            return ""
+        with self.path.open("rb") as fh:
+            fh.seek(self.offset)
+            data = fh.read()
+        self.offset = size
+        return data.decode("utf-8", errors="replace").replace("\x00", "")
+
+class ServiceSupervisor:
+    '''
+    Mantém um processo vivo: inicia via Popen (PID em cache, sem tasklist),
+    espera prontidão (marcador no log ou health file), reinicia com backoff
+    exponencial e registra uptime/reinícios em SUPERVISOR_STATE.
+    '''
+    def __init__(self, cmd: list[str], log_path: Path|None = None, ready_marker: str|None = None,
+                 health_file: Path|None = None, health_stale: float = 0.0,
+                 ready_timeout: float = 60.0, ready_grace: float = 2.0,
+                 backoff_initial: float = 1.0, backoff_max: float = 60.0,
+                 stable_after: float = 60.0, max_restarts: int = 0, poll: float = 0.5,
+                 state_file: Path = SUPERVISOR_STATE, metrics_file: Path|None = None):
+        self.cmd = cmd
+        self.log_path = log_path
+        self.ready_marker = ready_marker
+        self.health_file = health_file
+        self.health_stale = health_stale
+        self.ready_timeout = ready_timeout
+        self.ready_grace = ready_grace
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.max_restarts = max_restarts
+        self.poll = poll
+        self.state_file = state_file
+        self.metrics_file = metrics_file
+        self.proc: subprocess.Popen|None = None
+        self.stopping = False
+        self.state = {"supervisor_pid": os.getpid(), "cmd": cmd, "status": "idle", "pid": None,
+                      "starts": 0, "restarts": 0, "crashes": 0, "ready_timeouts": 0,
+                      "last_rc": None, "started_at": None, "ready_at": None,
+                      "last_ready_latency_s": None, "uptime_total_s": 0.0,
+                      "supervisor_started_at": time.time()}
+
+    def save_state(self):
+        atomic_write(self.state_file, json.dumps(self.state, indent=2, default=str).encode("utf-8"))
+        if self.metrics_file:
+            self.write_metrics()
+
+    def write_metrics(self):
+        s = self.state
+        up = (time.time() - s["started_at"]) if s["status"] == "ready" and s["started_at"] else 0.0
+        lines = [
+            "# TYPE mtcli_gen4_service_up gauge",
+            f"mtcli_gen4_service_up {1 if s['status'] == 'ready' else 0}",
+            "# TYPE mtcli_gen4_service_restarts_total counter",
+            f"mtcli_gen4_service_restarts_total {s['restarts']}",
+            "# TYPE mtcli_gen4_service_crashes_total counter",
+            f"mtcli_gen4_service_crashes_total {s['crashes']}",
+            "# TYPE mtcli_gen4_service_ready_timeouts_total counter",
+            f"mtcli_gen4_service_ready_timeouts_total {s['ready_timeouts']}",
+            "# TYPE mtcli_gen4_service_uptime_seconds gauge",
+            f"mtcli_gen4_service_uptime_seconds {up:.3f}",
+            "# TYPE mtcli_gen4_service_uptime_total_seconds counter",
+            f"mtcli_gen4_service_uptime_total_seconds {s['uptime_total_s'] + up:.3f}",
+            "# TYPE mtcli_gen4_service_ready_latency_seconds gauge",
+            f"mtcli_gen4_service_ready_latency_seconds {s['last_ready_latency_s'] or 0:.3f}",
+        ]
+        atomic_write(self.metrics_file, ("\n".join(lines) + "\n").encode("utf-8"), fsync=False)
+
+    def _launch(self):
+        follower = LogFollower(self.log_path)
+        self.proc = subprocess.Popen(self.cmd, stdout=child_stdout())
+        now = time.time()
+        self.state.update(status="starting", pid=self.proc.pid, started_at=now, ready_at=None)
+        self.state["starts"] += 1
+        self.save_state()
+        emit("service", f"[Gen4Service] iniciado (pid {self.proc.pid})", status="starting", pid=self.proc.pid)
+        return follower, now
+
+    def _health_ok(self, since: float) -> bool:
+        try:
+            mtime = self.health_file.stat().st_mtime
+        except OSError:
+            return False
+        if mtime < since:
+            return False
+        return not self.health_stale or (time.time() - mtime) <= self.health_stale
+
+    def _is_ready(self, follower: LogFollower, started: float, buf: list[str]) -> bool:
+        if self.ready_marker:
+            buf.append(follower.new_text())
+            text = "".join(buf)[-65536:]
+            buf[:] = [text]
+            if self.ready_marker.lower() in text.lower():
+                return True
+        if self.health_file and self._health_ok(started):
+            return True
+        if not self.ready_marker and not self.health_file:
+            return time.time() - started >= self.ready_grace
+        return False
+
+    def _wait_ready(self, follower: LogFollower, started: float) -> bool:
+        buf: list[str] = []
+        deadline = started + self.ready_timeout
+        while not self.stopping and self.proc.poll() is None:
+            if self._is_ready(follower, started, buf):
+                latency = time.time() - started
+                self.state.update(status="ready", ready_at=time.time(), last_ready_latency_s=round(latency, 3))
+                self.save_state()
+                emit("service", f"[Gen4Service] pronto em {latency:.2f}s", status="ready", pid=self.proc.pid,
+                     latency_s=round(latency, 3))
+                return True
+            if time.time() >= deadline:
+                self.state["ready_timeouts"] += 1
+                emit("service", f"[Gen4Service] sem prontidão após {self.ready_timeout:.0f}s; reiniciando.",
+                     status="ready_timeout", pid=self.proc.pid)
+                self._terminate()
+                return False
+            time.sleep(self.poll)
+        return False
+
+    def _watch(self, started: float) -> int|None:
+        '''Espera o processo cair; checa o health file se houver limite de idade.'''
+        while not self.stopping:
+            rc = self.proc.poll()
+            if rc is not None:
+                return rc
+            if self.health_file and self.health_stale and not self._health_ok(started):
+                emit("service", f"[Gen4Service] health file parado há mais de {self.health_stale:.0f}s; reiniciando.",
+                     status="health_stale", pid=self.proc.pid)
+                self._terminate()
+                return self.proc.poll()
+            time.sleep(self.poll)
+        return None
+
+    def _terminate(self, grace: float = 5.0):
+        if not self.proc or self.proc.poll() is not None:
+            return
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=grace)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+    def _account_uptime(self):
+        if self.state.get("ready_at"):
+            self.state["uptime_total_s"] = round(self.state["uptime_total_s"] + time.time() - self.state["ready_at"], 3)
+            self.state["ready_at"] = None
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        delay = self.backoff_initial
+        try:
+            while not self.stopping:
+                follower, started = self._launch()
+                if self._wait_ready(follower, started):
+                    rc = self._watch(started)
+                else:
+                    rc = self.proc.poll()
+                self._account_uptime()
+                if self.stopping:
+                    break
+                self.state.update(status="backoff", last_rc=rc)
+                self.state["crashes"] += 1
+                if time.time() - started >= self.stable_after:
+                    delay = self.backoff_initial
+                if self.max_restarts and self.state["restarts"] >= self.max_restarts:
+                    self.state["status"] = "failed"
+                    self.save_state()
+                    emit("service", f"[Gen4Service] limite de {self.max_restarts} reinícios atingido (último código {rc}).",
+                         status="failed", rc=rc, restarts=self.state["restarts"])
+                    return 1
+                self.save_state()
+                emit("service", f"[Gen4Service] caiu (código {rc}); reiniciando em {delay:.1f}s",
+                     status="backoff", rc=rc, delay_s=delay)
+                end = time.time() + delay
+                while not self.stopping and time.time() < end:
+                    time.sleep(min(self.poll, max(0.0, end - time.time())))
+                delay = min(self.backoff_max, delay * 2)
+                self.state["restarts"] += 1
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._terminate()
+            if self.state["status"] != "failed":
+                self._account_uptime()
+                self.state.update(status="stopped", last_rc=self.proc.poll() if self.proc else None)
+                self.save_state()
+        emit("service", "[Gen4Service] supervisor encerrado.", status="stopped")
+        return 0
@@ -0,0 +1,112 @@
+# ini.py — builders de INI do terminal ([StartUp], [Tester], [TesterInputs])
+from .util import timeframe_ok
+
+def build_ini_startup(symbol: str|None, period: str|None, template: str|None,
+                      expert: str|None, script: str|None, expert_params: str|None,
+                      script_params: str|None, shutdown: bool|None) -> str:
+    lines = ["[StartUp]"]
+    if expert: lines.append(f"Expert={_ini_escape(expert)}")
+    if script: lines.append(f"Script={_ini_escape(script)}")
+    if expert_params: lines.append(f"ExpertParameters={_ini_escape(expert_params)}")
+    if script_params: lines.append(f"ScriptParameters={_ini_escape(script_params)}")
+    if symbol: lines.append(f"Symbol={symbol}")
+    if period: lines.append(f"Period={period}")
+    if template: lines.append(f"Template={_ini_escape(template)}")
+    if shutdown is not None: lines.append(f"ShutdownTerminal={1 if shutdown else 0}")
+    return "\n".join(lines) + "\n"
+
+def build_ini_tester(ea: str, ea_params: str|None, symbol: str, period: str,
+                     model: int, optimization: int, criterion: int|None,
+                     date_from: str|None, date_to: str|None, forward_mode: int|None,
+                     forward_date: str|None, deposit: str|None, currency: str|None,
+                     leverage: str|None, visual: bool|None, report: str|None,
+                     replace_report: bool|None, shutdown: bool|None,
+                     use_local: int|None, use_remote: int|None, use_cloud: int|None,
+                     execution_mode: int|None, login: str|None, port: int|None) -> str:
+    lines = ["[Tester]"]
+    lines.append(f"Expert={_ini_escape(ea)}")
+    if ea_params: lines.append(f"ExpertParameters={_ini_escape(ea_params)}")
+    lines.append(f"Symbol={symbol}")
+    lines.append(f"Period={period}")
+    if login: lines.append(f"Login={login}")
+    lines.append(f"Model={model}")  # 0..4
+    if execution_mode is not None: lines.append(f"ExecutionMode={execution_mode}")
+    lines.append(f"Optimization={optimization}")  # 0 off; 1 slow; 2 fast genetic; 3 all symbols
+    if criterion is not None: lines.append(f"OptimizationCriterion={criterion}")
+    if date_from: lines.append(f"FromDate={date_from}")
+    if date_to: lines.append(f"ToDate={date_to}")
+    if forward_mode is not None: lines.append(f"ForwardMode={forward_mode}")
+    if forward_date: lines.append(f"ForwardDate={forward_date}")
+    if report:
+        norm_report = _normalize_report_path(report)
+        lines.append(f"Report={_ini_escape(norm_report)}")
+    if replace_report is not None: lines.append(f"ReplaceReport={1 if replace_report else 0}")
+    if deposit: lines.append(f"Deposit={deposit}")
+    if currency: lines.append(f"Currency={currency}")
+    if leverage: lines.append(f"Leverage={leverage}")
+    if use_local is not None: lines.append(f"UseLocal={use_local}")
+    if use_remote is not None: lines.append(f"UseRemote={use_remote}")
+    if use_cloud is not None: lines.append(f"UseCloud={use_cloud}")
+    if visual is not None: lines.append(f"Visual={1 if visual else 0}")
+    if port is not None: lines.append(f"Port={port}")
+    return "\n".join(lines) + "\n"
+
+def _fmt_val(v):
+    if isinstance(v, bool): return "true" if v else "false"
+    return str(v)
+
+def build_ini_testerinputs(inputs: dict) -> str:
+    '''
+    Constrói a seção [TesterInputs].
+    Formatos aceitos por item:
+      - valor único:   {"Lots": 0.10}
+      - otimização:    {"Risk": {"start":0.5,"step":0.5,"stop":5,"value":1.0}}
+                        -> Risk=1.0||0.5||0.5||5||Y
+      - strings/horários: {"OpenTime": "03:00"} -> OpenTime=03:00
+    '''
+    lines = ["[TesterInputs]"]
+    for name, spec in inputs.items():
+        if isinstance(spec, dict) and all(k in spec for k in ("start","step","stop")):
+            cur = spec.get("value", spec["start"])
+            line = f"{name}={_fmt_val(cur)}||{_fmt_val(spec['start'])}||{_fmt_val(spec['step'])}||{_fmt_val(spec['stop'])}||Y"
+        else:
+            val = spec.get("value") if isinstance(spec, dict) else spec
+            line = f"{name}={_fmt_val(val)}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+def _ini_escape(value: str|None) -> str|None:
+    if value is None:
+        return None
+    return value.replace("\\", "\\\\")
+
+def _normalize_report_path(value: str|None) -> str|None:
+    if not value:
+        return value
+    value = value.replace("/", "\\")
+    if not value.startswith("\\"):
+        value = "\\" + value
+    return value
+
+def build_batch_ini(base: dict, inputs: dict, report: str|None) -> str:
+    '''INI completo ([Tester] + [TesterInputs]) de uma combinação do plano.'''
+    content = build_ini_tester(
+        ea=base["ea"], ea_params=base.get("ea_parameters"),
+        symbol=base["symbol"], period=timeframe_ok(base["period"]),
+        model={"everytick":0,"ohlc1":1,"open":2,"math":3,"realticks":4}[base.get("model","everytick")],
+        optimization={"off":0,"slow":1,"fast":2,"allsymbols":3}[base.get("opt","off")],
+        criterion={"max_balance":0,"balance_x_profit":1,"balance_x_exp_payoff":2,"(100%-dd)xbal":3,
+                   "balance_x_recovery":4,"balance_x_sharpe":5,"custom_ontester":6,"complex":7}.get(base.get("criterion"), None),
+        date_from=base.get("date_from"), date_to=base.get("date_to"),
+        forward_mode={"off":0,"1/2":1,"1/3":2,"1/4":3,"custom":4}.get(base.get("forward"), None),
+        forward_date=base.get("forward_date"),
+        deposit=base.get("deposit"), currency=base.get("currency"), leverage=base.get("leverage"),
+        visual=base.get("visual"), report=report, replace_report=base.get("replace_report"),
+        shutdown=base.get("shutdown", True),
+        use_local={False:0, True:1}.get(base.get("use_local"), None),
+        use_remote={False:0, True:1}.get(base.get("use_remote"), None),
+        use_cloud={False:0, True:1}.get(base.get("use_cloud"), None),
+        execution_mode=base.get("exec_delay_ms"), login=base.get("login"),
+        port=base.get("port")
+    )
+    return content + "\n" + build_ini_testerinputs(inputs)
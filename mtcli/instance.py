@@ -0,0 +1,276 @@
+# instance.py — preparação de uma Data Folder (fontes MQL5, pastas, compilação)
+#
+# O .ex5 de cada fonte é identificado por uma chave = sha256(fonte + MetaEditor usado).
+# MQL5/.mtcli-bootstrap.json guarda, por fonte, a chave e o hash do .ex5 implantado:
+# se batem, a instância está em dia e o MetaEditor nem é chamado. Cada .ex5 compilado
+# vai para ~/.mtcli/ex5/<chave>/, de onde outras instâncias (ou execuções) só copiam.
+#
+# Instâncias nomeadas ficam em config.json ("instances": {nome: {data_dir, tags}}) e
+# são escolhidas por seletor (--instances): all, tag:<tag>, nome ou glob.
+import fnmatch, hashlib, json, os, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .atomic import atomic_write
+from .config import CONFIG_DIR, load_config
+from .mql5 import mql5_source
+from .output import emit
+from .util import ensure_dir, write_text_utf8
+from .env import _exe_name, find_data_dirs, run_win_exe, to_local_path, to_windows_path
+
+LISTENER_REL = "Experts/CommandListenerEA.mq5"
+FRAMES_INCLUDE_REL = "Include/mtcli/MtcliFrames.mqh"
+EX5_CACHE = CONFIG_DIR / "ex5"
+STAMP_NAME = ".mtcli-bootstrap.json"
+
+def templates_dir(data_dir: Path) -> Path:
+    return to_local_path(data_dir) / "MQL5" / "Profiles" / "Templates"
+
+def sha256_file(path: Path) -> str|None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+def _metaeditor_tag(metaeditor: Path|None) -> str:
+    if not metaeditor:
+        return ""
+    try:
+        st = to_local_path(metaeditor).stat()
+        return f"{_exe_name(metaeditor)}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        return str(metaeditor)
+
+def compile_key(source: Path, metaeditor: Path|None) -> str:
+    h = hashlib.sha256(source.read_bytes())
+    h.update(b"\0" + _metaeditor_tag(metaeditor).encode("utf-8"))
+    return h.hexdigest()
+
+def load_stamp(data_path: Path) -> dict:
+    try:
+        return json.loads((data_path / "MQL5" / STAMP_NAME).read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def record_ex5(data_path: Path, rel_path: str, key: str):
+    stamp = load_stamp(data_path)
+    ex5 = (data_path / "MQL5" / rel_path).with_suffix(".ex5")
+    stamp[rel_path] = {"key": key, "ex5": sha256_file(ex5)}
+    write_text_utf8(data_path / "MQL5" / STAMP_NAME, json.dumps(stamp, indent=2))
+
+def ex5_up_to_date(data_path: Path, rel_path: str, key: str) -> bool:
+    entry = load_stamp(data_path).get(rel_path) or {}
+    deployed = sha256_file((data_path / "MQL5" / rel_path).with_suffix(".ex5"))
+    return entry.get("key") == key and deployed is not None and entry.get("ex5") == deployed
+
+def cached_ex5(key: str, rel_path: str) -> Path:
+    return EX5_CACHE / key[:32] / (Path(rel_path).stem + ".ex5")
+
+def unshare_file(path: Path):
+    '''
+    Arquivo com hardlink (clone de instância): troca por uma cópia própria antes de
+    alguém reescrevê-lo no lugar, senão a origem e os outros clones mudam juntos.
+    '''
+    try:
+        if os.stat(path).st_nlink > 1:
+            atomic_write(path, path.read_bytes(), fsync=False)
+    except FileNotFoundError:
+        pass
+
+def deploy_ex5(metaeditor: Path|None, data_path: Path, rel_path: str, rebuild: bool=False) -> str:
+    '''
+    Garante o .ex5 de MQL5/<rel_path>. Retorna "em dia", "copiado" (do cache),
+    "compilado", "falhou" ou "sem metaeditor". `rebuild` ignora marcador e cache.
+    '''
+    target = data_path / "MQL5" / rel_path
+    ex5 = target.with_suffix(".ex5")
+    key = compile_key(target, metaeditor)
+    if not rebuild and ex5_up_to_date(data_path, rel_path, key):
+        return "em dia"
+    cached = cached_ex5(key, rel_path)
+    if not rebuild and cached.exists():
+        atomic_write(ex5, cached.read_bytes(), fsync=False)  # temp + replace: não escreve no inode vinculado
+        record_ex5(data_path, rel_path, key)
+        return "copiado"
+    if not metaeditor:
+        return "sem metaeditor"
+    unshare_file(ex5)  # o MetaEditor trunca o .ex5 existente
+    rc = run_win_exe(metaeditor, [f'/compile:{target}', f'/log:{target.with_suffix(".log")}'])
+    if rc != 0 or not ex5.exists():
+        return "falhou"
+    atomic_write(cached, ex5.read_bytes(), fsync=False)
+    record_ex5(data_path, rel_path, key)
+    return "compilado"
+
+def ensure_source(metaeditor: Path|None, data_path: Path, rel_path: str, code: str,
+                  force: bool=False, quiet: bool=False, compile: bool=True, rebuild: bool=False) -> Path:
+    target = data_path / "MQL5" / rel_path
+    ensure_dir(target.parent)
+    if force or not target.exists():
+        write_text_utf8(target, code)
+        if not quiet:
+            emit("source", f"[bootstrap] Fonte atualizado: {to_windows_path(target)}", path=target, status="atualizado")
+    elif not quiet:
+        emit("source", f"[bootstrap] Fonte mantido: {to_windows_path(target)}", path=target, status="mantido")
+
+    if compile:
+        status = deploy_ex5(metaeditor, data_path, rel_path, rebuild=rebuild)
+        if quiet:
+            return target
+        ex5 = to_windows_path(target.with_suffix(".ex5"))
+        if status == "sem metaeditor":
+            text = f"[bootstrap] MetaEditor não configurado. Pulei compilação de {rel_path}"
+        elif status == "falhou":
+            text = f"[bootstrap] Falha na compilação. Verifique {to_windows_path(target.with_suffix('.log'))}"
+        elif status == "em dia":
+            text = f"[bootstrap] .ex5 em dia (mesmo hash), sem recompilar: {ex5}"
+        elif status == "copiado":
+            text = f"[bootstrap] .ex5 copiado do cache: {ex5}"
+        else:
+            text = f"[bootstrap] Compilado: {ex5}"
+        emit("compile", text, source=rel_path, ex5=ex5, status=status)
+    return target
+
+def install_source(metaeditor: Path, data_dir: Path, rel_path: str, code: str):
+    data_path = to_local_path(data_dir)
+    return ensure_source(metaeditor, data_path, rel_path, code, force=True, quiet=False)
+
+def bootstrap_instance(metaeditor: Path|None, data_dir: Path|str, force: bool=False, quiet: bool=False,
+                       compile: bool=True, rebuild: bool=False) -> Path:
+    data_path = to_local_path(data_dir)
+    ensure_dir(data_path / "MQL5" / "Files")
+    ensure_dir(data_path / "MQL5" / "Profiles" / "Templates")
+    ensure_source(metaeditor, data_path, LISTENER_REL, mql5_source("CommandListenerEA.mq5"),
+                  force=force, quiet=quiet, compile=compile, rebuild=rebuild)
+    ensure_source(metaeditor, data_path, "Scripts/AplicarTemplate.mq5", mql5_source("AplicarTemplate.mq5"), force=force, quiet=quiet, compile=False)
+    ensure_source(metaeditor, data_path, FRAMES_INCLUDE_REL, mql5_source("MtcliFrames.mqh"), force=force, quiet=quiet, compile=False)
+    return data_path
+
+def bootstrap_all(metaeditor: Path|None, data_dirs: list[Path], parallel: int = 1,
+                  force: bool=False, rebuild: bool=False) -> list[dict]:
+    '''
+    Prepara várias Data Folders: instâncias em dia são puladas, e as demais são
+    agrupadas por chave de compilação. Cada grupo compila uma vez (ou copia do
+    cache) e as outras instâncias do grupo recebem cópias do .ex5.
+    '''
+    rows, groups = [], {}
+    for d in data_dirs:
+        data_path = bootstrap_instance(metaeditor, d, force=force, quiet=True, compile=False)
+        key = compile_key(data_path / "MQL5" / LISTENER_REL, metaeditor)
+        row = {"data_dir": data_path, "key": key, "status": None, "seconds": 0.0}
+        rows.append(row)
+        if not rebuild and ex5_up_to_date(data_path, LISTENER_REL, key):
+            row["status"] = "em dia"
+        else:
+            groups.setdefault(key, []).append(row)
+
+    def deploy(row: dict, rebuild: bool):
+        t0 = time.perf_counter()
+        row["status"] = deploy_ex5(metaeditor, row["data_dir"], LISTENER_REL, rebuild=rebuild)
+        row["seconds"] = time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        # 1) um build por chave; 2) cópias para o resto de cada grupo que deu certo
+        list(pool.map(lambda g: deploy(g[0], rebuild), groups.values()))
+        copies = []
+        for group in groups.values():
+            for row in group[1:]:
+                if group[0]["status"] in ("compilado", "copiado"):
+                    copies.append(row)
+                else:
+                    row["status"] = group[0]["status"]
+        list(pool.map(lambda r: deploy(r, False), copies))
+    return rows
+
+def registered_instances() -> dict[str, dict]:
+    return load_config().get("instances") or {}
+
+def known_instances() -> list[dict]:
+    '''Instâncias registradas + Data Folders encontradas em MetaQuotes\\Terminal (nome = pasta).'''
+    found = [{"name": name, "data_dir": Path(entry["data_dir"]), "tags": entry.get("tags", []), "registered": True}
+             for name, entry in sorted(registered_instances().items())]
+    seen = {str(to_local_path(i["data_dir"])) for i in found}
+    for d in find_data_dirs():
+        if str(to_local_path(d)) not in seen:
+            found.append({"name": d.name, "data_dir": d, "tags": [], "registered": False})
+    return found
+
+def select_instances(selector: str) -> list[tuple[str, Path]]:
+    '''
+    "all" (registradas; sem registro, as Data Folders encontradas), "tag:<tag>", ou
+    nome/glob comparado com o nome e o caminho. Vírgula une seletores.
+    '''
+    known = known_instances()
+    chosen: dict[Path, tuple[str, Path]] = {}  # pela pasta: dois "MetaTrader 5" portable são duas instâncias
+    for term in (t.strip() for t in selector.split(",")):
+        if not term:
+            continue
+        if term == "all":
+            registered = [i for i in known if i["registered"]]
+            matched = registered or known
+        elif term.startswith("tag:"):
+            matched = [i for i in known if term[4:] in i["tags"]]
+        else:
+            matched = [i for i in known if fnmatch.fnmatch(i["name"], term)
+                       or fnmatch.fnmatch(str(i["data_dir"]), term)
+                       or fnmatch.fnmatch(Path(i["data_dir"]).as_posix(), term)]
+            if not matched and ("/" in term or "\\" in term) and not any(c in term for c in "*?["):
+                matched = [{"name": Path(term).name, "data_dir": Path(term)}]  # caminho avulso
+        if not matched:
+            raise SystemExit(f"[-] Nenhuma instância corresponde a '{term}'. Veja 'mtcli instance list'.")
+        for i in matched:
+            chosen.setdefault(_instance_key(i["data_dir"]), (i["name"], i["data_dir"]))
+    return unique_instance_names(list(chosen.values()))
+
+def instance_terminal(data_dir) -> tuple[Path|None, list[str]]:
+    '''
+    terminal64.exe que abre esta Data Folder e os args extras: o registrado com
+    'instance add --terminal', o da própria pasta (portable: /portable) ou o da
+    instalação indicada em origin.txt. (None, []) se nenhum for encontrado.
+    '''
+    key = _instance_key(data_dir)
+    for entry in registered_instances().values():
+        if entry.get("terminal") and _instance_key(entry["data_dir"]) == key:
+            exe = to_local_path(entry["terminal"])
+            return exe, (["/portable"] if _instance_key(exe.parent) == key else [])
+    local = to_local_path(data_dir)
+    for name in ("terminal64.exe", "terminal.exe"):
+        if (local / name).exists():
+            return local / name, ["/portable"]
+    try:  # Data Folder em AppData: origin.txt (UTF-16) aponta a instalação
+        install = (local / "origin.txt").read_text(encoding="utf-16").strip()
+    except (OSError, UnicodeError):
+        install = ""
+    if install and (to_local_path(install) / "terminal64.exe").exists():
+        return to_local_path(install) / "terminal64.exe", []
+    return None, []
+
+def sync_ex5(src_data: Path, dst_data: Path, rel_path: str) -> bool:
+    '''Copia MQL5/<rel>.ex5 compilado numa instância para outra (sem hardlink); False se não há .ex5.'''
+    src = (src_data / "MQL5" / rel_path).with_suffix(".ex5")
+    dst = (dst_data / "MQL5" / rel_path).with_suffix(".ex5")
+    if not src.exists():
+        return False
+    if _instance_key(src) != _instance_key(dst) and sha256_file(src) != sha256_file(dst):
+        atomic_write(dst, src.read_bytes(), fsync=False)
+    return True
+
+def _instance_key(data_dir) -> Path:
+    try:
+        return to_local_path(data_dir).resolve()
+    except OSError:
+        return Path(data_dir)
+
+def unique_instance_names(items: list[tuple[str, Path]]) -> list[tuple[str, Path]]:
+    '''Nomes repetidos ganham a pasta de cima ("MetaTrader 5@mt5a") e, se preciso, um número.'''
+    counts: dict[str, int] = {}
+    for name, _ in items:
+        counts[name] = counts.get(name, 0) + 1
+    out, used = [], set()
+    for name, data_dir in items:
+        label = name if counts[name] == 1 else f"{name}@{Path(data_dir).parent.name}"
+        base, n = label, 2
+        while label in used:
+            label, n = f"{base}#{n}", n + 1
+        used.add(label)
+        out.append((label, data_dir))
+    return out
@@ -0,0 +1,187 @@
+# listener.py — logs do terminal e comandos via CommandListenerEA (MQL5\Files\cmd.txt)
+import sys, time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from .atomic import atomic_write
+from .env import is_wsl, to_windows_path, win_to_wsl
+from .instance import select_instances
+from .output import emit, structured
+from .trace import traced
+
+LOG_SEPARATOR = "=" * 60
+ACK_FILE = "cmd.ack"
+# ok/erro: cmd.ack do EA; lido: cmd.txt consumido por um EA sem cmd.ack (versão antiga)
+ACK_OK = ("ok", "lido")
+
+def collect_log_targets(data_dir: Path|None) -> list[tuple[str, Path]]:
+    targets: list[tuple[str, Path]] = []
+    if data_dir:
+        base = win_to_wsl(data_dir)
+        log_path = base / "MQL5" / "Logs" / time.strftime("%Y%m%d.log")
+        targets.append(("terminal", log_path))
+        for label in ("Gen4Engine", "EngineIV"):
+            engine_log = base / label / "bin" / "logs" / "gpu_service.log"
+            targets.append((f"engine:{label}", engine_log))
+    return targets
+
+@traced("tail_lines", lambda path, limit: {"path": str(path), "limit": limit})
+def tail_lines(path: Path, limit: int) -> list[str]:
+    if not path.exists():
+        return []
+    try:
+        with path.open("r", encoding="utf-8", errors="replace") as fh:
+            return [line.rstrip("\r\n") for line in deque(fh, maxlen=limit)]
+    except UnicodeDecodeError:
+        with path.open("r", encoding="utf-16", errors="replace") as fh:
+            return [line.rstrip("\r\n") for line in deque(fh, maxlen=limit)]
+
+def print_log_tail(tag: str, limit: int = 20, data_dir: Path|None = None):
+    if structured():
+        for label, path in collect_log_targets(data_dir):
+            lines = tail_lines(path, limit)
+            if lines:
+                emit("log_tail", source=label, path=path, lines=lines, after=tag)
+        return
+    print(LOG_SEPARATOR)
+    print(f"[logs] Últimas {limit} linhas após '{tag}'")
+    printed = False
+    for label, path in collect_log_targets(data_dir):
+        lines = tail_lines(path, limit)
+        if not lines:
+            continue
+        printed = True
+        try:
+            win_path = to_windows_path(path)
+        except Exception:
+            win_path = str(path)
+        print(f"--- {label}: {win_path} ---")
+        for line in lines:
+            print(line)
+    if not printed:
+        print("Nenhum log disponível.")
+    print(LOG_SEPARATOR)
+
+def listener_files_dir(data_dir: Path) -> Path:
+    target_dir = data_dir
+    if is_wsl():
+        try:
+            target_dir = win_to_wsl(data_dir)
+        except Exception:
+            target_dir = Path(str(data_dir))
+    return target_dir / "MQL5" / "Files"
+
+@traced("send_listener_command", lambda data_dir, payload: {"data_dir": str(data_dir), "cmd": payload.split(";", 1)[0]})
+def send_listener_command(data_dir: Path, payload: str) -> Path:
+    cmdfile = listener_files_dir(data_dir) / "cmd.txt"
+    # O EA faz FileIsExist/FileOpen a cada segundo: com rename ele nunca lê a linha pela metade.
+    atomic_write(cmdfile, payload.encode("ascii"), fsync=False)
+    return cmdfile
+
+def wait_listener_idle(data_dir: Path, timeout: float) -> bool:
+    '''Espera o EA consumir o cmd.txt pendente (ele lê um comando por ciclo de 1 s).'''
+    cmdfile = listener_files_dir(data_dir) / "cmd.txt"
+    deadline = time.monotonic() + timeout
+    while cmdfile.exists():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.05)
+    return True
+
+def read_listener_ack(data_dir: Path) -> tuple[str, str, str]|None:
+    '''(OK|ERR, mensagem, comando) do último comando processado pelo EA.'''
+    try:
+        text = (listener_files_dir(data_dir) / ACK_FILE).read_text(encoding="latin-1")
+    except OSError:
+        return None
+    lines = text.split("\n")
+    if len(lines) < 3:
+        return None
+    return lines[0].strip(), lines[1].strip(), lines[2].strip()
+
+def deliver_listener_commands(data_dir: Path, payloads: list[str], deadline: float) -> list[dict]:
+    '''
+    Entrega os comandos a uma instância, um por vez (o EA lê um por ciclo), até o
+    deadline (time.monotonic). Um resultado por comando: status, mensagem, segundos.
+    '''
+    results = []
+    if not listener_files_dir(data_dir).parent.exists():
+        return [{"status": "sem MQL5", "message": str(data_dir), "seconds": 0.0, "payload": p} for p in payloads]
+    for payload in payloads:
+        t0 = time.monotonic()
+        try:
+            if not wait_listener_idle(data_dir, deadline - t0):
+                results.append({"status": "ocupado", "message": "cmd.txt anterior não foi lido", "seconds": 0.0})
+                break
+            (listener_files_dir(data_dir) / ACK_FILE).unlink(missing_ok=True)
+            send_listener_command(data_dir, payload)
+            if not wait_listener_idle(data_dir, deadline - time.monotonic()):
+                # Não deixa o comando para um EA que suba depois e o execute fora de hora.
+                (listener_files_dir(data_dir) / "cmd.txt").unlink(missing_ok=True)
+                results.append({"status": "sem resposta", "message": "CommandListenerEA não leu cmd.txt (removido)",
+                                "seconds": time.monotonic() - t0})
+                break
+            ack = read_listener_ack(data_dir)
+        except OSError as exc:
+            results.append({"status": "erro", "message": str(exc), "seconds": time.monotonic() - t0})
+            break
+        if ack and ack[2] == payload:
+            status, message = ("ok" if ack[0] == "OK" else "erro"), ack[1]
+        else:
+            status, message = "lido", ""
+        results.append({"status": status, "message": message, "seconds": time.monotonic() - t0})
+    results += [{"status": "não enviado", "message": "", "seconds": 0.0} for _ in payloads[len(results):]]
+    for r, payload in zip(results, payloads):
+        r["payload"] = payload
+    return results
+
+def fanout_listener_commands(plan: dict[str, tuple[Path, list[str]]], timeout: float) -> dict[str, list[dict]]:
+    '''{instância: (data_dir, comandos)} -> {instância: resultados}; todas em paralelo, um timeout geral.'''
+    deadline = time.monotonic() + timeout
+    with ThreadPoolExecutor(max_workers=max(1, len(plan))) as pool:
+        futures = {name: pool.submit(deliver_listener_commands, data_dir, payloads, deadline)
+                   for name, (data_dir, payloads) in plan.items()}
+        return {name: f.result() for name, f in futures.items()}
+
+def print_fanout_matrix(results: dict[str, list[dict]], payloads: list[str]) -> int:
+    '''Matriz instância x comando; retorna quantas instâncias tiveram falha.'''
+    failed = sum(any(r["status"] not in ACK_OK for r in rows) for rows in results.values())
+    if structured():
+        for name, rows in results.items():
+            for i, r in enumerate(rows):
+                emit("ack", instance=name, index=i, payload=r["payload"], status=r["status"], ok=r["status"] in ACK_OK,
+                     message=r["message"], seconds=round(r["seconds"], 3))
+        emit("fanout_done", instances=len(results), failed=failed)
+        return failed
+    width = max([len("instância")] + [len(n) for n in results])
+    if len(payloads) == 1:
+        print(f"[cmd] {payloads[0]}")
+        print(f"{'instância':{width}s}  {'status':12s}  {'tempo':>7s}  mensagem")
+        for name, (r,) in results.items():
+            print(f"{name:{width}s}  {r['status']:12s}  {r['seconds']:6.2f}s  {r['message']}")
+    else:
+        for i, payload in enumerate(payloads, 1):
+            print(f"[cmd] #{i} {payload}")
+        print(f"{'instância':{width}s}  " + "  ".join(f"{'#' + str(i):12s}" for i in range(1, len(payloads) + 1)))
+        for name, rows in results.items():
+            print(f"{name:{width}s}  " + "  ".join(f"{r['status']:12s}" for r in rows))
+        for name, rows in results.items():
+            for i, r in enumerate(rows, 1):
+                if r["status"] not in ACK_OK and r["message"]:
+                    print(f"  {name} #{i}: {r['message']}")
+    total = len(results)
+    print(f"[cmd] {total - failed}/{total} instância(s) ok")
+    return failed
+
+def send_to_instances(args, payloads: list[str], build=None):
+    '''
+    --instances: entrega `payloads` (ou build(data_dir), por instância) a todas as
+    instâncias do seletor e imprime a matriz; sai com código 1 se alguma falhar.
+    '''
+    instances = select_instances(args.instances)
+    plan = {name: (data_dir, build(data_dir) if build else payloads) for name, data_dir in instances}
+    emit("fanout_start", f"[cmd] {len(plan)} instância(s): {', '.join(plan)}",
+         instances={name: data_dir for name, (data_dir, _) in plan.items()})
+    results = fanout_listener_commands(plan, args.ack_timeout)
+    if print_fanout_matrix(results, next(iter(plan.values()))[1]):
+        sys.exit(1)
@@ -0,0 +1,146 @@
+# metrics.py — métricas do tester (Prometheus textfile / HTTP)
+import threading, time
+from pathlib import Path
+from .atomic import atomic_write
+
+RUN_BUCKETS = (5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400)
+LAUNCH_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.total += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        sep = "," if labels else ""
+        out = [f'{name}_bucket{{{labels}{sep}le="{_prom_num(b)}"}} {c}'
+               for b, c in zip(self.buckets, self.counts)]
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.total}')
+        out.append(f"{name}_sum{{{labels}}} {_prom_num(self.sum)}")
+        out.append(f"{name}_count{{{labels}}} {self.total}")
+        return out
+
+def _prom_num(v: float) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+def _prom_label(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class BatchMetrics:
+    '''
+    Estado de um 'tester batch' exposto no formato de exposição do Prometheus.
+    write() grava o textfile de forma atômica (tmp + rename) para o
+    node_exporter nunca ler um arquivo pela metade.
+    '''
+    def __init__(self, planned: int, plan: str = "", textfile: Path|None = None):
+        self.lock = threading.Lock()
+        self.labels = f'plan="{_prom_label(plan)}"'
+        self.planned = planned
+        self.started_at = time.time()
+        self.last_progress = self.started_at
+        self.ok = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.run_hist = Histogram(RUN_BUCKETS)
+        self.launch_hist = Histogram(LAUNCH_BUCKETS)
+        self.textfile = Path(textfile) if textfile else None
+
+    @property
+    def done(self) -> int:
+        return self.ok + self.failed
+
+    def queue_depth(self) -> int:
+        return max(0, self.planned - self.done - self.in_flight)
+
+    def eta_seconds(self) -> float:
+        if not self.done:
+            return -1.0
+        avg = self.run_hist.sum / max(1, self.run_hist.total)
+        return avg * (self.planned - self.done)
+
+    def run_started(self):
+        with self.lock:
+            self.in_flight += 1
+        self.write()
+
+    def run_finished(self, rc: int|None, timing: dict):
+        with self.lock:
+            self.in_flight -= 1
+            if rc == 0: self.ok += 1
+            else: self.failed += 1
+            if "run_s" in timing: self.run_hist.observe(timing["run_s"])
+            if "launch_s" in timing: self.launch_hist.observe(timing["launch_s"])
+            self.last_progress = time.time()
+        self.write()
+
+    def render(self) -> str:
+        with self.lock:
+            L = self.labels
+            lines = [
+                "# HELP mtcli_batch_combos_planned Combinações no plano.",
+                "# TYPE mtcli_batch_combos_planned gauge",
+                f"mtcli_batch_combos_planned{{{L}}} {self.planned}",
+                "# HELP mtcli_batch_combos_total Combinações concluídas por status.",
+                "# TYPE mtcli_batch_combos_total counter",
+                f'mtcli_batch_combos_total{{{L},status="ok"}} {self.ok}',
+                f'mtcli_batch_combos_total{{{L},status="failed"}} {self.failed}',
+                "# HELP mtcli_batch_combos_in_flight Terminais rodando agora.",
+                "# TYPE mtcli_batch_combos_in_flight gauge",
+                f"mtcli_batch_combos_in_flight{{{L}}} {self.in_flight}",
+                "# HELP mtcli_batch_queue_depth Combinações ainda não iniciadas.",
+                "# TYPE mtcli_batch_queue_depth gauge",
+                f"mtcli_batch_queue_depth{{{L}}} {self.queue_depth()}",
+                "# HELP mtcli_batch_eta_seconds Estimativa de tempo restante (-1 = sem dados).",
+                "# TYPE mtcli_batch_eta_seconds gauge",
+                f"mtcli_batch_eta_seconds{{{L}}} {_prom_num(self.eta_seconds())}",
+                "# HELP mtcli_batch_started_timestamp_seconds Início do batch (epoch).",
+                "# TYPE mtcli_batch_started_timestamp_seconds gauge",
+                f"mtcli_batch_started_timestamp_seconds{{{L}}} {_prom_num(self.started_at)}",
+                "# HELP mtcli_batch_last_progress_timestamp_seconds Última combinação concluída (epoch).",
+                "# TYPE mtcli_batch_last_progress_timestamp_seconds gauge",
+                f"mtcli_batch_last_progress_timestamp_seconds{{{L}}} {_prom_num(self.last_progress)}",
+                "# HELP mtcli_batch_run_duration_seconds Duração de cada execução do terminal.",
+                "# TYPE mtcli_batch_run_duration_seconds histogram",
+            ]
+            lines += self.run_hist.render("mtcli_batch_run_duration_seconds", L)
+            lines += ["# HELP mtcli_batch_terminal_launch_seconds Latência de spawn do terminal.",
+                      "# TYPE mtcli_batch_terminal_launch_seconds histogram"]
+            lines += self.launch_hist.render("mtcli_batch_terminal_launch_seconds", L)
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        if not self.textfile:
+            return
+        atomic_write(self.textfile, self.render().encode("utf-8"), fsync=False)
+
+def serve_metrics(metrics: BatchMetrics, port: int, host: str = "127.0.0.1"):
+    '''Sobe um endpoint /metrics em thread daemon; retorna o servidor.'''
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,8 @@
+# mql5.py — fontes MQL5 instaladas pelo bootstrap (dados do pacote em mtcli/mql5/*.mq5|*.mqh)
+from pathlib import Path
+
+MQL5_DIR = Path(__file__).resolve().parent / "mql5"
+
+def mql5_source(name: str) -> str:
+    '''Lê um fonte embarcado sob demanda (ex.: "CommandListenerEA.mq5").'''
+    return (MQL5_DIR / name).read_text(encoding="utf-8")
@@ -0,0 +1,215 @@
+# optstream.py — passes da otimização acompanhados enquanto o tester roda
+#
+# Fontes, lidas incrementalmente (só os bytes novos a cada poll):
+#   frames  MQL5\Files\mtcli_frames_<EA>.jsonl, escrito pelo EA que inclui
+#           <mtcli/MtcliFrames.mqh>: inputs + métricas de cada passe.
+#   log     Tester\logs\AAAAMMDD.log (+ Tester\Agent-*\logs): "pass 12 returned result
+#           1234.50 in 0:00:01.234" — só o resultado, mas funciona com qualquer EA.
+# Os arquivos de cache da otimização (Tester\cache\*.opt) são binários sem formato
+# público e só ficam completos no fim; não são lidos.
+#
+# Cada passe vai para um SQLite (padrão ~/.mtcli/optimizations.db):
+#   runs(run, ea, symbol, period, started, finished, status, passes)
+#   passes(run, source, pass, result, metrics, inputs, at)
+import codecs, json, re, time
+from pathlib import Path
+from .config import CONFIG_DIR
+from .env import to_local_path
+from .util import ensure_dir
+
+STORE_DEFAULT = CONFIG_DIR / "optimizations.db"
+_LOG_PASS = re.compile(r"pass\s+\(?(\d+(?:\s*,\s*\d+)?)\)?\s+returned result\s+([-+]?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)", re.I)
+
+def frames_file(data_dir: Path, ea: str) -> Path:
+    '''Arquivo do MtcliFrames.mqh para o EA (MQL_PROGRAM_NAME = nome sem pasta/extensão).'''
+    name = ea.replace("/", "\\").rsplit("\\", 1)[-1]
+    if name.lower().endswith((".ex5", ".mq5")):
+        name = name[:-4]
+    return to_local_path(data_dir) / "MQL5" / "Files" / f"mtcli_frames_{name}.jsonl"
+
+def tester_logs(data_dir: Path) -> list[Path]:
+    '''Logs do dia do tester e dos agentes locais da Data Folder.'''
+    base = to_local_path(data_dir) / "Tester"
+    day = time.strftime("%Y%m%d.log")
+    return [base / "logs" / day] + sorted(base.glob(f"Agent-*/logs/{day}"))
+
+class LineTail:
+    '''Linhas completas acrescentadas a um arquivo (UTF-8 ou UTF-16, detectado no 1º read).'''
+
+    def __init__(self, path: Path, from_end: bool = False):
+        self.path = path
+        self.offset = 0
+        self.decoder = None
+        self.buf = ""
+        if from_end:
+            try:
+                self.offset = path.stat().st_size
+            except OSError:
+                pass
+
+    def poll(self) -> list[str]:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return []
+        if size < self.offset:  # truncado/recriado (nova otimização)
+            self.offset, self.decoder, self.buf = 0, None, ""
+        if size == self.offset:
+            return []
+        with self.path.open("rb") as fh:
+            fh.seek(self.offset)
+            raw = fh.read(size - self.offset)
+        if self.decoder is None:
+            if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+                enc = "utf-16"
+            elif self.offset % 2 == 0 and len(raw) > 1 and raw[1:2] == b"\x00":
+                enc = "utf-16-le"
+            else:
+                enc = "utf-8-sig" if self.offset == 0 else "utf-8"
+            self.decoder = codecs.getincrementaldecoder(enc)(errors="replace")
+        self.offset = size
+        self.buf += self.decoder.decode(raw)
+        *lines, self.buf = self.buf.split("\n")
+        return [line.rstrip("\r") for line in lines if line.strip()]
+
+class ResultStore:
+    def __init__(self, path: Path):
+        import sqlite3
+        ensure_dir(path.parent)
+        self.path = path
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript(
+            "CREATE TABLE IF NOT EXISTS runs (run TEXT PRIMARY KEY, ea TEXT, symbol TEXT, period TEXT,"
+            " started REAL, finished REAL, status TEXT, passes INTEGER);"
+            "CREATE TABLE IF NOT EXISTS passes (run TEXT, source TEXT, pass TEXT, result REAL,"
+            " metrics TEXT, inputs TEXT, at REAL, PRIMARY KEY (run, source, pass));")
+
+    def start_run(self, run: str, ea: str, symbol: str|None, period: str|None):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, NULL, 'rodando', 0)",
+                            (run, ea, symbol, period, time.time()))
+
+    def add_passes(self, run: str, rows: list[dict]):
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO passes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                                [(run, r["source"], r["pass"], r.get("result"), json.dumps(r.get("metrics", {})),
+                                  json.dumps(r.get("inputs", {}), ensure_ascii=False), r["at"]) for r in rows])
+
+    def finish_run(self, run: str, status: str, passes: int):
+        with self.db:
+            self.db.execute("UPDATE runs SET finished = ?, status = ?, passes = ? WHERE run = ?",
+                            (time.time(), status, passes, run))
+
+    def close(self):
+        self.db.close()
+
+def parse_abort_rule(spec: str|None) -> tuple[str, float]|None:
+    '''"Profit Factor=1.2" -> ("Profit Factor", 1.2): aborta se o melhor passe ficar abaixo.'''
+    if not spec:
+        return None
+    metric, sep, value = spec.rpartition("=")
+    try:
+        if not sep:
+            raise ValueError(spec)
+        return metric.strip(), float(value)
+    except ValueError:
+        raise SystemExit(f"--abort-below inválido (use Métrica=valor): {spec}")
+
+class OptWatcher:
+    '''
+    Junta as fontes de uma otimização em andamento: poll() devolve os passes novos
+    (já gravados no store); frames, quando existem, são a fonte principal.
+    '''
+
+    def __init__(self, data_dir: Path, ea: str, run: str, store: ResultStore|None = None,
+                 fresh: bool = True):
+        self.run, self.store = run, store
+        self.frames = frames_file(data_dir, ea)
+        if fresh:
+            # Frames de uma otimização anterior: o EA trunca no OnTesterInit, mas só
+            # depois que o terminal sobe; apaga antes para não reler passes velhos.
+            self.frames.unlink(missing_ok=True)
+        self.frame_tail = LineTail(self.frames)
+        self.data_dir = data_dir
+        self.log_tails: dict[Path, LineTail] = {p: LineTail(p, from_end=True) for p in tester_logs(data_dir)}
+        self.counts = {"frames": 0, "log": 0}
+        self.best_by: dict[str, dict[str, float]] = {"frames": {}, "log": {}}
+        self.bad_lines = 0
+        self.abort_warned = False
+
+    def _discover_logs(self):
+        for p in tester_logs(self.data_dir):
+            if p not in self.log_tails:
+                self.log_tails[p] = LineTail(p)  # criado depois do início: lê do começo
+
+    def poll(self) -> list[dict]:
+        now = time.time()
+        rows = []
+        for line in self.frame_tail.poll():
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                self.bad_lines += 1
+                continue
+            metrics = rec.get("metrics", {})
+            rows.append({"source": "frames", "pass": str(rec.get("pass")), "result": metrics.get("Result"),
+                         "metrics": metrics, "inputs": rec.get("inputs", {}), "at": now})
+        self._discover_logs()
+        for tail in self.log_tails.values():
+            for line in tail.poll():
+                m = _LOG_PASS.search(line)
+                if m:
+                    rows.append({"source": "log", "pass": m.group(1).replace(" ", ""),
+                                 "result": float(m.group(2)), "metrics": {"Result": float(m.group(2))},
+                                 "inputs": {}, "at": now})
+        for r in rows:
+            self.counts[r["source"]] += 1
+            best = self.best_by[r["source"]]
+            for k, v in r["metrics"].items():
+                if isinstance(v, (int, float)) and (k not in best or v > best[k]):
+                    best[k] = v
+        if rows and self.store:
+            self.store.add_passes(self.run, rows)
+        return [r for r in rows if r["source"] == self.source]
+
+    @property
+    def source(self) -> str:
+        return "frames" if self.counts["frames"] else "log"
+
+    @property
+    def best(self) -> dict[str, float]:
+        '''Maior valor de cada métrica até agora, na fonte principal.'''
+        return self.best_by[self.source]
+
+    @property
+    def passes(self) -> int:
+        return self.counts[self.source]
+
+    def abort_reason(self, rule: tuple[str, float]|None, after: int) -> str|None:
+        if not rule or self.passes < after:
+            return None
+        metric, threshold = rule
+        best = self.best.get(metric)
+        if best is None:
+            return None
+        if best < threshold:
+            return f"melhor {metric} = {best:g} < {threshold:g} após {self.passes} passe(s)"
+        return None
+
+    def abort_warning(self, rule: tuple[str, float]|None, after: int) -> str|None:
+        '''Uma vez: a regra nunca vai disparar porque o log do tester só traz Result.'''
+        if not rule or self.abort_warned or self.passes < after or self.source != "log" or rule[0] == "Result":
+            return None
+        self.abort_warned = True
+        return (f"[opt] Aviso: --abort-below {rule[0]} não será avaliado: sem frames após {self.passes} "
+                f"passe(s), e o log do tester só traz Result (inclua MtcliFrames.mqh no EA).")
+
+def format_pass(r: dict, n: int, best: dict[str, float]) -> str:
+    m = r["metrics"]
+    shown = [f"{k}={m[k]:g}" for k in ("Result", "Total Net Profit", "Profit Factor", "Total Trades")
+             if isinstance(m.get(k), (int, float))]
+    inputs = " ".join(f"{k}={v}" for k, v in list(r["inputs"].items())[:6])
+    head = f"[opt] #{n:<5d} passe {r['pass']:>6s}  " + "  ".join(shown)
+    if "Result" in best:
+        head += f"  (melhor Result={best['Result']:g})"
+    return head + (f"  | {inputs}" if inputs else "")
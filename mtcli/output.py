@@ -0,0 +1,115 @@
+# output.py — saída para pessoas (texto) ou registros JSON por linha (--output json|jsonl)
+#
+# Todo registro tem o mesmo envelope, e os campos do evento vêm ao lado:
+#   {"v": 1, "ts": 1718000000.123, "cmd": "tester batch", "event": "combo_done", ...}
+# jsonl imprime cada registro assim que acontece; json junta todos num array no fim.
+# Em modo estruturado, o que o código ainda imprimir como texto vira {"event": "log",
+# "message": linha}, então o stdout é sempre JSON; avisos (warn) vão em "warning" e
+# SystemExit com mensagem em "error".
+import json, os, sys, threading, time
+
+SCHEMA_VERSION = 1
+MODES = ("text", "json", "jsonl")
+
+_lock = threading.Lock()
+_state = {"mode": "text", "cmd": None, "out": sys.stdout, "records": [], "closed": False}
+
+class _LineRecords:
+    '''Substitui sys.stdout em modo estruturado: cada linha de texto vira um registro "log".'''
+
+    def __init__(self):
+        self.local = threading.local()  # print() escreve texto e "\n" em chamadas separadas
+
+    def write(self, s: str) -> int:
+        buf = getattr(self.local, "buf", "") + s
+        *lines, self.local.buf = buf.split("\n")
+        for line in lines:
+            if line.strip():
+                emit("log", message=line.rstrip("\r"))
+        return len(s)
+
+    def flush(self):
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+def set_output(mode: str, cmd: str|None = None):
+    if mode not in MODES:
+        raise SystemExit(f"--output inválido: {mode} (use {', '.join(MODES)})")
+    _state.update(mode=mode, cmd=cmd, out=sys.stdout, records=[])
+    if mode != "text":
+        sys.stdout = _LineRecords()
+
+def set_command(cmd: str):
+    '''O "cmd" dos registros, quando só se sabe depois do parse (ex.: "tester batch").'''
+    _state["cmd"] = cmd
+
+def structured() -> bool:
+    return _state["mode"] != "text"
+
+def emit(event: str, text: str|None = None, to_stderr: bool = False, **fields):
+    '''
+    Um evento do comando. Texto: imprime `text` (nada se None; no stderr com
+    to_stderr). json/jsonl: registro com envelope + `fields` (Path e afins viram str).
+    '''
+    if not structured():
+        if text is not None:
+            print(text, file=sys.stderr if to_stderr else sys.stdout)
+        return
+    rec = {"v": SCHEMA_VERSION, "ts": round(time.time(), 3), "cmd": _state["cmd"], "event": event}
+    rec.update(fields)
+    with _lock:
+        if _state["mode"] == "json":
+            _state["records"].append(rec)
+            return
+        try:
+            out = _state["out"]
+            out.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+        except BrokenPipeError:
+            stdout_closed()
+            if threading.current_thread() is threading.main_thread():
+                raise SystemExit(1)
+
+def stdout_closed():
+    '''
+    Leitor do pipe saiu (mtcli ... | head): o resto da saída vai para devnull, sem
+    traceback de BrokenPipeError nem no flush da saída do interpretador.
+    '''
+    if _state["closed"]:
+        return
+    _state["closed"] = True
+    real = _state["out"] if structured() else sys.stdout
+    try:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, real.fileno())
+    except (AttributeError, OSError, ValueError):
+        pass
+
+def child_stdout():
+    '''stdout de subprocessos: herdado no texto; stderr no estruturado (o stdout é só JSON).'''
+    return sys.stderr if structured() else None
+
+def warn(message: str):
+    '''Aviso: stderr no modo texto, registro "warning" no estruturado.'''
+    if structured():
+        emit("warning", message=message)
+    else:
+        print(message, file=sys.stderr)
+
+def finish(rc: int):
+    '''Fecha a saída: registro "exit" com o código e, em json, o array completo.'''
+    if not structured():
+        return
+    emit("exit", rc=rc)
+    with _lock:
+        out = _state["out"]
+        sys.stdout = out
+        try:
+            if _state["mode"] == "json":
+                json.dump(_state["records"], out, ensure_ascii=False, default=str, indent=2)
+                out.write("\n")
+            out.flush()
+        except BrokenPipeError:
+            stdout_closed()
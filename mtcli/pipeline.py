@@ -0,0 +1,90 @@
+# pipeline.py — estágios ligados por filas limitadas (ex.: compilar -> INI -> testar -> relatório)
+#
+# Cada estágio tem N workers (threads) lendo da sua fila de entrada. A função do
+# estágio recebe (item, slot) e devolve/gera os itens do próximo estágio; o put
+# bloqueia quando a fila seguinte está cheia, e esse tempo bloqueado é a pressão de
+# volta (backpressure) contada em `blocked`. Quando o último worker de um estágio
+# termina, o próximo recebe um fim de fila por worker.
+import queue, threading, time
+from .output import emit
+
+_DONE = object()
+
+class Stage:
+    def __init__(self, name: str, func, workers: int = 1, queue_size: int = 0):
+        self.name, self.func = name, func
+        self.workers = max(1, workers)
+        self.inbox: queue.Queue = queue.Queue(maxsize=max(0, queue_size))
+        self.lock = threading.Lock()
+        self.alive = self.workers
+        self.processed = self.errors = 0
+        self.busy = self.blocked = 0.0
+        self.started = self.first = self.last = None
+
+    def utilization(self, wall: float) -> float:
+        return self.busy / (wall * self.workers) if wall > 0 else 0.0
+
+def _worker(stage: Stage, nxt: Stage|None, slot: int, results: list):
+    while True:
+        item = stage.inbox.get()
+        if item is _DONE:
+            break
+        t0 = time.perf_counter()
+        with stage.lock:
+            stage.first = stage.first or t0
+        blocked = 0.0
+        try:
+            for out in stage.func(item, slot) or ():
+                if nxt is None:
+                    results.append(out)
+                    continue
+                t1 = time.perf_counter()
+                nxt.inbox.put(out)
+                blocked += time.perf_counter() - t1
+        except Exception as exc:
+            with stage.lock:
+                stage.errors += 1
+            emit("stage_error", f"[pipeline] {stage.name}: erro inesperado: {exc!r}", stage=stage.name, error=repr(exc))
+        t2 = time.perf_counter()
+        with stage.lock:
+            stage.processed += 1
+            stage.busy += t2 - t0 - blocked
+            stage.blocked += blocked
+            stage.last = t2
+    with stage.lock:
+        stage.alive -= 1
+        last = stage.alive == 0
+    if last and nxt is not None:
+        for _ in range(nxt.workers):
+            nxt.inbox.put(_DONE)
+
+def run_stages(items, stages: list[Stage]) -> tuple[list, float]:
+    '''Alimenta o 1º estágio com `items` e espera o último; retorna (saídas do último, segundos).'''
+    results: list = []
+    threads = []
+    t0 = time.perf_counter()
+    for i, stage in enumerate(stages):
+        stage.started = t0
+        nxt = stages[i + 1] if i + 1 < len(stages) else None
+        for slot in range(stage.workers):
+            t = threading.Thread(target=_worker, args=(stage, nxt, slot, results),
+                                 name=f"{stage.name}-{slot}", daemon=True)
+            t.start()
+            threads.append(t)
+    for item in items:
+        stages[0].inbox.put(item)
+    for _ in range(stages[0].workers):
+        stages[0].inbox.put(_DONE)
+    for t in threads:
+        t.join()
+    return results, time.perf_counter() - t0
+
+def format_stage_table(stages: list[Stage], wall: float) -> list[str]:
+    '''Resumo por estágio: itens, uso dos workers, tempo bloqueado na fila seguinte e janela ativa.'''
+    width = max(len(s.name) for s in stages)
+    lines = [f"{'estágio':{width}s}  workers  itens  erros   uso%  bloqueado  ativo (s)"]
+    for s in stages:
+        window = f"{s.first - s.started:6.2f}-{s.last - s.started:.2f}" if s.first else "-"
+        lines.append(f"{s.name:{width}s}  {s.workers:7d}  {s.processed:5d}  {s.errors:5d}  "
+                     f"{100 * s.utilization(wall):5.1f}  {s.blocked:8.2f}s  {window}")
+    return lines
@@ -0,0 +1,171 @@
+# plan.py — plano do tester (grid / zip / when / constraints)
+import ast, itertools, json
+
+_EXPR_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.Is, ast.IsNot, ast.IfExp, ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List, ast.Call,
+)
+_EXPR_FUNCS = {"abs": abs, "min": min, "max": max, "round": round}
+_EXPR_CONSTS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+class PlanExpr:
+    '''Expressão de plano validada por whitelist de nós AST e compilada uma vez.'''
+    def __init__(self, text: str):
+        self.text = text
+        try:
+            tree = ast.parse(text, mode="eval")
+        except SyntaxError as exc:
+            raise SystemExit(f"Expressão inválida no plano: {text!r} ({exc.msg})")
+        names = set()
+        for node in ast.walk(tree):
+            if not isinstance(node, _EXPR_NODES):
+                raise SystemExit(f"Expressão não suportada no plano: {text!r} ({type(node).__name__})")
+            if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in _EXPR_FUNCS):
+                raise SystemExit(f"Função não permitida no plano: {text!r}")
+            if isinstance(node, ast.Name) and node.id not in _EXPR_FUNCS and node.id not in _EXPR_CONSTS:
+                names.add(node.id)
+        self.names = frozenset(names)
+        self.code = compile(tree, "<plan>", "eval")
+
+    def applies(self, env: dict) -> bool:
+        return self.names <= env.keys()
+
+    def __call__(self, env: dict) -> bool:
+        scope = dict(_EXPR_CONSTS, **_EXPR_FUNCS)
+        scope.update(env)
+        try:
+            return bool(eval(self.code, {"__builtins__": {}}, scope))
+        except Exception as exc:
+            raise SystemExit(f"Falha avaliando {self.text!r} com {env}: {exc}")
+
+def _zip_rows(group: dict, where: str) -> list[dict]:
+    keys = list(group)
+    lengths = {len(group[k]) for k in keys}
+    if len(lengths) > 1:
+        raise SystemExit(f"{where}: listas do zip com tamanhos diferentes ({', '.join(f'{k}={len(group[k])}' for k in keys)}).")
+    return [dict(zip(keys, vals)) for vals in zip(*(group[k] for k in keys))]
+
+def _axes(grid: dict, zips: list, where: str) -> list[list[dict]]:
+    '''Cada eixo é uma lista de dicts parciais; o produto dos eixos gera as combinações.'''
+    axes = [[{k: v} for v in grid[k]] for k in sorted(grid)]
+    for i, group in enumerate(zips or []):
+        axes.append(_zip_rows(group, f"{where} zip[{i}]"))
+    return axes
+
+class CompiledPlan:
+    '''
+    Stream preguiçoso e deduplicado de combinações (dicts de inputs variados).
+    Cada iteração recomeça do zero e recontabiliza `stats`.
+    '''
+    def __init__(self, spec: dict):
+        self.base = spec.get("base", {})
+        self.base_inputs = self.base.get("inputs", {})
+        self.axes = _axes(spec.get("grid", {}), spec.get("zip", []), "plano")
+        self.when = []
+        for i, rule in enumerate(spec.get("when", [])):
+            if "if" not in rule:
+                raise SystemExit(f"when[{i}] sem 'if'.")
+            self.when.append((PlanExpr(rule["if"]),
+                              _axes(rule.get("grid", {}), rule.get("zip", []), f"when[{i}]"),
+                              rule.get("else", {})))
+        self.constraints = [PlanExpr(c) for c in spec.get("constraints", [])]
+        self.ignore = []
+        for i, rule in enumerate(spec.get("ignore", [])):
+            cond = PlanExpr(rule["if"]) if rule.get("if") else None
+            self.ignore.append((cond, frozenset(rule.get("inputs", []))))
+        self._check_names(spec)
+        self.stats: dict = {}
+
+    def _check_names(self, spec: dict):
+        '''Nome desconhecido numa expressão (erro de digitação) faria a regra nunca valer, em silêncio.'''
+        known = set(self.base_inputs) | set(spec.get("grid", {}))
+        for group in spec.get("zip", []):
+            known |= set(group)
+        for rule in spec.get("when", []):
+            known |= set(rule.get("grid", {})) | set(rule.get("else", {}))
+            for group in rule.get("zip", []):
+                known |= set(group)
+        exprs = [(f"when {c.text!r}", c) for c, _, _ in self.when]
+        exprs += [(f"constraint {c.text!r}", c) for c in self.constraints]
+        exprs += [(f"ignore {c.text!r}", c) for c, _ in self.ignore if c is not None]
+        for where, expr in exprs:
+            unknown = sorted(expr.names - known)
+            if unknown:
+                raise SystemExit(f"Plano: {where} usa input desconhecido: {', '.join(unknown)} "
+                                 f"(inputs do plano: {', '.join(sorted(known)) or 'nenhum'}).")
+
+    def _reset_stats(self):
+        self.stats = {"raw": 0, "when": [0] * len(self.when),
+                      "constraints": [0] * len(self.constraints), "duplicates": 0, "emitted": 0}
+
+    def _expand_when(self, params: dict, i: int):
+        if i == len(self.when):
+            yield params
+            return
+        cond, axes, otherwise = self.when[i]
+        env = dict(self.base_inputs, **params)
+        if cond.applies(env) and cond(env):
+            for parts in itertools.product(*axes):
+                self.stats["when"][i] += 1
+                sub = dict(params)
+                for part in parts: sub.update(part)
+                yield from self._expand_when(sub, i + 1)
+        else:
+            yield from self._expand_when(dict(params, **otherwise), i + 1)
+
+    def _dedup_key(self, params: dict) -> tuple:
+        env = dict(self.base_inputs, **params)
+        dropped = set()
+        for cond, names in self.ignore:
+            if cond is None or (cond.applies(env) and cond(env)):
+                dropped |= names
+        return tuple(sorted((k, json.dumps(v, sort_keys=True)) for k, v in params.items() if k not in dropped))
+
+    def __iter__(self):
+        self._reset_stats()
+        seen = set()
+        for parts in itertools.product(*self.axes):
+            self.stats["raw"] += 1
+            params: dict = {}
+            for part in parts: params.update(part)
+            for combo in self._expand_when(params, 0):
+                env = dict(self.base_inputs, **combo)
+                rejected = False
+                for j, rule in enumerate(self.constraints):
+                    if rule.applies(env) and not rule(env):
+                        self.stats["constraints"][j] += 1
+                        rejected = True
+                        break
+                if rejected:
+                    continue
+                key = self._dedup_key(combo)
+                if key in seen:
+                    self.stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+                self.stats["emitted"] += 1
+                yield combo
+
+    def count(self) -> int:
+        return sum(1 for _ in self)
+
+    def explain(self) -> list[str]:
+        total = self.count()
+        s = self.stats
+        rows = [("grid/zip (produto bruto)", str(s["raw"]))]
+        for (cond, _, _), n in zip(self.when, s["when"]):
+            rows.append((f"when {cond.text}", f"{n} expandidas"))
+        for rule, n in zip(self.constraints, s["constraints"]):
+            rows.append((f"constraint {rule.text}", f"-{n}"))
+        rows.append(("duplicadas (ignore/repetidas)", f"-{s['duplicates']}"))
+        rows.append(("total a executar", str(total)))
+        width = max(len(r[0]) for r in rows)
+        return [f"{name:<{width}s} : {val}" for name, val in rows]
+
+def compile_plan(spec: dict) -> CompiledPlan:
+    return CompiledPlan(spec)
+
+def combo_label(combo: dict) -> str:
+    return "_".join(f"{k}-{str(v).replace(':','')}" for k, v in combo.items())
@@ -0,0 +1,167 @@
+# regress.py — baseline de métricas do tester e comparação com tolerâncias
+#
+# Baseline: diretório com um <label>.json por combinação ({"label","inputs","metrics"})
+# ou um arquivo SQLite (.db/.sqlite) com a tabela runs(label, inputs, metrics, updated).
+#
+# Tolerâncias por métrica: {"Total Net Profit": {"abs": 50}, "Profit Factor": {"rel": 0.02},
+# "*": {"rel": 0.001}}. Permitido = max(abs, rel * |baseline|). Uma diferença acima disso
+# é "pior"/"melhor" conforme o sentido da métrica (drawdown: menor é melhor) ou "mudou"
+# nas neutras (nº de trades).
+import json, math, time
+from array import array
+from pathlib import Path
+from .report import metric_direction
+from .util import ensure_dir, write_text_utf8
+
+DEFAULT_TOLERANCE = {"abs": 0.005, "rel": 0.0}
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def _is_sqlite(path: Path) -> bool:
+    return path.suffix.lower() in SQLITE_SUFFIXES
+
+def _sqlite(path: Path):
+    import sqlite3
+    ensure_dir(path.parent)
+    db = sqlite3.connect(str(path))
+    db.execute("CREATE TABLE IF NOT EXISTS runs (label TEXT PRIMARY KEY, inputs TEXT, metrics TEXT, updated TEXT)")
+    return db
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    '''{label: {"inputs": {...}, "metrics": {...}}} do diretório ou banco SQLite.'''
+    if not path.exists():
+        raise SystemExit(f"Baseline não encontrado: {path} (gere com --update-baseline)")
+    runs: dict[str, dict] = {}
+    if _is_sqlite(path):
+        db = _sqlite(path)
+        try:
+            for label, inputs, metrics in db.execute("SELECT label, inputs, metrics FROM runs"):
+                runs[label] = {"inputs": json.loads(inputs or "{}"), "metrics": json.loads(metrics or "{}")}
+        finally:
+            db.close()
+        return runs
+    for f in sorted(path.glob("*.json")):
+        data = json.loads(f.read_text(encoding="utf-8"))
+        runs[data.get("label", f.stem)] = {"inputs": data.get("inputs", {}), "metrics": data.get("metrics", {})}
+    return runs
+
+def save_baseline(path: Path, runs: dict[str, dict]):
+    stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    if _is_sqlite(path):
+        db = _sqlite(path)
+        with db:
+            db.executemany("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?)",
+                           [(label, json.dumps(r["inputs"]), json.dumps(r["metrics"]), stamp)
+                            for label, r in runs.items()])
+        db.close()
+        return
+    for label, r in runs.items():
+        write_text_utf8(path / f"{label}.json",
+                        json.dumps({"label": label, "inputs": r["inputs"], "metrics": r["metrics"],
+                                    "updated": stamp}, indent=2, ensure_ascii=False))
+
+def parse_tolerances(spec: dict|None, overrides: list[str]|None = None) -> dict[str, dict]:
+    '''
+    Junta as tolerâncias do plano ("tolerances") com as de linha de comando,
+    no formato "Métrica=rel:0.02,abs:5" ("*" = padrão das demais métricas).
+    '''
+    tols = {"*": dict(DEFAULT_TOLERANCE)}
+    for metric, tol in (spec or {}).items():
+        tols[metric] = dict(DEFAULT_TOLERANCE, **tol)
+    for item in overrides or []:
+        metric, sep, rest = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--tol inválido (use Métrica=rel:0.02,abs:5): {item}")
+        tol = dict(DEFAULT_TOLERANCE)
+        for part in rest.split(","):
+            kind, _, value = part.partition(":")
+            if kind.strip() not in ("abs", "rel"):
+                raise SystemExit(f"--tol inválido (abs/rel): {item}")
+            tol[kind.strip()] = float(value)
+        tols[metric.strip()] = tol
+    return tols
+
+def _exceeding(cur: array, base: array, tol_abs: array, tol_rel: array, width: int) -> list[tuple[int, int, float, float]]:
+    '''
+    (linha, coluna, delta, permitido) das células fora da tolerância numa matriz
+    runs x métricas achatada (NaN = ausente). Usa numpy quando instalado.
+    '''
+    try:
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is not None:
+        c = np.frombuffer(cur, dtype=float).reshape(-1, width)
+        b = np.frombuffer(base, dtype=float).reshape(-1, width)
+        delta = c - b
+        allowed = np.maximum(np.frombuffer(tol_abs, dtype=float), np.frombuffer(tol_rel, dtype=float) * np.abs(b))
+        rows, cols = np.nonzero(np.abs(delta) > allowed)
+        return [(int(i), int(j), float(delta[i, j]), float(allowed[i, j])) for i, j in zip(rows, cols)]
+    out = []
+    for k, (c, b) in enumerate(zip(cur, base)):
+        j = k % width
+        allowed = max(tol_abs[j], tol_rel[j] * abs(b))
+        if abs(c - b) > allowed:  # NaN nunca passa daqui
+            out.append((k // width, j, c - b, allowed))
+    return out
+
+def compare_runs(current: dict[str, dict], baseline: dict[str, dict], tolerances: dict[str, dict]) -> list[dict]:
+    '''
+    Linhas de diferença: status "pior"/"melhor"/"mudou" (fora da tolerância), "sem baseline",
+    "sem resultado" (combinação/relatório ausente) ou "métrica ausente".
+    '''
+    diffs: list[dict] = []
+    labels = sorted(set(current) | set(baseline))
+    both = []
+    for label in labels:
+        if label not in baseline:
+            diffs.append({"label": label, "metric": "*", "status": "sem baseline"})
+        elif not current.get(label, {}).get("metrics"):
+            diffs.append({"label": label, "metric": "*", "status": "sem resultado"})
+        else:
+            both.append(label)
+    names = sorted({m for label in both for m in baseline[label]["metrics"]})
+    if not both or not names:
+        return diffs
+    width = len(names)
+    nan = float("nan")
+    cur, base = array("d"), array("d")
+    for label in both:
+        c, b = current[label]["metrics"], baseline[label]["metrics"]
+        for m in names:
+            bv = b.get(m)
+            base.append(nan if bv is None else float(bv))
+            cv = c.get(m)
+            if cv is None and bv is not None:
+                diffs.append({"label": label, "metric": m, "status": "métrica ausente", "baseline": bv})
+            cur.append(nan if cv is None else float(cv))
+    tol = [tolerances.get(m, tolerances["*"]) for m in names]
+    tol_abs = array("d", (t.get("abs", 0.0) for t in tol))
+    tol_rel = array("d", (t.get("rel", 0.0) for t in tol))
+    for i, j, delta, allowed in _exceeding(cur, base, tol_abs, tol_rel, width):
+        metric = names[j]
+        b = base[i * width + j]
+        direction = metric_direction(metric)
+        status = "mudou" if direction == 0 else ("pior" if delta * direction < 0 else "melhor")
+        diffs.append({"label": both[i], "metric": metric, "baseline": b, "current": cur[i * width + j],
+                      "delta": delta, "rel": delta / abs(b) if b else math.inf, "allowed": allowed,
+                      "status": status})
+    order = {"pior": 0, "mudou": 1, "sem resultado": 2, "métrica ausente": 3, "sem baseline": 4, "melhor": 5}
+    diffs.sort(key=lambda d: (order[d["status"]], d["label"], d["metric"]))
+    return diffs
+
+def format_diff_table(diffs: list[dict], limit: int = 50) -> list[str]:
+    if not diffs:
+        return []
+    lw = min(32, max(len(d["label"]) for d in diffs))
+    mw = min(28, max(len(d["metric"]) for d in diffs))
+    lines = [f"{'combinação':{lw}s}  {'métrica':{mw}s}  {'baseline':>12s}  {'atual':>12s}  {'Δ':>10s}  {'Δ%':>7s}  status"]
+    for d in diffs[:limit]:
+        if "delta" in d:
+            rel = f"{d['rel'] * 100:+.1f}%" if math.isfinite(d["rel"]) else "inf"
+            nums = f"{d['baseline']:12.2f}  {d['current']:12.2f}  {d['delta']:+10.2f}  {rel:>7s}"
+        else:
+            nums = f"{d.get('baseline', ''):>12}  {'':>12s}  {'':>10s}  {'':>7s}"
+        lines.append(f"{d['label'][:lw]:{lw}s}  {d['metric'][:mw]:{mw}s}  {nums}  {d['status']}")
+    if len(diffs) > limit:
+        lines.append(f"... +{len(diffs) - limit} linha(s)")
+    return lines
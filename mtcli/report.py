@@ -0,0 +1,49 @@
+# report.py — leitura dos relatórios do Strategy Tester (.htm / .html)
+#
+# O relatório HTML do MT5 é uma tabela de pares "Rótulo:" / <b>valor</b>, ex.:
+#   <td nowrap>Total Net Profit:</td><td nowrap><b>1 234.56</b></td>
+#   <td nowrap>Balance Drawdown Maximal:</td><td nowrap><b>321.00 (3.10%)</b></td>
+# Cada valor vira o primeiro número da célula (espaço como separador de milhar).
+import re
+from pathlib import Path
+
+_PAIR = re.compile(r"<td[^>]*>\s*([^<>]+?)\s*:\s*</td>\s*<td[^>]*>\s*<b>([^<]*)</b>", re.I)
+_NUMBER = re.compile(r"[-+]?\d[\d \xa0]*(?:[.,]\d+)?")
+
+# Sentido das métricas: menor é melhor / sem sentido (só mudou); as demais, maior é melhor.
+LOWER_IS_BETTER = ("drawdown", "loss trades", "consecutive losses")
+NEUTRAL = ("total trades", "total deals", "short trades", "long trades", "bars", "ticks", "symbols")
+
+def metric_direction(metric: str) -> int:
+    '''+1 maior é melhor, -1 menor é melhor, 0 neutra.'''
+    m = metric.lower()
+    if any(k in m for k in NEUTRAL):
+        return 0
+    return -1 if any(k in m for k in LOWER_IS_BETTER) else 1
+
+def read_report_text(path: Path) -> str:
+    raw = path.read_bytes()
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return raw.decode("utf-16")
+    if len(raw) > 1 and raw[1:2] == b"\x00":
+        return raw.decode("utf-16-le")
+    return raw.decode("utf-8", errors="replace")
+
+def parse_number(text: str) -> float|None:
+    m = _NUMBER.search(text)
+    if not m:
+        return None
+    s = m.group(0).replace(" ", "").replace("\xa0", "").replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+def parse_report(path: Path) -> dict[str, float]:
+    '''Métricas numéricas de um relatório HTML do tester ({"Total Net Profit": 1234.56, ...}).'''
+    metrics: dict[str, float] = {}
+    for label, value in _PAIR.findall(read_report_text(path)):
+        num = parse_number(value)
+        if num is not None:
+            metrics.setdefault(" ".join(label.split()), num)
+    return metrics
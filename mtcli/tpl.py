@@ -0,0 +1,120 @@
+# tpl.py — builders de template (.tpl)
+from .ini import _fmt_val
+from .util import timeframe_ok
+
+CSV_PLOT_INDICATOR = "CSV_Reader_Plot_v3.1"
+CSV_PLOT_MAX_SERIES = 32  # = MAX_SERIES em Indicators/CSV_Reader_Plot_v3.1.mq5
+
+def tpl_period(tf: str) -> tuple[int, int]:
+    '''Converte M15/H1/D1... para (period_type, period_size) do formato .tpl.'''
+    tf = timeframe_ok(tf)
+    if tf == "MN1": return 4, 1
+    kind, size = tf[0], int(tf[1:])
+    return {"M": 0, "H": 1, "D": 2, "W": 3}[kind], size
+
+def build_tpl_indicator(path: str, inputs: dict, height: float = 50.0) -> str:
+    '''Bloco <window> com um indicador customizado e seus [inputs].'''
+    lines = ["<window>", f"height={height:.6f}", "objects=0", "",
+             "<indicator>", "name=Custom Indicator",
+             f"path=Indicators\\{path}.ex5",
+             "apply=0", "show_data=1", "scale_inherit=0", "scale_line=0",
+             "scale_line_percent=50", "scale_line_value=0.000000",
+             "scale_fix_min=0", "scale_fix_min_val=0.000000",
+             "scale_fix_max=0", "scale_fix_max_val=0.000000",
+             "expertmode=0", "fixed_height=-1", "", "<inputs>"]
+    for name, val in inputs.items():
+        lines.append(f"{name}={_fmt_val(val)}")
+    lines += ["</inputs>", "</indicator>", "</window>"]
+    return "\n".join(lines) + "\n"
+
+def build_tpl_chart(symbol: str|None, period: str|None, windows: list[str],
+                    expert: str|None = None) -> str:
+    '''Monta um .tpl: janela principal + subjanelas (já renderizadas) + EA opcional.'''
+    lines = ["<chart>", "id=0"]
+    if symbol: lines.append(f"symbol={symbol}")
+    if period:
+        ptype, psize = tpl_period(period)
+        lines.append(f"period_type={ptype}")
+        lines.append(f"period_size={psize}")
+    lines += ["mode=1", "scale=8", "graph=1", "fore=0", "grid=0", "shift=1", "autoscroll=1", ""]
+    if expert:
+        lines.append(expert.rstrip("\n"))
+        lines.append("")
+    lines += ["<window>", "height=100.000000", "objects=0", "",
+              "<indicator>", "name=Main", "path=", "apply=1", "show_data=1",
+              "scale_inherit=0", "scale_line=0", "scale_line_percent=50",
+              "scale_line_value=0.000000", "scale_fix_min=0", "scale_fix_min_val=0.000000",
+              "scale_fix_max=0", "scale_fix_max_val=0.000000", "expertmode=0",
+              "fixed_height=-1", "</indicator>", "</window>", ""]
+    for win in windows:
+        lines.append(win.rstrip("\n"))
+        lines.append("")
+    lines.append("</chart>")
+    return "\n".join(lines) + "\n"
+
+def split_series(columns: list[str], per_instance: int) -> list[list[str]]:
+    '''Divide as colunas em grupos de até `per_instance` (uma instância por grupo).'''
+    if per_instance < 1 or per_instance > CSV_PLOT_MAX_SERIES:
+        raise SystemExit(f"--per-instance deve estar entre 1 e {CSV_PLOT_MAX_SERIES}.")
+    cols = [c.strip() for c in columns if c and c.strip()]
+    return [cols[i:i + per_instance] for i in range(0, len(cols), per_instance)]
+
+def build_tpl_csv_plot(symbol: str|None, period: str|None, csv_file: str,
+                       columns: list[str], per_instance: int = 8,
+                       indicator: str = CSV_PLOT_INDICATOR,
+                       extra_inputs: dict|None = None) -> str:
+    '''
+    Template com N instâncias do CSV_Reader_Plot, cada uma com até
+    `per_instance` colunas em In_ValueColumns (In_MaxSeries acompanha).
+    '''
+    windows = []
+    for group in split_series(columns, per_instance):
+        inputs = {"In_FileName": csv_file}
+        inputs.update(extra_inputs or {})
+        inputs["In_ValueColumns"] = ";".join(group)
+        inputs["In_MaxSeries"] = len(group)
+        windows.append(build_tpl_indicator(indicator, inputs))
+    return build_tpl_chart(symbol, period, windows)
+
+def build_tpl_expert(expert: str, inputs: dict|None = None, expertmode: int = 1) -> str:
+    '''Bloco <expert> (Experts\\<expert>.ex5) com os [inputs] do EA.'''
+    path = expert.replace("/", "\\")
+    if path.lower().endswith((".ex5", ".mq5")):
+        path = path[:-4]
+    short = path.rpartition("\\")[2]
+    lines = ["<expert>", f"name={short}", f"path=Experts\\{path}.ex5",
+             f"expertmode={expertmode}", "<inputs>"]
+    for name, val in (inputs or {}).items():
+        lines.append(f"{name}={_fmt_val(val)}")
+    lines += ["</inputs>", "</expert>"]
+    return "\n".join(lines) + "\n"
+
+_CHART_BINDING = ("symbol=", "period_type=", "period_size=")
+
+def apply_tpl_expert(base: str|None, expert_block: str) -> str:
+    '''
+    Coloca o bloco <expert> num template base (substitui o EA que houver). Sem
+    símbolo/período: o mesmo .tpl serve para qualquer gráfico em que for aplicado.
+    '''
+    if not base:
+        return build_tpl_chart(None, None, [], expert=expert_block)
+    out, skipping, inserted, depth = [], False, False, 0
+    for line in base.lstrip("\ufeff").splitlines():
+        s = line.strip()
+        if skipping:
+            skipping = s != "</expert>"
+            continue
+        if depth == 1 and s == "<expert>":
+            skipping = True
+            continue
+        if depth == 1 and s.startswith(_CHART_BINDING):
+            continue
+        if depth == 1 and not inserted and s in ("<window>", "</chart>"):
+            out += [expert_block.rstrip("\n"), ""]
+            inserted = True
+        if s.startswith("</"):
+            depth -= 1
+        elif s.startswith("<") and s.endswith(">"):
+            depth += 1
+        out.append(line)
+    return "\n".join(out) + "\n"
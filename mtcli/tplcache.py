@@ -0,0 +1,129 @@
+# tplcache.py — templates de EA renderizados e reaproveitados por hash do conteúdo
+#
+# Template = base (.tpl opcional) + bloco <expert> com os inputs (preset .set + --input).
+# O nome do arquivo leva o hash do texto renderizado, mtcli-<EA>-<hash12>.tpl, em
+# MQL5\Profiles\Templates: conteúdo igual -> mesmo arquivo, que não é regravado; N
+# gráficos com o mesmo EA/preset compartilham um .tpl (sem símbolo/período no conteúdo).
+import hashlib
+from pathlib import Path
+from .instance import templates_dir
+from .env import to_local_path
+from .tpl import apply_tpl_expert, build_tpl_expert
+from .util import write_text_utf16
+
+TPL_PREFIX = "mtcli-"
+
+def read_text_any(path: Path) -> str:
+    '''.tpl/.set do MT5: UTF-16 (com/sem BOM) ou UTF-8.'''
+    raw = path.read_bytes()
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return raw.decode("utf-16")
+    if len(raw) > 1 and raw[1:2] == b"\x00":
+        return raw.decode("utf-16-le")
+    return raw.decode("utf-8-sig", errors="replace")
+
+def _resolve(data_dir: Path|None, name: str, subdir: str) -> Path:
+    path = Path(name)
+    if path.exists() or not data_dir:
+        return path
+    return to_local_path(data_dir) / "MQL5" / "Profiles" / subdir / name
+
+def read_set_file(path: Path) -> dict[str, str]:
+    '''Inputs de um preset .set (Nome=valor||início||passo||fim||Y -> só o valor).'''
+    inputs: dict[str, str] = {}
+    for line in read_text_any(path).splitlines():
+        line = line.strip()
+        if not line or line.startswith(";") or "=" not in line:
+            continue
+        k, v = line.split("=", 1)
+        inputs[k.strip()] = v.split("||", 1)[0].strip()
+    return inputs
+
+def parse_inputs(items: list[str]|None) -> dict[str, str]:
+    out = {}
+    for item in items or []:
+        k, sep, v = item.partition("=")
+        if not sep:
+            raise SystemExit(f"--input inválido (use Nome=valor): {item}")
+        out[k.strip()] = v.strip()
+    return out
+
+def template_name(expert: str, content: str) -> str:
+    stem = expert.replace("\\", "/").rsplit("/", 1)[-1]
+    if stem.lower().endswith((".ex5", ".mq5")):
+        stem = stem[:-4]
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:12]
+    return f"{TPL_PREFIX}{stem}-{digest}.tpl"
+
+class TemplateEngine:
+    '''
+    Renderiza e grava templates de EA de uma Data Folder. Bases e presets lidos uma
+    vez por engine; templates idênticos (no disco ou na mesma chamada) são reaproveitados.
+    '''
+
+    def __init__(self, data_dir: Path|None, out_dir: Path|None = None):
+        self.data_dir = data_dir
+        self.out_dir = Path(out_dir) if out_dir else templates_dir(data_dir)
+        self._files: dict[tuple[str, str], object] = {}
+        self._done: dict[str, str] = {}
+
+    def _load(self, name: str, subdir: str, reader):
+        key = (subdir, name)
+        if key not in self._files:
+            path = _resolve(self.data_dir, name, subdir)
+            if not path.exists():
+                raise SystemExit(f"Arquivo não encontrado: {path}")
+            self._files[key] = reader(path)
+        return self._files[key]
+
+    def render(self, expert: str, preset: str|None = None, inputs: dict|None = None,
+               base: str|None = None) -> str:
+        params = dict(self._load(preset, "Tester", read_set_file)) if preset else {}
+        params.update(inputs or {})
+        base_text = self._load(base, "Templates", read_text_any) if base else None
+        return apply_tpl_expert(base_text, build_tpl_expert(expert, params))
+
+    def ensure(self, expert: str, preset: str|None = None, inputs: dict|None = None,
+               base: str|None = None) -> tuple[str, str]:
+        '''(nome do .tpl, "novo" | "reutilizado").'''
+        content = self.render(expert, preset, inputs, base)
+        name = template_name(expert, content)
+        if name in self._done:
+            return name, "reutilizado"
+        data = ("\ufeff" + content).encode("utf-16-le")  # .tpl: UTF-16 LE com BOM
+        path = self.out_dir / name
+        try:
+            status = "reutilizado" if path.read_bytes() == data else "novo"
+        except OSError:
+            status = "novo"
+        if status == "novo":
+            write_text_utf16(path, "\ufeff" + content)
+        self._done[name] = status
+        return name, status
+
+def create_template_for_expert(data_dir: Path, expert: str, symbol: str|None = None,
+                               period: str|None = None, preset: str|None = None,
+                               inputs: dict|None = None, base: str|None = None) -> str:
+    '''
+    Nome do .tpl (em MQL5\\Profiles\\Templates) que anexa `expert` com o preset/inputs.
+    symbol/period não entram no template: o gráfico é escolhido pelo ATTACH_EA.
+    '''
+    name, _ = TemplateEngine(data_dir).ensure(expert, preset, inputs, base)
+    return name
+
+def load_chart_plan(path: Path) -> list[dict]:
+    '''
+    Plano JSON com vários gráficos/EAs: lista (ou {"charts": [...]}) de
+    {"symbol", "period", "expert", "preset", "inputs", "base"}; "defaults" vale para todos.
+    '''
+    import json
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    defaults = data.get("defaults", {}) if isinstance(data, dict) else {}
+    charts = data.get("charts", []) if isinstance(data, dict) else data
+    out = []
+    for i, chart in enumerate(charts, 1):
+        entry = dict(defaults, **chart)
+        if not entry.get("expert"):
+            raise SystemExit(f"Plano {path}: item {i} sem 'expert'.")
+        out.append(entry)
+    return out
@@ -0,0 +1,114 @@
+# trace.py — spans de tempo (--profile / MTCLI_TRACE)
+#
+# Spans no formato de eventos "X" do Chrome trace (name/ph/ts/dur/pid/tid/args).
+# Arquivo *.json -> JSON Array Format (abre direto em chrome://tracing / Perfetto);
+# qualquer outra extensão -> JSON lines. 'mtcli trace summarize' lê os dois.
+import functools, json, math, os, sys, threading, time
+from contextlib import contextmanager
+from pathlib import Path
+from .config import CONFIG_DIR
+
+TRACE_DIR = CONFIG_DIR / "traces"
+_trace_path: Path|None = None
+
+def trace_enable(path: str|Path|None) -> Path|None:
+    global _trace_path
+    if not path:
+        _trace_path = None
+        return None
+    _trace_path = Path(path)
+    _trace_path.parent.mkdir(parents=True, exist_ok=True)
+    if _trace_path.suffix.lower() == ".json" and not _trace_path.exists():
+        _trace_path.write_text("[\n", encoding="utf-8")
+    return _trace_path
+
+def trace_enabled() -> bool:
+    return _trace_path is not None
+
+def trace_emit(name: str, start: float, dur: float, attrs: dict):
+    if _trace_path is None:
+        return
+    event = {"name": name, "ph": "X", "ts": int(start * 1e6), "dur": int(dur * 1e6),
+             "pid": os.getpid(), "tid": threading.get_ident(), "args": attrs}
+    line = json.dumps(event, ensure_ascii=False, default=str)
+    if _trace_path.suffix.lower() == ".json":
+        line += ","
+    # Uma linha por write() em modo append: seguro entre processos paralelos.
+    with _trace_path.open("a", encoding="utf-8") as fh:
+        fh.write(line + "\n")
+
+@contextmanager
+def span(name: str, **attrs):
+    '''Mede um trecho; o dict cedido aceita atributos extras (ex.: rc).'''
+    if _trace_path is None:
+        yield attrs
+        return
+    start = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as exc:
+        attrs.setdefault("error", type(exc).__name__)
+        raise
+    finally:
+        trace_emit(name, start, time.perf_counter() - t0, attrs)
+
+def traced(name: str, attrs=None):
+    '''Decorator: abre um span por chamada. `attrs(*args, **kw)` gera atributos.'''
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if _trace_path is None:
+                return fn(*a, **kw)
+            extra = {}
+            if attrs:
+                try: extra = attrs(*a, **kw)
+                except Exception: extra = {}
+            with span(name, **extra) as sp:
+                result = fn(*a, **kw)
+                if isinstance(result, int) and not isinstance(result, bool):
+                    sp["rc"] = result
+                return result
+        return wrapper
+    return deco
+
+def read_trace_events(path: Path) -> list[dict]:
+    events = []
+    for raw in path.read_text(encoding="utf-8", errors="replace").splitlines():
+        line = raw.strip().rstrip(",")
+        if not line or line in ("[", "]"):
+            continue
+        try:
+            ev = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(ev, dict) and ev.get("ph", "X") == "X" and "dur" in ev:
+            events.append(ev)
+    return events
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    '''Percentil por nearest-rank sobre uma lista já ordenada.'''
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+def summarize_trace(events: list[dict]) -> list[dict]:
+    by_name: dict[str, list[float]] = {}
+    for ev in events:
+        by_name.setdefault(ev["name"], []).append(ev["dur"] / 1000.0)
+    rows = []
+    for name, durs in by_name.items():
+        durs.sort()
+        rows.append({"name": name, "count": len(durs), "total_ms": sum(durs),
+                     "p50_ms": percentile(durs, 50), "p95_ms": percentile(durs, 95),
+                     "max_ms": durs[-1]})
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows
+
+def print_trace_summary(rows: list[dict], file=None):
+    file = file or sys.stdout
+    print(f"{'span':32s} {'n':>6s} {'total ms':>11s} {'p50 ms':>9s} {'p95 ms':>9s} {'max ms':>9s}", file=file)
+    for r in rows:
+        print(f"{r['name'][:32]:32s} {r['count']:6d} {r['total_ms']:11.1f} "
+              f"{r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['max_ms']:9.2f}", file=file)
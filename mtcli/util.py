@@ -0,0 +1,30 @@
+# util.py — IO e validações pequenas compartilhadas pelos comandos
+import time
+from pathlib import Path
+from .atomic import atomic_write, unique_stamp
+from .trace import traced
+
+def ensure_dir(p: Path):
+    p.mkdir(parents=True, exist_ok=True)
+
+def write_text_utf8(p: Path, content: str):
+    atomic_write(p, content.encode("utf-8"))
+
+@traced("write_text_utf16", lambda p, content: {"path": str(p), "chars": len(content)})
+def write_text_utf16(p: Path, content: str):
+    atomic_write(p, content.encode("utf-16-le"))  # INIs: Unicode/Windows-friendly
+
+def ts_now():
+    return time.strftime("%Y%m%d-%H%M%S")
+
+def unique_path(directory: Path, prefix: str, suffix: str) -> Path:
+    '''<prefix>-AAAAMMDD-HHMMSS-<pid>-<n><suffix>: processos paralelos nunca colidem.'''
+    return directory / f"{prefix}-{unique_stamp()}{suffix}"
+
+def timeframe_ok(tf: str) -> str:
+    tf = tf.upper()
+    allowed = {"M1","M2","M3","M4","M5","M6","M10","M12","M15","M20","M30",
+               "H1","H2","H3","H4","H6","H8","H12","D1","W1","MN1"}
+    if tf not in allowed:
+        raise SystemExit(f"Timeframe inválido: {tf}")
+    return tf
@@ -0,0 +1,103 @@
+# tests/test_clone.py — plano, vínculo/cópia e verificação de 'instance clone'
+import errno, os
+import pytest
+from mtcli import clone
+from mtcli.clone import CLONE_STAMP, build_plan, classify, clone_instance, link_file, verify_clone
+
+def make_source(root):
+    files = {
+        "bases/Demo/history/EURUSD/2024.hcc": b"h" * 4096,
+        "MQL5/Experts/EA.ex5": b"ex5",
+        "MQL5/Experts/EA.mq5": b"// src",
+        "config/common.ini": b"[Common]",
+        "terminal64.exe": b"MZ",
+        "logs/20240101.log": b"log",
+        "Tester/Agent-127.0.0.1-3000/x.dat": b"agent",
+        "MQL5/Logs/x.log": b"log",
+        CLONE_STAMP: b"{}",
+    }
+    for rel, data in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return root
+
+@pytest.mark.parametrize("rel, action", [
+    ("logs/20240101.log", "skip"),
+    ("Tester/Agent-127.0.0.1-3000/x.dat", "skip"),
+    ("Tester", "skip"),
+    ("MQL5/Logs/x.log", "skip"),
+    (CLONE_STAMP, "skip"),
+    ("bases/Demo/history/EURUSD/2024.hcc", "link"),
+    ("bases/Demo/symbols.dat", "link"),
+    ("MQL5/Experts/EA.ex5", "link"),
+    ("MQL5/Libraries/x.DLL", "link"),
+    ("terminal64.exe", "link"),
+    ("config/common.ini", "copy"),
+    ("MQL5/Experts/EA.mq5", "copy"),
+    ("MQL5/Files/Testerx.csv", "copy"),
+    ("MQL5/LogsOld/x.log", "copy"),
+])
+def test_classify(rel, action):
+    assert classify(rel) == action
+
+def test_build_plan_skips_logs_tester_and_stamp(tmp_path):
+    plan = build_plan(make_source(tmp_path / "src"))
+    assert sorted((rel, action) for rel, action, _ in plan) == [
+        ("MQL5/Experts/EA.ex5", "link"),
+        ("MQL5/Experts/EA.mq5", "copy"),
+        ("bases/Demo/history/EURUSD/2024.hcc", "link"),
+        ("config/common.ini", "copy"),
+        ("terminal64.exe", "link"),
+    ]
+
+@pytest.mark.parametrize("code", [errno.EXDEV, errno.EPERM])
+def test_link_file_falls_back_to_copy_without_reflink(tmp_path, monkeypatch, code):
+    def no_reflink(src, dst):
+        open(dst, "wb").close()  # o ioctl falha depois de criar o destino
+        raise OSError(code, os.strerror(code))
+    monkeypatch.setattr(clone, "_reflink", no_reflink)
+    src, dst = tmp_path / "a.hcc", tmp_path / "b.hcc"
+    src.write_bytes(b"history")
+    assert link_file(str(src), str(dst), "auto") == "copy"
+    assert dst.read_bytes() == b"history"
+    assert os.stat(dst).st_ino != os.stat(src).st_ino
+    with pytest.raises(SystemExit):
+        link_file(str(src), str(tmp_path / "c.hcc"), "reflink")
+
+def test_auto_mode_never_hardlinks(tmp_path, monkeypatch):
+    def no_reflink(src, dst):
+        raise OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+    monkeypatch.setattr(clone, "_reflink", no_reflink)
+    src = make_source(tmp_path / "src")
+    dst = tmp_path / "w01"
+    plan = build_plan(src)
+    stats = clone_instance(src, dst, plan, "auto")
+    assert stats["hardlink"] == 0 and stats["copy"] == len(plan)
+    for rel, _, _ in plan:
+        assert os.stat(dst / rel).st_nlink == 1
+
+def test_hardlink_mode_keeps_ex5_separate(tmp_path):
+    src = make_source(tmp_path / "src")
+    dst = tmp_path / "w01"
+    plan = build_plan(src)
+    stats = clone_instance(src, dst, plan, "hardlink")
+    assert os.stat(dst / "MQL5/Experts/EA.ex5").st_ino != os.stat(src / "MQL5/Experts/EA.ex5").st_ino
+    hcc = "bases/Demo/history/EURUSD/2024.hcc"
+    assert os.stat(dst / hcc).st_ino == os.stat(src / hcc).st_ino
+    assert stats["hardlink"] == 2  # histórico + terminal64.exe
+    assert (dst / CLONE_STAMP).exists()
+    assert not (dst / "logs").exists() and not (dst / "Tester").exists()
+
+def test_verify_clone_reports_size_mismatch_and_missing(tmp_path):
+    src = make_source(tmp_path / "src")
+    dst = tmp_path / "w01"
+    plan = build_plan(src)
+    clone_instance(src, dst, plan, "copy")
+    assert verify_clone(src, dst, plan) == []
+    (dst / "config/common.ini").write_bytes(b"[Common]\nLogin=1")
+    (dst / "MQL5/Experts/EA.mq5").unlink()
+    problems = verify_clone(src, dst, plan)
+    assert len(problems) == 2
+    assert any(p.startswith("tamanho ") and p.endswith("config/common.ini") for p in problems)
+    assert "ausente: MQL5/Experts/EA.mq5" in problems
@@ -0,0 +1,66 @@
+# tests/test_datacache.py — intervalos cobertos e mescla de barras/ticks no ingest
+from array import array
+from mtcli.datacache import SCHEMAS, DataCache, merge_intervals, subtract_intervals
+
+DAY = 86400
+T0 = 1704153600  # 2024-01-02 00:00 UTC
+
+def columns(kind: str, rows: list[dict]) -> dict[str, array]:
+    cols = {name: array(code) for name, code in SCHEMAS[kind]["columns"]}
+    for row in rows:
+        for name, a in cols.items():
+            a.append(row.get(name, 0))
+    return cols
+
+def bar(t: int, close: float) -> dict:
+    return {"time": t, "open": close, "high": close, "low": close, "close": close, "tick_volume": 1}
+
+def tick(msc: int, bid: float) -> dict:
+    return {"time": msc // 1000, "time_msc": msc, "bid": bid, "ask": bid + 0.0001}
+
+def test_merge_intervals_overlapping_and_adjacent():
+    assert merge_intervals([[10, 20], [15, 30], [40, 50]]) == [[10, 30], [40, 50]]
+    assert merge_intervals([[30, 40], [10, 20], [20, 30]]) == [[10, 40]]  # adjacentes viram um
+    assert merge_intervals([[10, 50], [20, 30]]) == [[10, 50]]
+    assert merge_intervals([[5, 5], [7, 9]]) == [[7, 9]]  # vazio some
+
+def test_subtract_intervals():
+    covered = merge_intervals([[10, 20], [30, 40]])
+    assert subtract_intervals(0, 50, covered) == [(0, 10), (20, 30), (40, 50)]
+    assert subtract_intervals(12, 18, covered) == []
+    assert subtract_intervals(15, 35, covered) == [(20, 30)]
+    assert subtract_intervals(0, 10, []) == [(0, 10)]
+
+def test_ingest_bars_merges_by_time_new_row_wins(tmp_path):
+    cache = DataCache(tmp_path)
+    cache.ingest("eurusd", "h1", columns("bars", [bar(T0, 1.0), bar(T0 + 3600, 1.1)]), T0, T0 + 7200)
+    cache.ingest("EURUSD", "H1", columns("bars", [bar(T0 + 3600, 2.1), bar(T0 + 7200, 2.2)]), T0 + 3600, T0 + 10800)
+    got = cache.read_arrays("EURUSD", "H1", T0, T0 + DAY)
+    assert list(got["time"]) == [T0, T0 + 3600, T0 + 7200]
+    assert list(got["close"]) == [1.0, 2.1, 2.2]
+    assert cache.load_index("EURUSD", "H1")["covered"] == [[T0, T0 + 10800]]
+    assert cache.missing("EURUSD", "H1", T0, T0 + 14400) == [(T0 + 10800, T0 + 14400)]
+
+def test_ingest_ticks_replaces_range_and_keeps_same_timestamp(tmp_path):
+    cache = DataCache(tmp_path)
+    ms = T0 * 1000
+    first = [tick(ms, 1.0), tick(ms + 500, 1.1), tick(ms + 500, 1.2), tick(ms + 1500, 1.3), tick(ms + 2500, 1.4)]
+    cache.ingest("EURUSD", "", columns("ticks", first), T0, T0 + 3, kind="ticks")
+    got = cache.read_arrays("EURUSD", "", T0, T0 + 3, kind="ticks")
+    assert list(got["time_msc"]) == [ms, ms + 500, ms + 500, ms + 1500, ms + 2500]
+    assert list(got["bid"]) == [1.0, 1.1, 1.2, 1.3, 1.4]  # dois ticks no mesmo ms, na ordem do terminal
+
+    # Reexporta só [T0+1, T0+2): os ticks antigos desse segundo saem, os de fora ficam.
+    again = [tick(ms + 1200, 2.0), tick(ms + 1200, 2.1)]
+    cache.ingest("EURUSD", "", columns("ticks", again), T0 + 1, T0 + 2, kind="ticks")
+    got = cache.read_arrays("EURUSD", "", T0, T0 + 3, kind="ticks")
+    assert list(got["time_msc"]) == [ms, ms + 500, ms + 500, ms + 1200, ms + 1200, ms + 2500]
+    assert list(got["bid"]) == [1.0, 1.1, 1.2, 2.0, 2.1, 1.4]
+
+def test_ingest_ticks_empty_range_drops_old_ticks(tmp_path):
+    cache = DataCache(tmp_path)
+    ms = T0 * 1000
+    cache.ingest("EURUSD", "", columns("ticks", [tick(ms + 100, 1.0), tick(ms + 5100, 1.1)]), T0, T0 + 10, kind="ticks")
+    cache.ingest("EURUSD", "", columns("ticks", []), T0, T0 + 5, kind="ticks")
+    got = cache.read_arrays("EURUSD", "", T0, T0 + 10, kind="ticks")
+    assert list(got["time_msc"]) == [ms + 5100]
@@ -0,0 +1,54 @@
+# tests/test_plan.py — CompiledPlan: nomes desconhecidos, deduplicação e contagens do --explain
+import json
+from pathlib import Path
+import pytest
+from mtcli.plan import compile_plan
+
+README = Path(__file__).resolve().parent.parent / "README.md"
+
+def readme_plan() -> dict:
+    '''O plano de exemplo do README (seção "Planos com restrições...").'''
+    text = README.read_text(encoding="utf-8")
+    start = text.index("{", text.index("Planos com restrições, eixos pareados e condicionais"))
+    end = text.index("python mtcli.py tester batch --plan plan.json --explain", start)
+    return json.loads(text[start:end])
+
+@pytest.mark.parametrize("spec, name", [
+    ({"grid": {"Mode": [0, 1]}, "constraints": ["Mdoe == 1"]}, "Mdoe"),
+    ({"grid": {"Mode": [0, 1]}, "when": [{"if": "mode == 1", "grid": {"Trail": [5]}}]}, "mode"),
+    ({"grid": {"Mode": [0, 1]}, "ignore": [{"if": "Trial > 0", "inputs": ["Mode"]}]}, "Trial"),
+])
+def test_unknown_name_is_an_error(spec, name):
+    with pytest.raises(SystemExit, match=f"input desconhecido: {name}"):
+        compile_plan(spec)
+
+def test_names_from_base_zip_and_when_are_known():
+    spec = {"base": {"inputs": {"Step": 15}}, "zip": [{"SL": [10, 20], "TP": [20, 40]}],
+            "when": [{"if": "SL > Step", "grid": {"Trail": [5]}, "else": {"Trail": 0}}],
+            "constraints": ["Trail == 0 or TP > SL"]}
+    assert list(compile_plan(spec)) == [{"SL": 10, "TP": 20, "Trail": 0}, {"SL": 20, "TP": 40, "Trail": 5}]
+
+def test_dedup_removes_duplicates():
+    plan = compile_plan({"grid": {"Mode": [0, 1], "Trail": [5, 10], "Lots": [0.1, 0.1]},
+                         "ignore": [{"if": "Mode == 0", "inputs": ["Trail"]}]})
+    combos = list(plan)
+    assert combos == [{"Mode": 0, "Trail": 5, "Lots": 0.1},
+                      {"Mode": 1, "Trail": 5, "Lots": 0.1},
+                      {"Mode": 1, "Trail": 10, "Lots": 0.1}]
+    # 8 brutas: Lots repetido dobra tudo (4) e Trail não importa com Mode 0 (mais 1)
+    assert plan.stats["raw"] == 8 and plan.stats["duplicates"] == 5 and plan.stats["emitted"] == 3
+    assert plan.count() == 3  # iterar de novo recomeça a contagem
+
+def test_explain_matches_readme_example():
+    plan = compile_plan(readme_plan())
+    lines = plan.explain()
+    assert plan.stats == {"raw": 24, "when": [24], "constraints": [0, 12, 6], "duplicates": 0, "emitted": 18}
+    rows = {name.strip(): value.strip() for name, _, value in (line.partition(" : ") for line in lines)}
+    assert rows["grid/zip (produto bruto)"] == "24"
+    assert rows["when Mode == 1"] == "24 expandidas"
+    assert rows["constraint SL > Step"] == "-12"
+    assert rows["constraint not (UseA and UseB)"] == "-6"
+    assert rows["total a executar"] == "18"
+    combos = list(plan)
+    assert len(combos) == 18
+    assert all(c["SL"] > 15 and not (c["UseA"] and c["UseB"]) for c in combos)